@@ -0,0 +1,394 @@
+from fastapi import HTTPException
+from sqlalchemy import select, func, delete, event
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from collections import Counter, defaultdict
+from datetime import date, datetime
+from typing import Dict, List, Optional, Tuple
+import math
+import models
+import queries
+import stats
+
+# Pipeline funnel and time-in-stage analytics from incremental daily rollups.
+#
+# Every application entering a stage adds to funnel_daily, and every
+# transition out of a stage adds the time spent there to a histogram bucket
+# in stage_time_daily, on the day it happened. Each event is counted under
+# three dimensions - all applications, its job and its recruiter - so any
+# date range is answered by summing at most days x stages rows of one
+# dimension. Medians and p90s are interpolated from the histogram buckets,
+# which are sqrt(2) wide, so they are estimates within one bucket.
+#
+# The ORM flush hook covers applications created and StatusHistory rows
+# added through the ORM; Core writers (transitions.bulk_transition) call
+# record() themselves. The rollups describe events as they happened, so
+# deleting an application does not take its history back out;
+# `python analytics.py backfill` rebuilds everything from StatusHistory.
+
+PIPELINE = [
+    models.ApplicationStatus.APPLIED,
+    models.ApplicationStatus.SCREENING,
+    models.ApplicationStatus.INTERVIEW,
+    models.ApplicationStatus.OFFER,
+    models.ApplicationStatus.HIRED,
+]
+
+# Rollup dimensions: "all" (id 0), "job" and "recruiter" (id 0 = unassigned)
+UNASSIGNED = 0
+
+# Time-in-stage histogram: bucket 0 is under an hour, then sqrt(2)-wide
+# buckets; the last one (about 16 months and up) is open-ended
+BUCKET_BASE_SECONDS = 3600
+MAX_BUCKET = 28
+
+CHUNK_SIZE = 500
+
+def bucket_for(seconds: float) -> int:
+    if seconds < BUCKET_BASE_SECONDS:
+        return 0
+    return min(MAX_BUCKET, 1 + int(2 * math.log2(seconds / BUCKET_BASE_SECONDS)))
+
+def bucket_bounds(bucket: int) -> Tuple[float, float]:
+    if bucket == 0:
+        return 0.0, float(BUCKET_BASE_SECONDS)
+    upper = BUCKET_BASE_SECONDS * 2 ** (bucket / 2) if bucket < MAX_BUCKET else math.inf
+    return BUCKET_BASE_SECONDS * 2 ** ((bucket - 1) / 2), upper
+
+# ============== ROLLUP WRITES ==============
+
+class Rollup:
+    """Pending increments for the rollup tables"""
+
+    def __init__(self):
+        self.entered = Counter()
+        self.exits = Counter()
+        self.seconds = Counter()
+
+    @staticmethod
+    def _dimensions(job_id: Optional[int], recruiter_id: Optional[int]):
+        return (("all", 0), ("job", job_id), ("recruiter", recruiter_id or UNASSIGNED))
+
+    def enter(self, job_id: int, recruiter_id: Optional[int], stage, at: datetime):
+        for dimension, dimension_id in self._dimensions(job_id, recruiter_id):
+            self.entered[(dimension, dimension_id, at.date(), stats.status_value(stage))] += 1
+
+    def leave(self, job_id: int, recruiter_id: Optional[int], stage, entered_at: datetime, left_at: datetime):
+        seconds = max(0.0, (left_at - entered_at).total_seconds())
+        bucket = bucket_for(seconds)
+        for dimension, dimension_id in self._dimensions(job_id, recruiter_id):
+            key = (dimension, dimension_id, left_at.date(), stats.status_value(stage), bucket)
+            self.exits[key] += 1
+            self.seconds[key] += seconds
+
+    def write(self, connection):
+        """Add the pending increments to the rollup tables on a sync connection"""
+        dialect = connection.dialect.name
+        if self.entered:
+            connection.execute(
+                queries.upsert_add(
+                    dialect, models.FunnelDaily, ["dimension", "dimension_id", "day", "stage"], ["entered"]
+                ),
+                [
+                    {"dimension": d, "dimension_id": i, "day": day, "stage": stage, "entered": n}
+                    for (d, i, day, stage), n in self.entered.items()
+                ]
+            )
+        if self.exits:
+            connection.execute(
+                queries.upsert_add(
+                    dialect, models.StageTimeDaily,
+                    ["dimension", "dimension_id", "day", "stage", "bucket"], ["exits", "total_seconds"]
+                ),
+                [
+                    {
+                        "dimension": d, "dimension_id": i, "day": day, "stage": stage, "bucket": bucket,
+                        "exits": n, "total_seconds": self.seconds[(d, i, day, stage, bucket)]
+                    }
+                    for (d, i, day, stage, bucket), n in self.exits.items()
+                ]
+            )
+        self.entered.clear()
+        self.exits.clear()
+        self.seconds.clear()
+
+def _add_transitions(connection, rollup: Rollup, moves: List[dict]):
+    """Roll up status moves (application_id, old_status, new_status, changed_at)"""
+    by_time = defaultdict(list)
+    for move in moves:
+        by_time[move["changed_at"]].append(move)
+
+    app = models.Application
+    history = models.StatusHistory
+    for changed_at, group in by_time.items():
+        # When each application entered its current stage: its latest earlier move, else applied_at
+        entered_at = (
+            select(func.max(history.changed_at))
+            .where(history.application_id == app.id, history.changed_at < changed_at)
+            .scalar_subquery()
+        )
+        ids = sorted({move["application_id"] for move in group})
+        context = {}
+        for start in range(0, len(ids), CHUNK_SIZE):
+            result = connection.execute(
+                select(app.id, app.job_id, app.recruiter_id, app.applied_at, entered_at)
+                .where(app.id.in_(ids[start:start + CHUNK_SIZE]))
+            )
+            context.update({row[0]: row for row in result})
+
+        for move in group:
+            row = context.get(move["application_id"])
+            if row is None:
+                continue
+            _, job_id, recruiter_id, applied_at, since = row
+            since = since or applied_at
+            if move["old_status"] is not None and since is not None:
+                rollup.leave(job_id, recruiter_id, move["old_status"], since, changed_at)
+            rollup.enter(job_id, recruiter_id, move["new_status"], changed_at)
+
+def record_moves(connection, moves: List[dict]):
+    """Roll up status moves written outside the ORM, on a sync connection"""
+    if not moves:
+        return
+    rollup = Rollup()
+    _add_transitions(connection, rollup, moves)
+    rollup.write(connection)
+
+async def record(db: AsyncSession, moves: List[dict]):
+    """record_moves for async callers writing StatusHistory through Core statements"""
+    await db.run_sync(lambda session: record_moves(session.connection(), moves))
+
+@event.listens_for(Session, "after_flush")
+def _track_pipeline(session, flush_context):
+    created = [obj for obj in session.new if isinstance(obj, models.Application)]
+    moves = [
+        {
+            "application_id": obj.application_id,
+            "old_status": obj.old_status,
+            "new_status": obj.new_status,
+            "changed_at": obj.changed_at,
+        }
+        for obj in session.new
+        if isinstance(obj, models.StatusHistory)
+    ]
+    if not created and not moves:
+        return
+
+    rollup = Rollup()
+    for application in created:
+        if application.applied_at is not None:
+            rollup.enter(
+                application.job_id, application.recruiter_id,
+                application.status or models.ApplicationStatus.APPLIED, application.applied_at
+            )
+    connection = session.connection()
+    if moves:
+        _add_transitions(connection, rollup, moves)
+    rollup.write(connection)
+
+# ============== BACKFILL ==============
+
+def rebuild(connection, batch_size: int = 5000) -> Dict[str, int]:
+    """Recompute the rollups from applications and StatusHistory on a sync connection"""
+    app = models.Application
+    history = models.StatusHistory
+    connection.execute(delete(models.FunnelDaily))
+    connection.execute(delete(models.StageTimeDaily))
+
+    counts = {"applications": 0, "transitions": 0}
+    rollup = Rollup()
+    last_id = 0
+    while True:
+        apps = connection.execute(
+            select(app.id, app.job_id, app.recruiter_id, app.status, app.applied_at)
+            .where(app.id > last_id)
+            .order_by(app.id)
+            .limit(batch_size)
+        ).all()
+        if not apps:
+            break
+        first_id, last_id = apps[0].id, apps[-1].id
+
+        moves = defaultdict(list)
+        for row in connection.execute(
+            select(history.application_id, history.old_status, history.new_status, history.changed_at)
+            .where(history.application_id.between(first_id, last_id))
+            .order_by(history.application_id, history.changed_at, history.id)
+        ):
+            moves[row.application_id].append(row)
+
+        for application in apps:
+            if application.applied_at is None:
+                continue
+            timeline = moves.get(application.id, [])
+            initial = timeline[0].old_status if timeline else application.status
+            rollup.enter(
+                application.job_id, application.recruiter_id,
+                initial or models.ApplicationStatus.APPLIED, application.applied_at
+            )
+            since = application.applied_at
+            for move in timeline:
+                if move.old_status is not None:
+                    rollup.leave(application.job_id, application.recruiter_id, move.old_status, since, move.changed_at)
+                rollup.enter(application.job_id, application.recruiter_id, move.new_status, move.changed_at)
+                since = move.changed_at
+            counts["transitions"] += len(timeline)
+
+        counts["applications"] += len(apps)
+        rollup.write(connection)
+    return counts
+
+async def backfill(db: AsyncSession) -> Dict[str, int]:
+    """Rebuild the rollups for existing history; the caller commits"""
+    return await db.run_sync(lambda session: rebuild(session.connection()))
+
+# ============== QUERIES ==============
+
+def resolve_dimension(job_id: Optional[int], recruiter_id: Optional[int], group_by: Optional[str]) -> Tuple[str, Optional[int]]:
+    """Rollup dimension and id (None = every id) answering a filter / group_by combination"""
+    if sum(value is not None for value in (job_id, recruiter_id, group_by)) > 1:
+        raise HTTPException(status_code=400, detail="Use one of job_id, recruiter_id or group_by")
+    if group_by:
+        return group_by, None
+    if job_id is not None:
+        return "job", job_id
+    if recruiter_id is not None:
+        return "recruiter", recruiter_id
+    return "all", 0
+
+def _scoped(query, model, dimension: str, dimension_id: Optional[int], date_from: date, date_to: date):
+    query = query.where(model.dimension == dimension, model.day >= date_from, model.day <= date_to)
+    if dimension_id is not None:
+        query = query.where(model.dimension_id == dimension_id)
+    return query
+
+def _group_key(dimension: str, dimension_id: int) -> Optional[int]:
+    return None if dimension == "all" else dimension_id
+
+async def funnel(
+    db: AsyncSession,
+    date_from: date,
+    date_to: date,
+    job_id: Optional[int] = None,
+    recruiter_id: Optional[int] = None,
+    group_by: Optional[str] = None,
+    limit: int = 50
+) -> List[dict]:
+    """Applications entering each stage in the range, with stage-to-stage conversion rates"""
+    dimension, dimension_id = resolve_dimension(job_id, recruiter_id, group_by)
+    model = models.FunnelDaily
+    result = await db.execute(
+        _scoped(
+            select(model.dimension_id, model.stage, func.sum(model.entered)),
+            model, dimension, dimension_id, date_from, date_to
+        ).group_by(model.dimension_id, model.stage)
+    )
+    groups = defaultdict(Counter)
+    for group_id, stage, entered in result:
+        groups[group_id][stage] += entered
+    if not groups and dimension_id is not None:
+        groups[dimension_id] = Counter()
+
+    report = []
+    for group_id, entered in groups.items():
+        stages, previous = [], None
+        for stage in PIPELINE:
+            count = entered[stage.value]
+            stages.append({
+                "stage": stage,
+                "entered": count,
+                "conversion_rate": round(count / previous, 4) if previous else None,
+            })
+            previous = count
+        report.append({
+            "key": _group_key(dimension, group_id),
+            "total": sum(entered.values()),
+            "stages": stages,
+            "rejected": entered[models.ApplicationStatus.REJECTED.value],
+        })
+    report.sort(key=lambda group: (-group["total"], group["key"] or 0))
+    return report[:limit]
+
+def percentile(buckets: Dict[int, Tuple[int, float]], pct: float) -> Optional[float]:
+    """Seconds at the pct-th percentile of a {bucket: (count, total seconds)} histogram"""
+    total = sum(count for count, _ in buckets.values())
+    if not total:
+        return None
+    rank = total * pct / 100
+    seen = 0
+    for bucket in sorted(buckets):
+        count, seconds = buckets[bucket]
+        if count and seen + count >= rank:
+            lower, upper = bucket_bounds(bucket)
+            if math.isinf(upper):
+                return seconds / count
+            return lower + (upper - lower) * (rank - seen) / count
+        seen += count
+    return None
+
+def _hours(seconds: Optional[float]) -> Optional[float]:
+    return round(seconds / 3600, 2) if seconds is not None else None
+
+async def time_in_stage(
+    db: AsyncSession,
+    date_from: date,
+    date_to: date,
+    job_id: Optional[int] = None,
+    recruiter_id: Optional[int] = None,
+    group_by: Optional[str] = None,
+    limit: int = 50
+) -> List[dict]:
+    """Mean, median and p90 time spent in each stage by applications leaving it in the range"""
+    dimension, dimension_id = resolve_dimension(job_id, recruiter_id, group_by)
+    model = models.StageTimeDaily
+    result = await db.execute(
+        _scoped(
+            select(model.dimension_id, model.stage, model.bucket, func.sum(model.exits), func.sum(model.total_seconds)),
+            model, dimension, dimension_id, date_from, date_to
+        ).group_by(model.dimension_id, model.stage, model.bucket)
+    )
+    groups = defaultdict(lambda: defaultdict(dict))
+    for group_id, stage, bucket, exits, seconds in result:
+        groups[group_id][stage][bucket] = (exits, seconds)
+    if not groups and dimension_id is not None:
+        groups[dimension_id] = {}
+
+    report = []
+    for group_id, by_stage in groups.items():
+        stages = []
+        for stage in models.ApplicationStatus:
+            buckets = by_stage.get(stage.value)
+            if not buckets:
+                continue
+            exits = sum(count for count, _ in buckets.values())
+            seconds = sum(total for _, total in buckets.values())
+            stages.append({
+                "stage": stage,
+                "exits": exits,
+                "mean_hours": _hours(seconds / exits),
+                "median_hours": _hours(percentile(buckets, 50)),
+                "p90_hours": _hours(percentile(buckets, 90)),
+            })
+        report.append({
+            "key": _group_key(dimension, group_id),
+            "total": sum(stage["exits"] for stage in stages),
+            "stages": stages,
+        })
+    report.sort(key=lambda group: (-group["total"], group["key"] or 0))
+    return report[:limit]
+
+if __name__ == "__main__":
+    import asyncio
+    import sys
+    from database import async_session
+
+    async def _backfill():
+        async with async_session() as db:
+            counts = await backfill(db)
+            await db.commit()
+        print(f"Rolled up {counts['applications']} applications and {counts['transitions']} status changes")
+
+    if sys.argv[1:] != ["backfill"]:
+        print("Usage: python analytics.py backfill")
+        sys.exit(1)
+    asyncio.run(_backfill())
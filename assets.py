@@ -0,0 +1,169 @@
+from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse
+from starlette.types import Scope
+from typing import Dict, Optional
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import shutil
+
+import compression
+
+# Static asset pipeline: content-hashed filenames with precompressed variants.
+#
+# `python assets.py build` copies every file under static/ to static/dist/
+# with a content hash in its name (css/style.css -> css/style.3f2a9c1b7d04.css),
+# writes .gz (and .br when the brotli package is installed) siblings for
+# compressible files, and records the mapping in static/dist/manifest.json.
+# Templates call asset_url("css/style.css") to get the hashed URL. Because a
+# hashed URL never changes content, AssetStaticFiles serves it with a
+# one-year immutable Cache-Control and picks the precompressed variant the
+# client accepts. Without a build (local development) asset_url falls back
+# to the plain /static/ path.
+
+STATIC_DIR = "static"
+DIST_DIR = "dist"
+MANIFEST_NAME = "manifest.json"
+URL_PREFIX = "/static"
+
+HASH_LENGTH = 12
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# Precompression suffix per content coding
+ENCODING_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+_manifest: Optional[Dict[str, dict]] = None
+# Hashed path (relative to static/) -> encodings available on disk
+_variants: Dict[str, tuple] = {}
+
+def _manifest_path(static_dir: str = STATIC_DIR) -> str:
+    return os.path.join(static_dir, DIST_DIR, MANIFEST_NAME)
+
+def load_manifest(static_dir: str = STATIC_DIR) -> Dict[str, dict]:
+    """(Re)load the build manifest; an empty mapping when no build exists"""
+    global _manifest
+    try:
+        with open(_manifest_path(static_dir), encoding="utf-8") as f:
+            _manifest = json.load(f)
+    except FileNotFoundError:
+        _manifest = {}
+    _variants.clear()
+    for entry in _manifest.values():
+        _variants[entry["file"]] = tuple(entry.get("encodings", ()))
+    return _manifest
+
+def asset_url(path: str) -> str:
+    """URL for a file under static/, hashed when the asset build has run"""
+    manifest = _manifest if _manifest is not None else load_manifest()
+    path = path.lstrip("/")
+    entry = manifest.get(path)
+    return f"{URL_PREFIX}/{entry['file'] if entry else path}"
+
+# ============== BUILD ==============
+
+def _hashed_name(relative: str, content: bytes) -> str:
+    digest = hashlib.sha256(content).hexdigest()[:HASH_LENGTH]
+    root, ext = os.path.splitext(relative)
+    return f"{root}.{digest}{ext}"
+
+def _precompress(target: str, content: bytes) -> list:
+    encodings = []
+    if compression.brotli is not None:
+        with open(target + ENCODING_SUFFIXES["br"], "wb") as f:
+            f.write(compression.brotli.compress(content, quality=11))
+        encodings.append("br")
+    # mtime=0 keeps the .gz byte-identical across builds
+    with open(target + ENCODING_SUFFIXES["gzip"], "wb") as f:
+        f.write(gzip.compress(content, compresslevel=9, mtime=0))
+    encodings.append("gzip")
+    return encodings
+
+def build(static_dir: str = STATIC_DIR) -> Dict[str, dict]:
+    """Write hashed copies, precompressed variants and the manifest into static/dist"""
+    dist = os.path.join(static_dir, DIST_DIR)
+    shutil.rmtree(dist, ignore_errors=True)
+
+    manifest = {}
+    for root, dirs, files in os.walk(static_dir):
+        dirs[:] = [d for d in dirs if os.path.join(root, d) != dist]
+
+        for name in sorted(files):
+            source = os.path.join(root, name)
+            relative = os.path.relpath(source, static_dir).replace(os.sep, "/")
+            with open(source, "rb") as f:
+                content = f.read()
+
+            hashed = f"{DIST_DIR}/{_hashed_name(relative, content)}"
+            target = os.path.join(static_dir, hashed)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            with open(target, "wb") as f:
+                f.write(content)
+
+            media_type = mimetypes.guess_type(name)[0] or ""
+            encodings = []
+            if compression.is_compressible(media_type) and len(content) >= compression.COMPRESSION_MIN_SIZE:
+                encodings = _precompress(target, content)
+
+            manifest[relative] = {"file": hashed, "size": len(content), "encodings": encodings}
+
+    with open(_manifest_path(static_dir), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    load_manifest(static_dir)
+    return manifest
+
+# ============== SERVING ==============
+
+class AssetStaticFiles(StaticFiles):
+    """StaticFiles that serves hashed assets immutable and precompressed"""
+
+    def file_response(self, full_path, stat_result, scope: Scope, status_code: int = 200) -> Response:
+        relative = os.path.relpath(full_path, os.path.realpath(self.directory)).replace(os.sep, "/")
+        if _manifest is None:
+            load_manifest(self.directory)
+
+        if relative not in _variants:
+            return super().file_response(full_path, stat_result, scope, status_code)
+
+        request_headers = Headers(scope=scope)
+        encoding = compression.negotiate(request_headers.get("accept-encoding"), _variants[relative])
+
+        headers = {"Cache-Control": IMMUTABLE_CACHE_CONTROL}
+        if _variants[relative]:
+            headers["Vary"] = "Accept-Encoding"
+        if encoding:
+            variant = full_path + ENCODING_SUFFIXES[encoding]
+            stat_result = os.stat(variant)
+            headers["Content-Encoding"] = encoding
+            response = FileResponse(
+                variant,
+                status_code=status_code,
+                stat_result=stat_result,
+                method=scope["method"],
+                media_type=mimetypes.guess_type(full_path)[0] or "text/plain",
+                headers=headers
+            )
+        else:
+            response = FileResponse(
+                full_path, status_code=status_code, stat_result=stat_result,
+                method=scope["method"], headers=headers
+            )
+
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build hashed, precompressed static assets")
+    parser.add_argument("command", choices=["build"])
+    parser.add_argument("--static-dir", default=STATIC_DIR)
+    args = parser.parse_args()
+
+    built = build(args.static_dir)
+    compressed = sum(1 for entry in built.values() if entry["encodings"])
+    print(f"Built {len(built)} assets ({compressed} precompressed) into {args.static_dir}/{DIST_DIR}")
@@ -0,0 +1,8 @@
+# Benchmarks for HireOps. Run modules from the repository root, e.g.
+#     python -m benchmarks.serialization
+#
+# Load testing against a local SQLite file:
+#     python -m benchmarks.datagen --db bench.db --scale 100k
+#     python -m benchmarks.load --db bench.db --out before.json
+#     python -m benchmarks.load --db bench.db --out after.json
+#     python -m benchmarks.compare before.json after.json
@@ -0,0 +1,19 @@
+import os
+
+# Test-only authentication bypass.
+#
+# Replaces main.get_current_user with a fixed user through FastAPI's
+# dependency_overrides, so benchmarks can call /api/* without an OAuth
+# session. It refuses to run in production.
+
+BENCHMARK_USER = {"id": 1, "email": "bench@example.com", "name": "Benchmark User", "picture": None}
+
+def install_auth_bypass(app, get_current_user, user: dict = None):
+    """Make every request authenticate as `user` (the first generated user by default)"""
+    if os.getenv("ENVIRONMENT") == "production":
+        raise RuntimeError("Refusing to install the benchmark auth bypass with ENVIRONMENT=production")
+    fixed_user = dict(user or BENCHMARK_USER)
+    app.dependency_overrides[get_current_user] = lambda: fixed_user
+
+def remove_auth_bypass(app, get_current_user):
+    app.dependency_overrides.pop(get_current_user, None)
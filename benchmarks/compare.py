@@ -0,0 +1,69 @@
+import argparse
+import json
+import sys
+from typing import Dict
+
+# Diff two benchmarks.load result files, scenario by scenario.
+#
+# Prints p50/p95 latency and queries per request for both runs with the
+# relative change, and flags scenarios whose p95 grew by more than
+# --threshold percent or that issue more queries than before. Exits 1 when
+# anything was flagged, so it can gate a CI job.
+#
+# Usage: python -m benchmarks.compare baseline.json candidate.json [--threshold 20]
+
+def _load(path: str) -> dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+def _by_scenario(report: dict) -> Dict[str, dict]:
+    return {result["scenario"]: result for result in report["results"]}
+
+def _change(old: float, new: float) -> str:
+    if not old:
+        return "    n/a"
+    return f"{(new - old) / old * 100:+6.1f}%"
+
+def compare(baseline: dict, candidate: dict, threshold: float) -> int:
+    """Print the comparison table; returns the number of regressions"""
+    if baseline.get("dataset") != candidate.get("dataset"):
+        print(f"warning: datasets differ ({baseline.get('dataset')} vs {candidate.get('dataset')})")
+
+    old, new = _by_scenario(baseline), _by_scenario(candidate)
+    print(f"{'scenario':<26}{'p50 ms':>17}{'p95 ms':>25}{'queries':>14}")
+    regressions = 0
+    for name in [n for n in old if n in new]:
+        a, b = old[name], new[name]
+        flags = []
+        if a["p95_ms"] and (b["p95_ms"] - a["p95_ms"]) / a["p95_ms"] * 100 > threshold:
+            flags.append("slower")
+        if b["queries_per_request"] > a["queries_per_request"]:
+            flags.append("more queries")
+        if b["errors"] > a["errors"]:
+            flags.append("errors")
+        regressions += bool(flags)
+        print(
+            f"{name:<26}{a['p50_ms']:>8.2f} -> {b['p50_ms']:<7.2f}"
+            f"{a['p95_ms']:>8.2f} -> {b['p95_ms']:<7.2f}{_change(a['p95_ms'], b['p95_ms'])}"
+            f"{a['queries_per_request']:>6.1f} -> {b['queries_per_request']:<5.1f}"
+            + (f"  <- {', '.join(flags)}" if flags else "")
+        )
+
+    for name in sorted(set(old) ^ set(new)):
+        print(f"{name:<26}only in {'baseline' if name in old else 'candidate'}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files")
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=20.0, help="allowed p95 growth in percent")
+    args = parser.parse_args()
+
+    regressions = compare(_load(args.baseline), _load(args.candidate), args.threshold)
+    if regressions:
+        print(f"{regressions} scenario(s) regressed")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import env
+
+# Deterministic synthetic dataset for benchmarks.
+#
+# The same seed and scale always produce the same rows. Sizes derive from
+# the number of applications: one job per 100 applications, one candidate
+# per 4 and one user per 20 jobs (with small floors), every candidate
+# applying to distinct jobs. Applications move along the pipeline and get
+# one StatusHistory row per transition, like the API would write.
+#
+# Rows go in through batched Core inserts; afterwards the stat counters, the
+# skills index, the pipeline analytics and the trend rollups are rebuilt,
+# and the FTS triggers keep search in sync.
+#
+# Usage: python -m benchmarks.datagen --db bench.db --scale 100k [--seed 42]
+
+SCALES = {"1k": 1_000, "10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+
+BATCH_SIZE = 5_000
+START = datetime(2024, 1, 1)
+SPAN_DAYS = 365
+
+FIRST_NAMES = ["Ada", "Alan", "Grace", "Linus", "Margaret", "Dennis", "Barbara", "Ken", "Frances", "Edsger",
+               "Radia", "Tim", "Katherine", "Guido", "Anita", "Bjarne", "Hedy", "James", "Jean", "Donald"]
+LAST_NAMES = ["Lovelace", "Turing", "Hopper", "Torvalds", "Hamilton", "Ritchie", "Liskov", "Thompson", "Allen",
+              "Dijkstra", "Perlman", "Berners-Lee", "Johnson", "van Rossum", "Borg", "Stroustrup", "Lamarr",
+              "Gosling", "Bartik", "Knuth"]
+ROLES = ["Backend Engineer", "Frontend Engineer", "Data Engineer", "Product Manager", "Designer",
+         "DevOps Engineer", "QA Engineer", "Data Scientist", "Engineering Manager", "Support Engineer"]
+LEVELS = ["Junior", "", "Senior", "Staff", "Principal"]
+LOCATIONS = ["Remote", "Berlin", "London", "New York", "Bangalore", "Toronto", "Singapore", "Austin"]
+JOB_TYPES = ["Full-time", "Part-time", "Contract"]
+COMPANIES = ["Acme", "Globex", "Initech", "Umbrella", "Hooli", "Stark Industries", "Wayne Enterprises", "Pied Piper"]
+SKILLS = ["Python", "SQL", "FastAPI", "Django", "React", "TypeScript", "Go", "Rust", "Kubernetes", "Docker",
+          "AWS", "GCP", "PostgreSQL", "Redis", "Kafka", "Spark", "Figma", "Java", "Node.js", "Terraform"]
+
+PIPELINE = ["applied", "screening", "interview", "offer", "hired"]
+# Final status distribution
+OUTCOMES = {"applied": 30, "screening": 20, "interview": 15, "offer": 5, "hired": 5, "rejected": 25}
+
+def sizes(applications: int) -> Dict[str, int]:
+    """Row counts for each table at a given number of applications"""
+    jobs = max(20, applications // 100)
+    return {
+        "users": max(5, jobs // 20),
+        "jobs": jobs,
+        "candidates": max(50, applications // 4),
+        "applications": applications,
+    }
+
+def _batches(rows: Iterator[dict], size: int = BATCH_SIZE) -> Iterator[List[dict]]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def _moment(rng: random.Random) -> datetime:
+    return START + timedelta(seconds=rng.randrange(SPAN_DAYS * 86400))
+
+def gen_users(rng: random.Random, count: int) -> Iterator[dict]:
+    for i in range(1, count + 1):
+        created = _moment(rng)
+        yield {
+            "id": i,
+            "email": f"recruiter{i}@example.com",
+            "name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+            "google_id": f"bench-{i}",
+            "created_at": created,
+            "updated_at": created,
+        }
+
+def gen_jobs(rng: random.Random, count: int, users: int) -> Iterator[dict]:
+    statuses = ["ACTIVE"] * 6 + ["DRAFT", "CLOSED", "ON_HOLD"]
+    for i in range(1, count + 1):
+        role = rng.choice(ROLES)
+        level = rng.choice(LEVELS)
+        skills = rng.sample(SKILLS, 4)
+        created = _moment(rng)
+        yield {
+            "id": i,
+            "title": f"{level} {role}".strip(),
+            "description": f"Join our team as a {role.lower()}. You will work with {', '.join(skills)} "
+                           f"on products used by millions. " * 3,
+            "requirements": f"{rng.randint(1, 10)}+ years with {skills[0]} and {skills[1]}",
+            "location": rng.choice(LOCATIONS),
+            "job_type": rng.choice(JOB_TYPES),
+            "salary_range": f"{rng.randrange(60, 160, 10)}k-{rng.randrange(160, 260, 10)}k",
+            "status": rng.choice(statuses),
+            "created_by": rng.randint(1, users),
+            "created_at": created,
+            "updated_at": created,
+        }
+
+def gen_candidates(rng: random.Random, count: int) -> Iterator[dict]:
+    for i in range(1, count + 1):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        created = _moment(rng)
+        yield {
+            "id": i,
+            "name": f"{first} {last}",
+            "email": f"{first}.{last}.{i}@example.com".lower().replace(" ", ""),
+            "phone": f"+1 555 {rng.randint(1000000, 9999999)}",
+            "skills": ", ".join(rng.sample(SKILLS, rng.randint(2, 6))),
+            "experience_years": rng.randint(0, 20),
+            "current_company": rng.choice(COMPANIES),
+            "current_position": rng.choice(ROLES),
+            "linkedin_url": f"https://www.linkedin.com/in/candidate-{i}",
+            "created_at": created,
+            "updated_at": created,
+        }
+
+def gen_applications(rng: random.Random, counts: Dict[str, int]) -> Iterator[tuple]:
+    """Yield (application, [status history rows]) pairs"""
+    outcomes, weights = list(OUTCOMES), list(OUTCOMES.values())
+    total, candidates, jobs = counts["applications"], counts["candidates"], counts["jobs"]
+    per_candidate, extra = divmod(total, candidates)
+
+    app_id = 0
+    for candidate_id in range(1, candidates + 1):
+        for job_id in rng.sample(range(1, jobs + 1), per_candidate + (1 if candidate_id <= extra else 0)):
+            app_id += 1
+            applied_at = _moment(rng)
+            outcome = rng.choices(outcomes, weights)[0]
+            if outcome == "rejected":
+                path = PIPELINE[:rng.randint(1, 4)] + ["rejected"]
+            else:
+                path = PIPELINE[:PIPELINE.index(outcome) + 1]
+
+            history, changed_at = [], applied_at
+            for old, new in zip(path, path[1:]):
+                changed_at += timedelta(hours=rng.randint(2, 24 * 14))
+                history.append({
+                    "application_id": app_id,
+                    "old_status": old.upper(),
+                    "new_status": new.upper(),
+                    "changed_by": rng.randint(1, counts["users"]),
+                    "notes": None,
+                    "changed_at": changed_at,
+                })
+
+            yield {
+                "id": app_id,
+                "job_id": job_id,
+                "candidate_id": candidate_id,
+                "status": path[-1].upper(),
+                "recruiter_id": rng.randint(1, counts["users"]),
+                "notes": None,
+                "applied_at": applied_at,
+                "updated_at": changed_at,
+            }, history
+
+async def generate(applications: int, seed: int = 42, progress: bool = True) -> Dict[str, int]:
+    """Fill the configured (empty, migrated) database; returns row counts"""
+    from sqlalchemy import insert, func, select
+    from database import engine, async_session
+    import analytics
+    import models
+    import skills
+    import stats
+    import trends
+
+    counts = sizes(applications)
+    rng = random.Random(seed)
+
+    async with engine.begin() as conn:
+        existing = await conn.scalar(select(func.count()).select_from(models.Application.__table__))
+        if existing:
+            raise SystemExit("Database already has applications; generate into a fresh file")
+
+    async def load(table, rows):
+        inserted = 0
+        for batch in _batches(rows):
+            async with engine.begin() as conn:
+                await conn.execute(insert(table), batch)
+            inserted += len(batch)
+            if progress:
+                print(f"\r  {table.name}: {inserted:,}", end="", flush=True)
+        if progress:
+            print()
+        return inserted
+
+    await load(models.User.__table__, gen_users(rng, counts["users"]))
+    await load(models.Job.__table__, gen_jobs(rng, counts["jobs"], counts["users"]))
+    await load(models.Candidate.__table__, gen_candidates(rng, counts["candidates"]))
+
+    history_rows = 0
+    app_batch, history_batch = [], []
+    for application, history in gen_applications(rng, counts):
+        app_batch.append(application)
+        history_batch.extend(history)
+        if len(app_batch) >= BATCH_SIZE:
+            async with engine.begin() as conn:
+                await conn.execute(insert(models.Application.__table__), app_batch)
+                await conn.execute(insert(models.StatusHistory.__table__), history_batch)
+            history_rows += len(history_batch)
+            app_batch, history_batch = [], []
+            if progress:
+                print(f"\r  applications: {application['id']:,}", end="", flush=True)
+    if app_batch:
+        async with engine.begin() as conn:
+            await conn.execute(insert(models.Application.__table__), app_batch)
+            if history_batch:
+                await conn.execute(insert(models.StatusHistory.__table__), history_batch)
+        history_rows += len(history_batch)
+    if progress:
+        print(f"\r  applications: {applications:,}")
+    counts["status_history"] = history_rows
+
+    # Core inserts bypass the ORM hooks that maintain these
+    async with async_session() as db:
+        await stats.rebuild_counters(db)
+        await db.commit()
+    async with async_session() as db:
+        await skills.backfill(db)
+    async with async_session() as db:
+        await analytics.backfill(db)
+        await trends.run_catch_up(db, days=None)
+        await db.commit()
+
+    await engine.dispose()
+    return counts
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a deterministic benchmark dataset")
+    parser.add_argument("--db", default="bench.db", help="SQLite file to create")
+    size = parser.add_mutually_exclusive_group()
+    size.add_argument("--scale", choices=SCALES, default="1k", help="number of applications")
+    size.add_argument("--applications", type=int, help="exact number of applications")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--force", action="store_true", help="overwrite an existing file")
+    args = parser.parse_args()
+
+    if os.path.exists(args.db):
+        if not args.force:
+            raise SystemExit(f"{args.db} exists; pass --force to overwrite")
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(args.db + suffix):
+                os.remove(args.db + suffix)
+
+    env.configure(args.db)
+    env.migrate()
+
+    applications = args.applications or SCALES[args.scale]
+    print(f"Generating {applications:,} applications into {args.db} (seed {args.seed})")
+    started = time.perf_counter()
+    counts = asyncio.run(generate(applications, seed=args.seed))
+    elapsed = time.perf_counter() - started
+    print(", ".join(f"{name}: {count:,}" for name, count in counts.items()) + f" in {elapsed:.1f}s")
+
+if __name__ == "__main__":
+    main()
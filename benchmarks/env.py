@@ -0,0 +1,25 @@
+import os
+
+# Shared setup for benchmark runs against a local SQLite file.
+#
+# database.py reads DATABASE_URL at import time, so configure() must run
+# before anything imports database, models or main.
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def configure(db_path: str, cache: bool = False):
+    """Point the app at db_path and make the run quiet and reproducible"""
+    os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{os.path.abspath(db_path)}"
+    os.environ["DB_ECHO"] = "false"
+    # Measure the database paths unless the response cache is asked for
+    os.environ["CACHE_ENABLED"] = "true" if cache else "false"
+    os.environ.setdefault("ENVIRONMENT", "benchmark")
+
+def migrate():
+    """Bring the configured database to the latest schema (call outside an event loop)"""
+    from alembic import command
+    from alembic.config import Config
+
+    config = Config(os.path.join(ROOT, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(ROOT, "migrations"))
+    command.upgrade(config, "head")
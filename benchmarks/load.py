@@ -0,0 +1,264 @@
+import argparse
+import asyncio
+import contextvars
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import env
+
+# In-process load driver for the /api/* routes.
+#
+# Runs the app through httpx's ASGI transport (no sockets, no server) against
+# a dataset from benchmarks.datagen, with the benchmark auth bypass. Each
+# scenario is driven for --requests requests at --concurrency, and reports
+# p50/p95/p99/mean latency, SQL statements per request and throughput. The
+# results are written as JSON so runs can be diffed with benchmarks.compare.
+#
+# The response cache is off unless --cache is given, so the numbers reflect
+# the database paths. Write scenarios only run with --writes, and change the
+# dataset.
+#
+# Usage: python -m benchmarks.load --db bench.db [--requests 200] [--concurrency 8]
+#        [--only jobs_list,stats] [--writes] [--out results.json]
+
+class Fixtures(NamedTuple):
+    job_ids: List[int]
+    candidate_ids: List[int]
+    application_ids: List[int]
+
+class Scenario(NamedTuple):
+    name: str
+    method: str
+    # (rng, fixtures, sequence number) -> (url, extra request kwargs)
+    build: Callable[[random.Random, Fixtures, int], Tuple[str, dict]]
+    write: bool = False
+
+def _get(url: str):
+    return lambda rng, fx, n: (url, {})
+
+SCENARIOS = [
+    Scenario("user", "GET", _get("/api/user")),
+    Scenario("jobs_list", "GET", _get("/api/jobs?limit=100")),
+    Scenario("jobs_search", "GET", _get("/api/jobs?search=engineer&limit=50")),
+    Scenario("job_detail", "GET", lambda rng, fx, n: (f"/api/jobs/{rng.choice(fx.job_ids)}", {})),
+    Scenario("candidates_list", "GET", _get("/api/candidates?limit=100")),
+    Scenario("candidates_search", "GET", _get("/api/candidates?search=python&limit=50")),
+    Scenario("candidate_detail", "GET", lambda rng, fx, n: (f"/api/candidates/{rng.choice(fx.candidate_ids)}", {})),
+    Scenario("applications_list", "GET", _get("/api/applications?limit=100")),
+    Scenario("applications_slim", "GET", _get("/api/applications?limit=100&slim=true")),
+    Scenario("applications_by_job", "GET", lambda rng, fx, n: (f"/api/applications?job_id={rng.choice(fx.job_ids)}", {})),
+    Scenario("application_history", "GET",
+             lambda rng, fx, n: (f"/api/applications/{rng.choice(fx.application_ids)}/history", {})),
+    Scenario("applications_export", "GET",
+             lambda rng, fx, n: (f"/api/applications/export?format=ndjson&job_id={rng.choice(fx.job_ids)}", {})),
+    Scenario("skills", "GET", _get("/api/skills")),
+    Scenario("skills_candidates", "GET", _get("/api/skills/candidates?skills=python&skills=sql&match=all&limit=50")),
+    Scenario("search_jobs", "GET", _get("/api/search/jobs?q=backend%20engineer")),
+    Scenario("search_candidates", "GET", _get("/api/search/candidates?q=python")),
+    Scenario("sync", "GET", _get("/api/sync?limit=200")),
+    Scenario("stats", "GET", _get("/api/stats")),
+    Scenario("create_job", "POST", lambda rng, fx, n: ("/api/jobs", {"json": {
+        "title": f"Benchmark Role {n}", "description": "Created by the load driver", "location": "Remote"
+    }}), write=True),
+    Scenario("create_candidate", "POST", lambda rng, fx, n: ("/api/candidates", {"json": {
+        "name": f"Load Candidate {n}", "email": f"load-{os.getpid()}-{n}@example.com", "skills": "Python, SQL"
+    }}), write=True),
+    Scenario("update_application_status", "PUT", lambda rng, fx, n: (
+        f"/api/applications/{rng.choice(fx.application_ids)}",
+        {"json": {"status": rng.choice(["screening", "interview", "offer"])}}
+    ), write=True),
+]
+
+# ============== MEASUREMENT ==============
+
+_statements: contextvars.ContextVar[Optional[list]] = contextvars.ContextVar("bench_statements", default=None)
+
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    counter = _statements.get()
+    if counter is not None:
+        counter[0] += 1
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Linear-interpolated percentile of an ascending list"""
+    if not sorted_values:
+        return 0.0
+    rank = (len(sorted_values) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (rank - low)
+
+async def _request(client, scenario: Scenario, rng: random.Random, fixtures: Fixtures, n: int):
+    url, kwargs = scenario.build(rng, fixtures, n)
+    counter = [0]
+    _statements.set(counter)
+    started = time.perf_counter()
+    response = await client.request(scenario.method, url, **kwargs)
+    await response.aread()
+    elapsed = time.perf_counter() - started
+    return elapsed, counter[0], response.status_code, len(response.content)
+
+async def run_scenario(client, scenario: Scenario, fixtures: Fixtures, requests: int,
+                       concurrency: int, seed: int) -> dict:
+    """Drive one scenario and summarize it"""
+    rng = random.Random(f"{seed}:{scenario.name}")
+    samples = []
+    sequence = iter(range(requests))
+
+    async def worker():
+        for n in sequence:
+            # Each request runs in its own context so statement counts don't mix
+            samples.append(await asyncio.create_task(_request(client, scenario, rng, fixtures, n)))
+
+    # One warm-up request fills plans, prepared statements and adapters
+    await _request(client, scenario, rng, fixtures, -1)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - started
+
+    latencies = sorted(s[0] * 1000 for s in samples)
+    errors = sum(1 for s in samples if s[2] >= 400)
+    return {
+        "scenario": scenario.name,
+        "method": scenario.method,
+        "requests": len(samples),
+        "errors": errors,
+        "status_codes": sorted({s[2] for s in samples}),
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "mean_ms": round(sum(latencies) / len(latencies), 3) if latencies else 0.0,
+        "queries_per_request": round(sum(s[1] for s in samples) / len(samples), 2) if samples else 0.0,
+        "bytes_per_response": round(sum(s[3] for s in samples) / len(samples)) if samples else 0,
+        "throughput_rps": round(len(samples) / wall, 1) if wall > 0 else 0.0,
+    }
+
+# ============== DRIVER ==============
+
+async def _fixtures(db, seed: int, size: int = 1000) -> Fixtures:
+    from sqlalchemy import select
+    import models
+
+    rng = random.Random(seed)
+
+    async def ids(column):
+        values = (await db.execute(select(column).order_by(column))).scalars().all()
+        if not values:
+            raise SystemExit("Dataset is empty; run benchmarks.datagen first")
+        return rng.sample(values, min(size, len(values)))
+
+    return Fixtures(
+        await ids(models.Job.id),
+        await ids(models.Candidate.id),
+        await ids(models.Application.id),
+    )
+
+async def _dataset_counts(db) -> Dict[str, int]:
+    from sqlalchemy import select, func
+    import models
+
+    counts = {}
+    for name, model in (("jobs", models.Job), ("candidates", models.Candidate),
+                        ("applications", models.Application), ("status_history", models.StatusHistory)):
+        counts[name] = await db.scalar(select(func.count()).select_from(model))
+    return counts
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=env.ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+async def run(args) -> dict:
+    import httpx
+    from sqlalchemy import event
+    import main
+    from database import engine, read_engine, async_session
+    from benchmarks.auth import install_auth_bypass
+
+    install_auth_bypass(main.app, main.get_current_user)
+    for target in {engine, read_engine}:
+        event.listen(target.sync_engine, "before_cursor_execute", _count_statement)
+
+    for handler in main.app.router.on_startup:
+        await handler()
+
+    async with async_session() as db:
+        fixtures = await _fixtures(db, args.seed)
+        dataset = await _dataset_counts(db)
+
+    selected = [s for s in SCENARIOS if (args.writes or not s.write)]
+    if args.only:
+        wanted = set(args.only.split(","))
+        selected = [s for s in selected if s.name in wanted]
+
+    results = []
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for scenario in selected:
+            result = await run_scenario(client, scenario, fixtures, args.requests, args.concurrency, args.seed)
+            results.append(result)
+            print(
+                f"{result['scenario']:<26}{result['p50_ms']:>9.2f}{result['p95_ms']:>9.2f}"
+                f"{result['p99_ms']:>9.2f}{result['queries_per_request']:>8.1f}{result['throughput_rps']:>9.1f}"
+                + (f"  errors: {result['errors']}" if result["errors"] else ""),
+                flush=True
+            )
+
+    await engine.dispose()
+    return {
+        "started_at": datetime.utcnow().isoformat(),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "database": os.path.basename(args.db),
+        "dataset": dataset,
+        "settings": {
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "seed": args.seed,
+            "cache": args.cache,
+            "writes": args.writes,
+        },
+        "results": results,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="In-process load test of the /api routes")
+    parser.add_argument("--db", default="bench.db", help="SQLite file made by benchmarks.datagen")
+    parser.add_argument("--requests", type=int, default=200, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--only", help="comma-separated scenario names")
+    parser.add_argument("--writes", action="store_true", help="include write scenarios (modifies the dataset)")
+    parser.add_argument("--cache", action="store_true", help="keep the response cache enabled")
+    parser.add_argument("--out", help="write results JSON here")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        raise SystemExit(f"{args.db} not found; create it with: python -m benchmarks.datagen --db {args.db}")
+
+    env.configure(args.db, cache=args.cache)
+    env.migrate()
+
+    print(f"{'scenario':<26}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'q/req':>8}{'req/s':>9}")
+    report = asyncio.run(run(args))
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.out}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Iterable, NamedTuple, Optional
+import hashlib
+import json
+import os
+import time
+import fastjson
+
+# Read-through response cache for GET APIs, with ETag / If-None-Match.
+#
+# Cached routes serialize their response once and store the JSON body under
+# a key built from the route path, the query string and the current
+# "generation" of every table the route reads. Committing a session that
+# wrote to a table bumps that table's generation, which makes every entry
+# depending on it unreachable at once (stale entries then age out of the
+# LRU). Writes are detected from ORM flushes and from ORM-enabled
+# insert/update/delete statements, so bulk Core-style writes are covered too.
+#
+# The in-memory backend is per process: with several workers, a write in
+# one worker does not invalidate the others' entries, so TTL bounds the
+# staleness. Plug in a shared backend via configure() for stricter setups.
+
+class CacheEntry(NamedTuple):
+    body: bytes
+    etag: str
+    headers: Dict[str, str]
+
+class CacheBackend:
+    """Interface for cache storage; generations must live in the same store"""
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        raise NotImplementedError
+
+    def set(self, key: str, entry: CacheEntry):
+        raise NotImplementedError
+
+    def generation(self, tag: str) -> int:
+        raise NotImplementedError
+
+    def bump(self, tag: str):
+        raise NotImplementedError
+
+class MemoryLRUCache(CacheBackend):
+    """Size- and TTL-bounded LRU held in this process"""
+
+    def __init__(self, max_entries: int = 1000, ttl_seconds: float = 30.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        item = self._entries.get(key)
+        if item is None:
+            return None
+        expires_at, entry = item
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def set(self, key: str, entry: CacheEntry):
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, entry)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def generation(self, tag: str) -> int:
+        return self._generations.get(tag, 0)
+
+    def bump(self, tag: str):
+        self._generations[tag] = self._generations.get(tag, 0) + 1
+
+    def clear(self):
+        self._entries.clear()
+
+class NullCache(CacheBackend):
+    """Backend that never stores anything (caching disabled, ETags still sent)"""
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        return None
+
+    def set(self, key: str, entry: CacheEntry):
+        pass
+
+    def generation(self, tag: str) -> int:
+        return 0
+
+    def bump(self, tag: str):
+        pass
+
+def _backend_from_env() -> CacheBackend:
+    if os.getenv("CACHE_ENABLED", "true").lower() in ("0", "false", "no"):
+        return NullCache()
+    return MemoryLRUCache(
+        max_entries=int(os.getenv("CACHE_MAX_ENTRIES", 1000)),
+        ttl_seconds=float(os.getenv("CACHE_TTL_SECONDS", 30))
+    )
+
+backend: CacheBackend = _backend_from_env()
+
+def configure(new_backend: CacheBackend):
+    """Swap the cache backend (e.g. for a shared store)"""
+    global backend
+    backend = new_backend
+
+def invalidate(*tables: str):
+    """Drop every cached response that depends on any of the given tables"""
+    for table in tables:
+        backend.bump(table)
+
+# ============== WRITE TRACKING ==============
+
+def _dirty_tables(session) -> set:
+    return session.info.setdefault("cache_dirty_tables", set())
+
+@event.listens_for(Session, "after_flush")
+def _track_flush(session, flush_context):
+    tables = _dirty_tables(session)
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        table = getattr(obj, "__tablename__", None)
+        if table:
+            tables.add(table)
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_statement(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        tables = _dirty_tables(orm_execute_state.session)
+        for mapper in orm_execute_state.all_mappers:
+            tables.add(mapper.local_table.name)
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session):
+    tables = session.info.pop("cache_dirty_tables", None)
+    if tables:
+        invalidate(*tables)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_on_rollback(session):
+    session.info.pop("cache_dirty_tables", None)
+
+# ============== ROUTE HELPER ==============
+
+_adapters: Dict[Any, TypeAdapter] = {}
+
+def _serialize(value, response_model, fast: bool = False) -> bytes:
+    if fast and fastjson.supports(response_model):
+        return fastjson.dumps(fastjson.project(value, response_model))
+    if response_model is None:
+        return json.dumps(value, default=str, separators=(",", ":")).encode()
+    adapter = _adapters.get(response_model)
+    if adapter is None:
+        adapter = _adapters[response_model] = TypeAdapter(response_model)
+    return adapter.dump_json(adapter.validate_python(value, from_attributes=True))
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or any(tag.removeprefix("W/") == etag.removeprefix("W/") for tag in candidates)
+
+def request_key(request: Request) -> str:
+    """Cache key for a request: path plus order-independent query string"""
+    params = sorted(request.query_params.multi_items())
+    return request.url.path + "?" + "&".join(f"{k}={v}" for k, v in params)
+
+async def cached_response(
+    request: Request,
+    tables: Iterable[str],
+    loader: Callable[[Dict[str, str]], Awaitable[Any]],
+    response_model: Any = None,
+    fast: bool = False
+) -> Response:
+    """Serve a GET from cache, or run loader(headers), serialize once and cache it
+
+    fast=True lets the opt-in fastjson path render trusted query rows.
+    """
+    # Read generations before loading: if a write commits meanwhile, the entry
+    # lands under the old generation and is never served
+    generations = ",".join(f"{t}:{backend.generation(t)}" for t in sorted(tables))
+    key = f"{request_key(request)}#{generations}"
+
+    entry = backend.get(key)
+    if entry is None:
+        headers: Dict[str, str] = {}
+        value = await loader(headers)
+        body = _serialize(value, response_model, fast)
+        # Weak: CompressionMiddleware re-encodes the 200 (and would weaken a
+        # strong tag there), but passes the bodiless 304 through as is
+        etag = 'W/"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+        entry = CacheEntry(body, etag, headers)
+        backend.set(key, entry)
+
+    # no-cache: browsers keep the body but revalidate with If-None-Match
+    headers = {"ETag": entry.etag, "Cache-Control": "private, no-cache", **entry.headers}
+    if _etag_matches(request.headers.get("if-none-match"), entry.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
@@ -0,0 +1,186 @@
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from typing import Dict, Optional
+import os
+import zlib
+
+try:
+    import brotli
+except ImportError:  # optional dependency: gzip only
+    brotli = None
+
+# Negotiated gzip / Brotli compression for dynamic responses.
+#
+# The middleware picks the best encoding from Accept-Encoding (Brotli when
+# the brotli package is installed and the client accepts it, else gzip) and
+# compresses compressible bodies of at least COMPRESSION_MIN_SIZE bytes.
+# Streaming responses (exports) are compressed incrementally. Responses that
+# already carry a Content-Encoding, such as precompressed static assets
+# served by assets.AssetStaticFiles, pass through untouched, and so does
+# text/event-stream, which must reach the client unbuffered. Partial
+# content (206) is left alone too: its Content-Range describes identity
+# bytes, and compressing them would break resumed downloads.
+
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", 1024))
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", 6))
+# Brotli quality 4 compresses better than gzip -6 at similar CPU cost;
+# static assets are precompressed at maximum quality instead
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", 4))
+
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "image/svg+xml",
+)
+UNCOMPRESSIBLE_TYPES = ("text/event-stream",)
+
+def available_encodings():
+    """Encodings this process can produce, in order of preference"""
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+def parse_accept_encoding(header: Optional[str]) -> Dict[str, float]:
+    """Map each coding in an Accept-Encoding header to its q-value"""
+    preferences = {}
+    for part in (header or "").split(","):
+        coding, _, params = part.strip().partition(";")
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        preferences[coding.strip().lower()] = q
+    return preferences
+
+def negotiate(header: Optional[str], offered=None) -> Optional[str]:
+    """Best encoding from `offered` that the client accepts, or None for identity"""
+    preferences = parse_accept_encoding(header)
+    best, best_q = None, 0.0
+    for coding in offered or available_encodings():
+        q = preferences.get(coding, preferences.get("*", 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+def is_compressible(content_type: str) -> bool:
+    content_type = content_type.lower()
+    if content_type.startswith(UNCOMPRESSIBLE_TYPES):
+        return False
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
+class _Compressor:
+    """Incremental gzip or Brotli encoder with a common interface"""
+
+    def __init__(self, encoding: str):
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=COMPRESSION_BROTLI_QUALITY)
+            self._zlib = None
+        else:
+            self._brotli = None
+            # wbits 16 + MAX_WBITS writes a gzip header and trailer
+            self._zlib = zlib.compressobj(COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        if self._brotli is not None:
+            return self._brotli.process(data)
+        return self._zlib.compress(data)
+
+    def finish(self) -> bytes:
+        if self._brotli is not None:
+            return self._brotli.finish()
+        return self._zlib.flush()
+
+class CompressionMiddleware:
+    """ASGI middleware compressing HTTP responses per Accept-Encoding"""
+
+    def __init__(self, app: ASGIApp, minimum_size: int = COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        await _CompressingResponder(self.app, encoding, self.minimum_size)(scope, receive, send)
+
+class _CompressingResponder:
+    def __init__(self, app: ASGIApp, encoding: str, minimum_size: int):
+        self.app = app
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.send: Send = None
+        self.start_message: Optional[Message] = None
+        self.compressor: Optional[_Compressor] = None
+        self.passthrough = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        self.send = send
+        await self.app(scope, receive, self.send_with_compression)
+
+    def _start_compressing(self):
+        headers = MutableHeaders(raw=self.start_message["headers"])
+        headers["Content-Encoding"] = self.encoding
+        if "content-length" in headers:
+            del headers["Content-Length"]
+        # The compressed bytes differ from the identity representation
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            headers["ETag"] = "W/" + etag
+        self.compressor = _Compressor(self.encoding)
+
+    async def send_with_compression(self, message: Message):
+        if message["type"] == "http.response.start":
+            headers = Headers(raw=message["headers"])
+            self.start_message = message
+            self.passthrough = (
+                "content-encoding" in headers
+                or message["status"] == 206
+                or not is_compressible(headers.get("content-type", ""))
+            )
+            if not self.passthrough and message["status"] not in (204, 304):
+                # Compressed or not, the body varies with Accept-Encoding
+                MutableHeaders(raw=message["headers"]).add_vary_header("Accept-Encoding")
+            if self.passthrough:
+                await self.send(message)
+            return
+
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.compressor is None:
+            if not more_body and len(body) < self.minimum_size:
+                # Small single-chunk response: not worth the CPU or the bytes
+                await self.send(self.start_message)
+                await self.send(message)
+                self.passthrough = True
+                return
+
+            self._start_compressing()
+            if not more_body:
+                data = self.compressor.compress(body) + self.compressor.finish()
+                MutableHeaders(raw=self.start_message["headers"])["Content-Length"] = str(len(data))
+                await self.send(self.start_message)
+                await self.send({"type": "http.response.body", "body": data})
+                return
+
+            await self.send(self.start_message)
+
+        data = self.compressor.compress(body)
+        if not more_body:
+            data += self.compressor.finish()
+        await self.send({"type": "http.response.body", "body": data, "more_body": more_body})
@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
@@ -7,17 +7,73 @@ import os
 # Database configuration
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite+aiosqlite:///./hireops.db")
 
-# Create async engine
-engine = create_async_engine(
-    DATABASE_URL,
-    echo=True,
-    future=True
-)
+# Optional read replica; GET handlers use it through get_read_db
+DATABASE_REPLICA_URL = os.getenv("DATABASE_REPLICA_URL")
+
+# SQL logging is a throughput hit, so it is opt-in
+DB_ECHO = os.getenv("DB_ECHO", "false").lower() in ("1", "true", "yes")
+
+# SQLite profile: WAL lets readers run alongside the single writer, and
+# busy_timeout makes writers wait for the lock instead of failing with
+# "database is locked"
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", 5000))
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+
+# Server database (Postgres etc.) pool profile
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 10))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 20))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", 30))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))
+
+def _configure_sqlite(engine, url: str):
+    in_memory = ":memory:" in url or url.split("://", 1)[-1] in ("", "/")
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        if not in_memory:
+            cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+        cursor.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+        cursor.close()
+
+def make_engine(url: str):
+    """Create an async engine with the profile matching the database backend"""
+    if url.startswith("sqlite"):
+        new_engine = create_async_engine(
+            url,
+            echo=DB_ECHO,
+            future=True,
+            connect_args={"timeout": SQLITE_BUSY_TIMEOUT_MS / 1000}
+        )
+        _configure_sqlite(new_engine, url)
+        return new_engine
+
+    return create_async_engine(
+        url,
+        echo=DB_ECHO,
+        future=True,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=True
+    )
+
+# Create async engines
+engine = make_engine(DATABASE_URL)
+read_engine = make_engine(DATABASE_REPLICA_URL) if DATABASE_REPLICA_URL else engine
 
 # Create async session
 async_session = sessionmaker(
-    engine, 
-    class_=AsyncSession, 
+    engine,
+    class_=AsyncSession,
+    expire_on_commit=False
+)
+
+read_session = sessionmaker(
+    read_engine,
+    class_=AsyncSession,
     expire_on_commit=False
 )
 
@@ -35,3 +91,12 @@ async def get_db():
             raise
         finally:
             await session.close()
+
+# Dependency for read-only handlers: may use the replica and never commits
+async def get_read_db():
+    async with read_session() as session:
+        try:
+            yield session
+        finally:
+            # Ends the read transaction without a needless COMMIT round-trip
+            await session.close()
@@ -0,0 +1,165 @@
+from fastapi import Request
+from collections import deque
+from datetime import datetime
+from typing import AsyncIterator, Dict, Iterable, List, NamedTuple, Optional, Set
+import asyncio
+import enum
+import json
+import os
+
+# Live change events over Server-Sent Events.
+#
+# Write endpoints publish compact change events (entity, action, id and the
+# changed fields) to an in-process hub after their transaction commits. Each
+# SSE connection owns a bounded queue: publishing never waits on a client,
+# and a consumer that falls EVENTS_QUEUE_SIZE events behind has its backlog
+# dropped and receives a single "resync" event telling it to reload its
+# lists once. The last EVENTS_REPLAY_SIZE events are kept so a reconnecting
+# EventSource (Last-Event-ID) catches up without reloading.
+#
+# The hub is per process. When running several workers, each client only
+# sees writes handled by its own worker and should resync on reconnect.
+
+EVENTS_QUEUE_SIZE = int(os.getenv("EVENTS_QUEUE_SIZE", 256))
+EVENTS_REPLAY_SIZE = int(os.getenv("EVENTS_REPLAY_SIZE", 1000))
+EVENTS_HEARTBEAT_SECONDS = float(os.getenv("EVENTS_HEARTBEAT_SECONDS", 15))
+# Reconnect delay suggested to browsers
+EVENTS_RETRY_MS = int(os.getenv("EVENTS_RETRY_MS", 3000))
+
+ENTITIES = ("job", "candidate", "application")
+
+class Event(NamedTuple):
+    id: int
+    entity: str
+    action: str
+    entity_id: Optional[int]
+    data: dict
+
+def _plain(value):
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, dict):
+        return {k: _plain(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_plain(v) for v in value]
+    return value
+
+def changed_fields(obj, update_data: dict) -> dict:
+    """Fields an update touched, read back from the refreshed row"""
+    fields = {field: getattr(obj, field) for field in update_data}
+    if hasattr(obj, "updated_at"):
+        fields["updated_at"] = obj.updated_at
+    return fields
+
+def format_sse(event: Event) -> str:
+    """Render an event in the text/event-stream wire format"""
+    payload = {"entity": event.entity, "action": event.action, "id": event.entity_id, **event.data}
+    name = "resync" if event.action == "resync" else "change"
+    return f"id: {event.id}\nevent: {name}\ndata: {json.dumps(payload, separators=(',', ':'))}\n\n"
+
+class Subscription:
+    """One SSE connection: an entity filter and a bounded event queue"""
+
+    def __init__(self, entities: Optional[Set[str]], maxsize: int):
+        self.entities = entities
+        self.queue: "asyncio.Queue[Event]" = asyncio.Queue(maxsize=maxsize)
+        self.overflows = 0
+
+    def offer(self, event: Event):
+        if self.entities and event.entity not in self.entities and event.action != "resync":
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Slow consumer: drop its backlog rather than buffer without bound
+            # or slow down the writer, and have it reload once
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(Event(event.id, "*", "resync", None, {"reason": "overflow"}))
+            self.overflows += 1
+
+class EventHub:
+    """In-process broadcast of change events to SSE subscribers"""
+
+    def __init__(self, queue_size: int = EVENTS_QUEUE_SIZE, replay_size: int = EVENTS_REPLAY_SIZE):
+        self.queue_size = queue_size
+        self.sequence = 0
+        self.history: "deque[Event]" = deque(maxlen=replay_size)
+        self.subscribers: Set[Subscription] = set()
+        self.published = 0
+        self.overflows = 0
+
+    def publish(self, entity: str, action: str, entity_id: Optional[int] = None, **data) -> Event:
+        """Broadcast an event to every subscriber without waiting on any of them"""
+        self.sequence += 1
+        event = Event(self.sequence, entity, action, entity_id, _plain(data))
+        self.history.append(event)
+        self.published += 1
+        for subscription in self.subscribers:
+            before = subscription.overflows
+            subscription.offer(event)
+            self.overflows += subscription.overflows - before
+        return event
+
+    def subscribe(self, entities: Optional[Iterable[str]] = None, last_event_id: Optional[str] = None) -> Subscription:
+        """Register a connection, replaying events missed since last_event_id"""
+        subscription = Subscription(set(entities) if entities else None, self.queue_size)
+
+        if last_event_id is not None:
+            try:
+                last_seen = int(last_event_id)
+            except ValueError:
+                last_seen = -1
+            oldest = self.history[0].id if self.history else self.sequence + 1
+            if 0 <= last_seen <= self.sequence and last_seen + 1 >= oldest:
+                for event in self.history:
+                    if event.id > last_seen:
+                        subscription.offer(event)
+            elif last_seen != self.sequence:
+                # Too far behind, or from before a restart: reload instead
+                subscription.offer(Event(self.sequence, "*", "resync", None, {"reason": "gap"}))
+
+        self.subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        self.subscribers.discard(subscription)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "subscribers": len(self.subscribers),
+            "published": self.published,
+            "overflows": self.overflows,
+            "last_event_id": self.sequence,
+        }
+
+hub = EventHub()
+
+def publish(entity: str, action: str, entity_id: Optional[int] = None, **data) -> Event:
+    """Publish a change event on the process-wide hub (call after commit)"""
+    return hub.publish(entity, action, entity_id, **data)
+
+def parse_entities(value: Optional[str]) -> Optional[List[str]]:
+    """Entity filter from a comma-separated query parameter; None means all"""
+    if not value:
+        return None
+    return [e.strip() for e in value.split(",") if e.strip() in ENTITIES] or None
+
+async def stream(request: Request, subscription: Subscription) -> AsyncIterator[str]:
+    """Yield SSE frames for one subscription until the client disconnects"""
+    try:
+        yield f"retry: {EVENTS_RETRY_MS}\n\n"
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.queue.get(), EVENTS_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    break
+                # Comment frame keeps proxies from closing an idle connection
+                yield ": keep-alive\n\n"
+                continue
+            yield format_sse(event)
+    finally:
+        hub.unsubscribe(subscription)
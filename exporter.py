@@ -0,0 +1,101 @@
+from sqlalchemy import select
+from datetime import datetime
+from typing import AsyncIterator, Optional
+import csv
+import enum
+import io
+import json
+import models
+import queries
+from database import read_session
+
+# Streaming application export.
+#
+# Rows come from a server-side cursor (AsyncSession.stream with yield_per),
+# are joined to their job and candidate in the same statement, and are
+# written out chunk by chunk, so memory stays flat however many rows match.
+# The generator opens its own (read-only, replica-capable) session because
+# it keeps running after the route handler has returned.
+
+EXPORT_COLUMNS = [
+    ("application_id", models.Application.id),
+    ("status", models.Application.status),
+    ("applied_at", models.Application.applied_at),
+    ("updated_at", models.Application.updated_at),
+    ("recruiter_id", models.Application.recruiter_id),
+    ("notes", models.Application.notes),
+    ("job_id", models.Job.id),
+    ("job_title", models.Job.title),
+    ("job_location", models.Job.location),
+    ("job_type", models.Job.job_type),
+    ("job_status", models.Job.status),
+    ("candidate_id", models.Candidate.id),
+    ("candidate_name", models.Candidate.name),
+    ("candidate_email", models.Candidate.email),
+    ("candidate_phone", models.Candidate.phone),
+    ("candidate_skills", models.Candidate.skills),
+    ("candidate_experience_years", models.Candidate.experience_years),
+    ("candidate_current_company", models.Candidate.current_company),
+    ("candidate_current_position", models.Candidate.current_position),
+]
+
+MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+def export_query(
+    job_id: Optional[int] = None,
+    candidate_id: Optional[int] = None,
+    status: Optional[str] = None,
+    applied_from: Optional[datetime] = None,
+    applied_to: Optional[datetime] = None
+):
+    """Joined select of every export column, filtered like list_applications"""
+    query = (
+        select(*[col.label(name) for name, col in EXPORT_COLUMNS])
+        .join(models.Job, models.Job.id == models.Application.job_id)
+        .join(models.Candidate, models.Candidate.id == models.Application.candidate_id)
+    )
+    query = queries.filter_applications(query, job_id, candidate_id, status)
+
+    if applied_from:
+        query = query.where(models.Application.applied_at >= applied_from)
+
+    if applied_to:
+        query = query.where(models.Application.applied_at < applied_to)
+
+    return query.order_by(models.Application.id)
+
+def _plain(value):
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+def _csv_chunk(rows, header: bool = False) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow([name for name, _ in EXPORT_COLUMNS])
+    writer.writerows([["" if v is None else _plain(v) for v in row] for row in rows])
+    return buffer.getvalue()
+
+def _ndjson_chunk(rows) -> str:
+    names = [name for name, _ in EXPORT_COLUMNS]
+    return "".join(
+        json.dumps({name: _plain(v) for name, v in zip(names, row)}, ensure_ascii=False) + "\n"
+        for row in rows
+    )
+
+async def stream_export(query, fmt: str, chunk_size: int = 1000) -> AsyncIterator[bytes]:
+    """Yield the encoded export one server-side cursor chunk at a time"""
+    if fmt == "csv":
+        yield _csv_chunk([], header=True).encode()
+
+    async with read_session() as db:
+        result = await db.stream(query.execution_options(yield_per=chunk_size))
+        async for rows in result.partitions(chunk_size):
+            chunk = _csv_chunk(rows) if fmt == "csv" else _ndjson_chunk(rows)
+            yield chunk.encode()
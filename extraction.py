@@ -0,0 +1,504 @@
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from sqlalchemy import select, update, delete, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import random
+import time
+import metrics
+import models
+import queries
+import resume_text
+import resumes
+import skills as skill_index
+from database import async_session
+
+# Background resume text extraction.
+#
+# Every stored resume file gets one row in resume_extraction_jobs, a durable
+# queue that survives restarts. The ExtractionRunner claims due jobs in
+# batches, hands them to a ProcessPoolExecutor (one worker per available
+# core by default) running resume_text.process, and writes results back in
+# batched transactions: the text and detected skills go onto resume_files,
+# then onto every candidate holding that file (Candidate.resume_text feeds
+# the candidates_fts index, Candidate.resume_skills the skill links).
+#
+# A failed job goes back to pending with exponential backoff and jitter;
+# after EXTRACTION_MAX_ATTEMPTS it stays failed until `retry-failed`. Jobs
+# stuck in running (a crashed process) are reclaimed after the timeout. A
+# worker that exceeds EXTRACTION_TIMEOUT_SECONDS is killed along with its
+# pool, which is then rebuilt.
+#
+# The web app runs one runner in-process (EXTRACTION_IN_APP) that sleeps
+# until an upload calls notify(). Large backfills run from the CLI instead:
+#
+#   python extraction.py run            drain the queue and exit
+#   python extraction.py reindex        re-extract every stored resume
+#   python extraction.py retry-failed   requeue jobs that ran out of attempts
+#   python extraction.py status         queue depth by status
+
+def _available_cores() -> int:
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+EXTRACTION_WORKERS = int(os.getenv("EXTRACTION_WORKERS", 0)) or _available_cores()
+EXTRACTION_IN_APP = os.getenv("EXTRACTION_IN_APP", "true").lower() in ("1", "true", "yes")
+EXTRACTION_MAX_ATTEMPTS = int(os.getenv("EXTRACTION_MAX_ATTEMPTS", 5))
+EXTRACTION_BACKOFF_SECONDS = float(os.getenv("EXTRACTION_BACKOFF_SECONDS", 30))
+EXTRACTION_MAX_BACKOFF_SECONDS = float(os.getenv("EXTRACTION_MAX_BACKOFF_SECONDS", 3600))
+EXTRACTION_TIMEOUT_SECONDS = float(os.getenv("EXTRACTION_TIMEOUT_SECONDS", 300))
+EXTRACTION_POLL_SECONDS = float(os.getenv("EXTRACTION_POLL_SECONDS", 30))
+# Results written per transaction
+EXTRACTION_BATCH_SIZE = int(os.getenv("EXTRACTION_BATCH_SIZE", 100))
+
+PENDING, RUNNING, DONE, FAILED = "pending", "running", "done", "failed"
+STATUSES = (PENDING, RUNNING, DONE, FAILED)
+
+ENQUEUE_CHUNK = 500
+
+logger = logging.getLogger("hireops.extraction")
+
+extractions = metrics.Counter(
+    "hireops_resume_extractions_total", "Resume extraction attempts by result (done, retry, failed)", ("result",)
+)
+extraction_time = metrics.Histogram(
+    "hireops_resume_extraction_seconds", "Time a worker process spent extracting one resume", (),
+    (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+)
+queue_depth = metrics.Gauge(
+    "hireops_resume_extraction_queue", "Resume extraction jobs by status", ("status",)
+)
+metrics.register(extractions, extraction_time, queue_depth)
+
+# ============== QUEUE ==============
+
+Job = models.ResumeExtractionJob
+
+async def enqueue(db: AsyncSession, sha256s: Iterable[str], reset: bool = False) -> int:
+    """Queue extraction for stored files; reset=True also requeues finished ones. The caller commits"""
+    sha256s = list(dict.fromkeys(sha256s))
+    now = datetime.utcnow()
+    for start in range(0, len(sha256s), ENQUEUE_CHUNK):
+        chunk = sha256s[start:start + ENQUEUE_CHUNK]
+        await db.execute(
+            queries.insert_ignore(db, Job),
+            [{"sha256": sha256, "status": PENDING, "attempts": 0, "run_after": now, "enqueued_at": now} for sha256 in chunk]
+        )
+        if reset:
+            await db.execute(
+                update(Job)
+                .where(Job.sha256.in_(chunk), Job.status != RUNNING)
+                .values(status=PENDING, attempts=0, run_after=now, last_error=None, enqueued_at=now, finished_at=None)
+            )
+    return len(sha256s)
+
+async def claim(db: AsyncSession, limit: int) -> List[Tuple[str, str]]:
+    """Mark up to `limit` due jobs running; returns (sha256, content_type) pairs and commits"""
+    now = datetime.utcnow()
+    result = await db.execute(
+        select(Job.sha256)
+        .where(Job.status == PENDING, Job.run_after <= now)
+        .order_by(Job.run_after)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    ids = result.scalars().all()
+    if not ids:
+        return []
+
+    await db.execute(
+        update(Job)
+        .where(Job.sha256.in_(ids), Job.status == PENDING)
+        .values(status=RUNNING, attempts=Job.attempts + 1, started_at=now)
+    )
+    result = await db.execute(
+        select(models.ResumeFile.sha256, models.ResumeFile.content_type).where(models.ResumeFile.sha256.in_(ids))
+    )
+    files = dict(result.all())
+    gone = [sha256 for sha256 in ids if sha256 not in files]
+    if gone:
+        # Garbage-collected since it was queued: nothing left to extract
+        await db.execute(delete(Job).where(Job.sha256.in_(gone)))
+    await db.commit()
+    return [(sha256, files[sha256]) for sha256 in ids if sha256 in files]
+
+async def release(db: AsyncSession, sha256s: List[str]):
+    """Put running jobs back to pending without counting the attempt; the caller commits"""
+    if sha256s:
+        await db.execute(
+            update(Job)
+            .where(Job.sha256.in_(sha256s), Job.status == RUNNING)
+            .values(status=PENDING, attempts=Job.attempts - 1, run_after=datetime.utcnow())
+        )
+
+async def recover(db: AsyncSession) -> int:
+    """Requeue jobs left running by a process that died; the caller commits"""
+    cutoff = datetime.utcnow() - timedelta(seconds=EXTRACTION_TIMEOUT_SECONDS)
+    result = await db.execute(
+        update(Job)
+        .where(Job.status == RUNNING, Job.started_at < cutoff)
+        .values(status=PENDING, run_after=datetime.utcnow())
+    )
+    return result.rowcount
+
+def backoff_seconds(attempts: int) -> float:
+    """Delay before retry number `attempts`: exponential, capped, with +-20% jitter"""
+    delay = min(EXTRACTION_BACKOFF_SECONDS * 2 ** (attempts - 1), EXTRACTION_MAX_BACKOFF_SECONDS)
+    return delay * random.uniform(0.8, 1.2)
+
+async def fail(db: AsyncSession, failures: List[Tuple[str, str]]) -> Dict[str, int]:
+    """Schedule retries for failed jobs, or mark them failed when out of attempts; the caller commits"""
+    if not failures:
+        return {}
+    errors = dict(failures)
+    result = await db.execute(select(Job.sha256, Job.attempts).where(Job.sha256.in_(list(errors))))
+    now = datetime.utcnow()
+    rows, outcome = [], {"retry": 0, "failed": 0}
+    for sha256, attempts in result:
+        row = {"sha256": sha256, "last_error": errors[sha256][:2000]}
+        if attempts >= EXTRACTION_MAX_ATTEMPTS:
+            row.update(status=FAILED, finished_at=now)
+            outcome["failed"] += 1
+            logger.warning("Resume %s failed extraction %d times: %s", sha256, attempts, errors[sha256])
+        else:
+            row.update(status=PENDING, run_after=now + timedelta(seconds=backoff_seconds(attempts)))
+            outcome["retry"] += 1
+        rows.append(row)
+    if rows:
+        await db.execute(update(Job), rows)
+    return outcome
+
+async def retry_failed(db: AsyncSession) -> int:
+    """Requeue every job that ran out of attempts; the caller commits"""
+    result = await db.execute(
+        update(Job)
+        .where(Job.status == FAILED)
+        .values(status=PENDING, attempts=0, run_after=datetime.utcnow(), finished_at=None)
+    )
+    return result.rowcount
+
+async def reindex_all(db: AsyncSession) -> int:
+    """Queue every stored resume for extraction again; the caller commits"""
+    result = await db.execute(select(models.ResumeFile.sha256).order_by(models.ResumeFile.created_at))
+    return await enqueue(db, result.scalars().all(), reset=True)
+
+async def depth(db: AsyncSession) -> Dict[str, int]:
+    """Job counts by status"""
+    result = await db.execute(select(Job.status, func.count()).group_by(Job.status))
+    counts = {status: 0 for status in STATUSES}
+    counts.update(result.all())
+    for status, count in counts.items():
+        queue_depth.set((status,), count)
+    return counts
+
+async def status(db: AsyncSession, failures: int = 20) -> dict:
+    """Queue depth, age of the oldest due job, in-app throughput and the latest failures"""
+    counts = await depth(db)
+    result = await db.execute(select(func.min(Job.run_after)).where(Job.status == PENDING))
+    oldest = result.scalar()
+    now = datetime.utcnow()
+    result = await db.execute(
+        select(Job.sha256, Job.attempts, Job.last_error, Job.finished_at)
+        .where(Job.status == FAILED)
+        .order_by(Job.finished_at.desc())
+        .limit(failures)
+    )
+    return {
+        **counts,
+        "oldest_pending_seconds": max((now - oldest).total_seconds(), 0.0) if oldest else None,
+        "workers": runner.workers if runner else 0,
+        "throughput_per_minute": runner.throughput() if runner else 0.0,
+        "recent_failures": [dict(row) for row in result.mappings()],
+    }
+
+async def next_due(db: AsyncSession) -> Optional[float]:
+    """Seconds until the next pending job is due (0 if one is due now), None if none are pending"""
+    result = await db.execute(select(func.min(Job.run_after)).where(Job.status == PENDING))
+    run_after = result.scalar()
+    if run_after is None:
+        return None
+    return max((run_after - datetime.utcnow()).total_seconds(), 0.0)
+
+# ============== RESULTS ==============
+
+async def complete(db: AsyncSession, results: List[Tuple[str, str, List[str], float]]):
+    """Write extracted text and skills to the files, their candidates and skill links; the caller commits"""
+    now = datetime.utcnow()
+    by_sha = {sha256: (text, detected) for sha256, text, detected, _ in results}
+    await db.execute(update(models.ResumeFile), [
+        {"sha256": sha256, "text": text, "detected_skills": json.dumps(detected), "extracted_at": now}
+        for sha256, (text, detected) in by_sha.items()
+    ])
+
+    result = await db.execute(
+        select(models.Candidate.id, models.Candidate.skills, models.Candidate.resume_sha256)
+        .where(models.Candidate.resume_sha256.in_(list(by_sha)))
+    )
+    holders = result.all()
+    if holders:
+        await db.execute(update(models.Candidate), [
+            {
+                "id": candidate_id,
+                "resume_text": by_sha[sha256][0],
+                "resume_skills": json.dumps(by_sha[sha256][1]) if by_sha[sha256][1] else None,
+                "updated_at": now,
+            }
+            for candidate_id, _, sha256 in holders
+        ])
+        await skill_index.index_candidates(db, [(candidate_id, skills) for candidate_id, skills, _ in holders])
+
+    await db.execute(update(Job), [
+        {"sha256": sha256, "status": DONE, "finished_at": now, "last_error": None} for sha256 in by_sha
+    ])
+
+async def refresh_candidate(db: AsyncSession, candidate: models.Candidate) -> bool:
+    """Sync a candidate's resume text and skills with its current file after an upload or delete
+
+    Text already extracted for the same file is copied straight away;
+    otherwise the file is queued and True is returned so the caller can
+    notify() the runner after committing. The caller commits.
+    """
+    had_skills = candidate.resume_skills is not None
+    extracted = None
+    if candidate.resume_sha256:
+        result = await db.execute(
+            select(models.ResumeFile.text, models.ResumeFile.detected_skills)
+            .where(models.ResumeFile.sha256 == candidate.resume_sha256, models.ResumeFile.extracted_at.isnot(None))
+        )
+        extracted = result.first()
+
+    if extracted is not None:
+        text, detected = extracted
+        candidate.resume_text = text
+        candidate.resume_skills = detected if json.loads(detected or "[]") else None
+    else:
+        candidate.resume_text = None
+        candidate.resume_skills = None
+
+    if had_skills or candidate.resume_skills is not None:
+        await skill_index.index_candidates(db, [(candidate.id, candidate.skills)])
+
+    if candidate.resume_sha256 and extracted is None:
+        await enqueue(db, [candidate.resume_sha256])
+        return True
+    return False
+
+async def load_vocabulary(db: AsyncSession) -> List[Tuple[str, str]]:
+    result = await db.execute(select(models.Skill.name, models.Skill.display_name))
+    return result.all()
+
+# ============== RUNNER ==============
+
+class ExtractionRunner:
+    """Feeds due jobs to a process pool and writes the results back in batches"""
+
+    def __init__(self, workers: int = EXTRACTION_WORKERS, progress: bool = False):
+        self.workers = max(workers, 1)
+        self.progress = progress
+        self.pool: Optional[ProcessPoolExecutor] = None
+        self.wakeup = asyncio.Event()
+        self.stopping = False
+        self.finished: "deque[float]" = deque(maxlen=10000)
+        self.totals = {"done": 0, "retry": 0, "failed": 0}
+
+    async def _start_pool(self):
+        # The pool only lives while there is work, so each burst of jobs
+        # sees the current skills vocabulary
+        async with async_session() as db:
+            vocabulary = await load_vocabulary(db)
+        self.pool = ProcessPoolExecutor(
+            self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=resume_text.init_worker,
+            initargs=(vocabulary,)
+        )
+
+    def _stop_pool(self, kill: bool = False):
+        if self.pool is None:
+            return
+        if kill:
+            # A hung parser never returns: terminate the workers outright
+            for process in list((self.pool._processes or {}).values()):
+                process.terminate()
+        self.pool.shutdown(wait=not kill, cancel_futures=True)
+        self.pool = None
+
+    def throughput(self, window: float = 60.0) -> float:
+        """Jobs finished per minute over the last `window` seconds"""
+        cutoff = time.monotonic() - window
+        return sum(1 for at in self.finished if at >= cutoff) * 60.0 / window
+
+    async def _flush(self, results: list, failures: list):
+        async with async_session() as db:
+            if results:
+                await complete(db, results)
+            outcome = await fail(db, failures)
+            await db.commit()
+        now = time.monotonic()
+        for _, _, _, seconds in results:
+            extraction_time.observe((), seconds)
+            self.finished.append(now)
+        for result, count in (("done", len(results)), *outcome.items()):
+            if count:
+                extractions.inc((result,), count)
+                self.totals[result] += count
+        results.clear()
+        failures.clear()
+
+    async def _report(self):
+        async with async_session() as db:
+            counts = await depth(db)
+        if self.progress:
+            print(
+                f"done {self.totals['done']}, retrying {self.totals['retry']}, failed {self.totals['failed']}; "
+                f"pending {counts[PENDING]}; {self.throughput():.0f}/min"
+            )
+
+    async def run(self, drain: bool = False):
+        """Process jobs until stop(), or with drain=True until no pending jobs remain"""
+        loop = asyncio.get_running_loop()
+        in_flight: Dict[asyncio.Future, Tuple[str, float]] = {}
+        results, failures = [], []
+        last_flush = last_report = time.monotonic()
+
+        async with async_session() as db:
+            if await recover(db):
+                logger.info("Requeued resume extraction jobs left running by a previous process")
+            await db.commit()
+
+        try:
+            while not self.stopping:
+                capacity = self.workers * 2 - len(in_flight)
+                if capacity > 0:
+                    async with async_session() as db:
+                        jobs = await claim(db, capacity)
+                    if jobs and self.pool is None:
+                        await self._start_pool()
+                    for sha256, content_type in jobs:
+                        future = loop.run_in_executor(
+                            self.pool, resume_text.process, sha256, resumes.blob_path(sha256), content_type
+                        )
+                        in_flight[future] = (sha256, time.monotonic())
+
+                if not in_flight:
+                    if results or failures:
+                        await self._flush(results, failures)
+                    await self._report()
+                    self._stop_pool()
+                    async with async_session() as db:
+                        due = await next_due(db)
+                    if drain and due is None:
+                        break
+                    self.wakeup.clear()
+                    timeout = EXTRACTION_POLL_SECONDS if due is None else min(due, EXTRACTION_POLL_SECONDS)
+                    try:
+                        await asyncio.wait_for(self.wakeup.wait(), timeout)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+
+                done, _ = await asyncio.wait(in_flight, timeout=1.0, return_when=asyncio.FIRST_COMPLETED)
+                broken = False
+                for future in done:
+                    sha256, _ = in_flight.pop(future)
+                    try:
+                        results.append(future.result())
+                    except BrokenProcessPool:
+                        broken = True
+                        failures.append((sha256, "Worker process died"))
+                    except Exception as error:
+                        failures.append((sha256, f"{type(error).__name__}: {error}"))
+
+                now = time.monotonic()
+                hung = [future for future, (_, started) in in_flight.items() if now - started > EXTRACTION_TIMEOUT_SECONDS]
+                for future in hung:
+                    sha256, _ = in_flight.pop(future)
+                    failures.append((sha256, f"Timed out after {EXTRACTION_TIMEOUT_SECONDS:.0f}s"))
+                if hung or broken:
+                    # Jobs sharing the pool with the culprit are requeued as they were
+                    async with async_session() as db:
+                        await release(db, [sha256 for sha256, _ in in_flight.values()])
+                        await db.commit()
+                    in_flight.clear()
+                    self._stop_pool(kill=True)
+
+                if len(results) + len(failures) >= EXTRACTION_BATCH_SIZE or (
+                    (results or failures) and now - last_flush >= 1.0
+                ):
+                    await self._flush(results, failures)
+                    last_flush = now
+                if now - last_report >= 10.0:
+                    await self._report()
+                    last_report = now
+        finally:
+            for future in in_flight:
+                future.cancel()
+            async with async_session() as db:
+                await release(db, [sha256 for sha256, _ in in_flight.values()])
+                await db.commit()
+            if results or failures:
+                await self._flush(results, failures)
+            self._stop_pool(kill=bool(in_flight))
+
+    def stop(self):
+        self.stopping = True
+        self.wakeup.set()
+
+# In-app runner, started from main.py's startup hook
+runner: Optional[ExtractionRunner] = None
+_task: Optional[asyncio.Task] = None
+
+def start():
+    global runner, _task
+    runner = ExtractionRunner()
+    _task = asyncio.create_task(runner.run())
+
+async def stop():
+    global runner, _task
+    if runner is not None:
+        runner.stop()
+        await _task
+        runner, _task = None, None
+
+def notify():
+    """Wake the in-app runner after committing newly queued jobs"""
+    if runner is not None:
+        runner.wakeup.set()
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Extract text and skills from stored resumes")
+    parser.add_argument("command", choices=["run", "reindex", "retry-failed", "status"])
+    parser.add_argument("--workers", type=int, default=EXTRACTION_WORKERS, help="worker processes")
+    args = parser.parse_args()
+
+    async def _run():
+        async with async_session() as db:
+            if args.command == "reindex":
+                print(f"Queued {await reindex_all(db)} resumes")
+            elif args.command == "retry-failed":
+                print(f"Requeued {await retry_failed(db)} failed jobs")
+            await db.commit()
+            counts = await depth(db)
+        print(", ".join(f"{status} {count}" for status, count in counts.items()))
+        if args.command == "status":
+            return
+
+        started = time.monotonic()
+        batch = ExtractionRunner(args.workers, progress=True)
+        await batch.run(drain=True)
+        elapsed = time.monotonic() - started
+        done = batch.totals["done"]
+        print(f"Extracted {done} resumes in {elapsed:.1f}s ({done / elapsed if elapsed else 0:.1f}/s) "
+              f"with {batch.workers} workers; {batch.totals['failed']} failed")
+
+    asyncio.run(_run())
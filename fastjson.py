@@ -0,0 +1,111 @@
+from pydantic import BaseModel
+from typing import Any, Dict, List, Optional, Tuple, Union, get_args, get_origin
+import json
+import os
+import types
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+# Opt-in fast JSON path for list endpoints.
+#
+# The default path validates every row into the route's Pydantic response
+# model and lets pydantic-core dump it. Rows coming out of our own queries
+# already have the right types, so with FAST_JSON_RESPONSES=true the fast
+# path skips validation altogether: it projects each row (dict or ORM
+# instance) onto exactly the fields of the response model - a plan computed
+# once per model - and serializes the resulting plain dicts with orjson.
+# The JSON is identical to the validated output for well-formed rows.
+# Models the planner doesn't understand (unions of models, aliases) quietly
+# use the validated path.
+
+FAST_JSON_RESPONSES = os.getenv("FAST_JSON_RESPONSES", "false").lower() in ("1", "true", "yes")
+
+enabled = FAST_JSON_RESPONSES and orjson is not None
+
+_MISSING = object()
+
+# A plan is a list of (field name, default, nested plan or None, is_list)
+Plan = List[Tuple[str, Any, Optional[list], bool]]
+
+_plans: Dict[Any, Optional[Tuple[Plan, bool]]] = {}
+
+class Unsupported(Exception):
+    pass
+
+def _unwrap_optional(annotation):
+    if get_origin(annotation) in (Union, types.UnionType):
+        args = [a for a in get_args(annotation) if a is not type(None)]
+        if len(args) == 1:
+            return args[0]
+    return annotation
+
+def _is_model(annotation) -> bool:
+    return isinstance(annotation, type) and issubclass(annotation, BaseModel)
+
+def _model_plan(model) -> Plan:
+    plan = []
+    for name, field in model.model_fields.items():
+        if field.alias and field.alias != name:
+            raise Unsupported(f"{model.__name__}.{name} uses an alias")
+
+        default = field.get_default(call_default_factory=True) if not field.is_required() else _MISSING
+        annotation = _unwrap_optional(field.annotation)
+        origin = get_origin(annotation)
+
+        if _is_model(annotation):
+            plan.append((name, default, _model_plan(annotation), False))
+        elif origin in (list, List) and _is_model(get_args(annotation)[0]):
+            plan.append((name, default, _model_plan(get_args(annotation)[0]), True))
+        elif any(_is_model(a) for a in get_args(annotation)):
+            raise Unsupported(f"{model.__name__}.{name} nests models in {annotation}")
+        else:
+            plan.append((name, default, None, False))
+    return plan
+
+def plan_for(response_model) -> Optional[Tuple[Plan, bool]]:
+    """(plan, is_list) for a model or List[model], or None if unsupported"""
+    if response_model not in _plans:
+        try:
+            if get_origin(response_model) in (list, List):
+                model = get_args(response_model)[0]
+                many = True
+            else:
+                model, many = response_model, False
+            if not _is_model(model):
+                raise Unsupported(f"{response_model} is not a model")
+            _plans[response_model] = (_model_plan(model), many)
+        except Unsupported:
+            _plans[response_model] = None
+    return _plans[response_model]
+
+def _project_one(row, plan: Plan) -> dict:
+    get = row.get if isinstance(row, dict) else (lambda name, default: getattr(row, name, default))
+    out = {}
+    for name, default, nested, many in plan:
+        value = get(name, default)
+        if value is _MISSING:
+            raise KeyError(name)
+        if nested is not None and value is not None:
+            value = [_project_one(v, nested) for v in value] if many else _project_one(value, nested)
+        out[name] = value
+    return out
+
+def project(value, response_model):
+    """Project rows onto the response model's fields without validating them"""
+    plan, many = plan_for(response_model)
+    if many:
+        return [_project_one(row, plan) for row in value]
+    return _project_one(value, plan)
+
+def dumps(value) -> bytes:
+    """Serialize plain data (datetimes, enums, nested dicts/lists) to JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(value, default=str, separators=(",", ":")).encode()
+
+def supports(response_model) -> bool:
+    """True if the fast path is on and can render this response model"""
+    return enabled and plan_for(response_model) is not None
@@ -0,0 +1,207 @@
+from fastapi import UploadFile
+from pydantic import ValidationError
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from datetime import datetime
+from itertools import islice
+from typing import Iterator, List, Optional, Tuple
+import csv
+import io
+import json
+import time
+import models
+import schemas
+import queries
+import skills as skill_index
+import stats
+import trends
+
+# Streaming bulk candidate import.
+#
+# The uploaded file (already spooled to a temp file by python-multipart) is
+# decoded and parsed record by record in a worker thread, one batch at a
+# time, so memory stays proportional to the batch size rather than the file.
+# Each batch is validated with schemas.CandidateCreate, de-duplicated by
+# email within the file and against the database, written with one
+# multi-row INSERT (plus one bulk UPDATE in "update" mode) and committed.
+
+MAX_REPORTED_ERRORS = 1000
+
+def detect_format(upload: UploadFile, requested: Optional[str]) -> Optional[str]:
+    """Pick csv or ndjson from the explicit parameter, file name or content type"""
+    if requested:
+        return requested.lower() if requested.lower() in ("csv", "ndjson") else None
+    name = (upload.filename or "").lower()
+    content_type = (upload.content_type or "").lower()
+    if name.endswith(".csv") or "csv" in content_type:
+        return "csv"
+    if name.endswith((".ndjson", ".jsonl")) or "ndjson" in content_type or "jsonl" in content_type:
+        return "ndjson"
+    return None
+
+def _iter_csv(text) -> Iterator[Tuple[int, object]]:
+    reader = csv.DictReader(text)
+    if reader.fieldnames:
+        reader.fieldnames = [name.strip().lower() for name in reader.fieldnames]
+    for number, record in enumerate(reader, start=1):
+        # Blank cells mean "not provided"; stray extra cells land under None
+        yield number, {
+            key: (value.strip() or None) if isinstance(value, str) else value
+            for key, value in record.items()
+            if key is not None
+        }
+
+def _iter_ndjson(text) -> Iterator[Tuple[int, object]]:
+    for number, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield number, e
+            continue
+        yield number, record if isinstance(record, dict) else ValueError("Expected a JSON object")
+
+def iter_records(fileobj, fmt: str) -> Iterator[Tuple[int, object]]:
+    """Yield (row number, dict or parse error) without reading the whole file"""
+    text = io.TextIOWrapper(fileobj, encoding="utf-8-sig", errors="replace", newline="")
+    try:
+        yield from (_iter_csv(text) if fmt == "csv" else _iter_ndjson(text))
+    finally:
+        # Leave the underlying upload open; UploadFile closes it
+        text.detach()
+
+class ImportReport:
+    def __init__(self, fmt: str):
+        self.format = fmt
+        self.total_rows = 0
+        self.inserted = 0
+        self.updated = 0
+        self.skipped_duplicates = 0
+        self.failed = 0
+        self.batches = 0
+        self.errors: List[dict] = []
+        self.started = time.perf_counter()
+
+    def error(self, row: int, email: Optional[str], message: str):
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"row": row, "email": email, "error": message})
+
+    def as_dict(self) -> dict:
+        elapsed = time.perf_counter() - self.started
+        return {
+            "format": self.format,
+            "total_rows": self.total_rows,
+            "inserted": self.inserted,
+            "updated": self.updated,
+            "skipped_duplicates": self.skipped_duplicates,
+            "failed": self.failed,
+            "batches": self.batches,
+            "errors": sorted(self.errors, key=lambda e: e["row"]),
+            "errors_truncated": self.failed + self.skipped_duplicates > len(self.errors),
+            "elapsed_seconds": round(elapsed, 3),
+            "rows_per_second": round(self.total_rows / elapsed, 1) if elapsed > 0 else None,
+        }
+
+def _validation_message(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in e['loc']) or 'row'}: {e['msg']}" for e in error.errors()
+    )
+
+async def _write_batch(
+    db: AsyncSession,
+    batch: List[Tuple[int, schemas.CandidateCreate]],
+    on_duplicate: str,
+    report: ImportReport
+):
+    emails = [candidate.email for _, candidate in batch]
+    result = await db.execute(
+        select(models.Candidate.email, models.Candidate.id).where(models.Candidate.email.in_(emails))
+    )
+    existing = dict(result.all())
+
+    new_rows = [(row, c) for row, c in batch if c.email not in existing]
+    dup_rows = [(row, c) for row, c in batch if c.email in existing]
+    indexed = []
+
+    if new_rows:
+        # insert_ignore + RETURNING: rows that lost a race with a concurrent
+        # writer simply don't come back, and are reported as duplicates
+        result = await db.execute(
+            queries.insert_ignore(db, models.Candidate).returning(
+                models.Candidate.id, models.Candidate.email, models.Candidate.skills
+            ),
+            [c.model_dump() for _, c in new_rows]
+        )
+        inserted = {email: (candidate_id, skills) for candidate_id, email, skills in result}
+        report.inserted += len(inserted)
+        indexed.extend(inserted.values())
+        await stats.bump(db, {"candidates.total": len(inserted)})
+        await trends.bump(db, trends.candidates_created(len(inserted), datetime.utcnow()))
+        dup_rows.extend((row, c) for row, c in new_rows if c.email not in inserted)
+
+    if dup_rows and on_duplicate == "update":
+        updates = [
+            {"id": existing[c.email], **c.model_dump(exclude_none=True)}
+            for _, c in dup_rows if c.email in existing
+        ]
+        if updates:
+            await db.execute(update(models.Candidate), updates)
+            report.updated += len(updates)
+            indexed.extend((u["id"], u["skills"]) for u in updates if "skills" in u)
+        dup_rows = [(row, c) for row, c in dup_rows if c.email not in existing]
+
+    for row, c in dup_rows:
+        report.skipped_duplicates += 1
+        report.error(row, c.email, "Candidate with this email already exists")
+
+    if indexed:
+        await skill_index.index_candidates(db, indexed)
+
+async def import_candidates(
+    db: AsyncSession,
+    upload: UploadFile,
+    fmt: str,
+    batch_size: int = 500,
+    on_duplicate: str = "skip"
+) -> dict:
+    """Stream-import candidates from a CSV/NDJSON upload, committing after every batch"""
+    report = ImportReport(fmt)
+    records = iter_records(upload.file, fmt)
+    seen_emails = set()
+
+    while True:
+        chunk = await run_in_threadpool(lambda: list(islice(records, batch_size)))
+        if not chunk:
+            break
+
+        batch = []
+        for row, record in chunk:
+            report.total_rows += 1
+            email = record.get("email") if isinstance(record, dict) else None
+
+            if isinstance(record, Exception):
+                report.failed += 1
+                report.error(row, None, f"Could not parse row: {record}")
+                continue
+            try:
+                candidate = schemas.CandidateCreate(**record)
+            except ValidationError as e:
+                report.failed += 1
+                report.error(row, email, _validation_message(e))
+                continue
+
+            if candidate.email in seen_emails:
+                report.skipped_duplicates += 1
+                report.error(row, candidate.email, "Duplicate email earlier in this file")
+                continue
+            seen_emails.add(candidate.email)
+            batch.append((row, candidate))
+
+        if batch:
+            await _write_batch(db, batch, on_duplicate, report)
+            await db.commit()
+        report.batches += 1
+
+    return report.as_dict()
@@ -1,19 +1,43 @@
-from fastapi import FastAPI, Request, Depends, HTTPException
-from fastapi.responses import HTMLResponse, RedirectResponse
-from fastapi.staticfiles import StaticFiles
+from fastapi import FastAPI, Request, Response, Depends, HTTPException, Query, UploadFile, File
+from fastapi.responses import HTMLResponse, PlainTextResponse, RedirectResponse, StreamingResponse
 from fastapi.templating import Jinja2Templates
 from authlib.integrations.starlette_client import OAuth
 from starlette.middleware.sessions import SessionMiddleware
 from dotenv import load_dotenv
-from sqlalchemy import select, func
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List, Optional
+from typing import List, Optional, Union
+from datetime import date, datetime, timedelta
+import asyncio
 import os
+import secrets
 
 # Import database and models
-from database import engine, get_db, Base
+from database import engine, read_engine, async_session, get_db, get_read_db
 import models
 import schemas
+import queries
+import pagination
+import stats
+import search as fulltext
+import skills as skill_index
+import importer
+import exporter
+import transitions
+import cache
+import events
+import sync
+import assets
+import analytics
+import trends
+import metrics
+import profiler
+import resumes
+import extraction
+import tasks
+import matching
+from compression import CompressionMiddleware
 
 # Load environment variables
 load_dotenv()
@@ -24,9 +48,28 @@ app = FastAPI(title="HireOps", version="1.0.0")
 # Database initialization
 @app.on_event("startup")
 async def startup():
-    """Create database tables on startup"""
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    """Prepare runtime state; the schema itself is managed by `alembic upgrade head`"""
+    async with engine.connect() as conn:
+        await conn.run_sync(fulltext.detect_fts_indexes)
+    
+    # Seed dashboard counters on a fresh database
+    async with async_session() as db:
+        await stats.ensure_counters(db)
+        await db.commit()
+    
+    # Resume text extraction worker pool (or run `python extraction.py run` separately)
+    if extraction.EXTRACTION_IN_APP:
+        extraction.start()
+    
+    # Durable task queue workers (or run `python tasks.py run` separately)
+    if tasks.TASKS_IN_APP:
+        tasks.start()
+
+@app.on_event("shutdown")
+async def shutdown():
+    """Stop background workers, returning their unfinished jobs to the queue"""
+    await extraction.stop()
+    await tasks.stop()
 
 # Add session middleware with production-ready settings
 app.add_middleware(
@@ -38,11 +81,26 @@ app.add_middleware(
     https_only=os.getenv("ENVIRONMENT", "development") == "production"
 )
 
-# Mount static files
-app.mount("/static", StaticFiles(directory="static"), name="static")
+# Compress API and page responses (static assets come precompressed)
+app.add_middleware(CompressionMiddleware)
+
+# Wraps sessions and compression, so latency includes them; only the
+# profiler (added below) sits outside it
+app.add_middleware(metrics.MetricsMiddleware)
+metrics.instrument_engine(engine)
+metrics.instrument_engine(read_engine)
+
+# Profiles requests sent with X-Profile: <PROFILER_TOKEN>, or a PROFILER_SAMPLE_RATE share
+app.add_middleware(profiler.ProfilerMiddleware)
+profiler.instrument_engine(engine)
+profiler.instrument_engine(read_engine)
+
+# Mount static files (hashed builds from `python assets.py build` are served immutable)
+app.mount("/static", assets.AssetStaticFiles(directory="static"), name="static")
 
 # Setup templates
 templates = Jinja2Templates(directory="templates")
+templates.env.globals["asset_url"] = assets.asset_url
 
 # Configure OAuth
 oauth = OAuth()
@@ -63,6 +121,13 @@ def get_current_user(request: Request):
         raise HTTPException(status_code=401, detail="Not authenticated")
     return user
 
+# Guard for the profiler endpoints: admin token, not a user session
+def require_profiler_token(request: Request):
+    if not profiler.PROFILER_TOKEN:
+        raise HTTPException(status_code=404, detail="Profiler is disabled")
+    if not profiler.token_matches(request.headers.get(profiler.PROFILE_HEADER)):
+        raise HTTPException(status_code=401, detail="Invalid profiler token")
+
 # Helper to get or create user in database
 async def get_or_create_user(user_data: dict, db: AsyncSession) -> models.User:
     """Get user from database or create if doesn't exist"""
@@ -230,45 +295,32 @@ async def debug_oauth(request: Request):
 
 @app.get("/api/jobs", response_model=List[schemas.JobWithApplicationCount])
 async def list_jobs(
+    request: Request,
     status: Optional[str] = None,
     search: Optional[str] = None,
     skip: int = 0,
     limit: int = 100,
-    db: AsyncSession = Depends(get_db),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db),
     user: dict = Depends(get_current_user)
 ):
-    """List all jobs with optional filters"""
-    query = select(models.Job)
-    
-    if status:
-        query = query.where(models.Job.status == status)
-    
-    if search:
-        query = query.where(
-            models.Job.title.contains(search) | 
-            models.Job.description.contains(search)
-        )
-    
-    query = query.offset(skip).limit(limit).order_by(models.Job.created_at.desc())
-    result = await db.execute(query)
-    jobs = result.scalars().all()
-    
-    # Get application counts for each job
-    jobs_with_counts = []
-    for job in jobs:
-        count_query = select(func.count(models.Application.id)).where(
-            models.Application.job_id == job.id
+    """List all jobs with optional filters (cursor pagination via X-Next-Cursor / X-Prev-Cursor)"""
+    async def load(headers):
+        # Counts come back from the same grouped query; the dicts are validated once
+        page = await queries.list_jobs_with_counts(
+            db,
+            status=status,
+            search=search,
+            skip=skip,
+            limit=limit,
+            cursor=pagination.decode_cursor(cursor) if cursor else None
         )
-        count_result = await db.execute(count_query)
-        count = count_result.scalar()
-        
-        job_dict = {
-            **{c.name: getattr(job, c.name) for c in job.__table__.columns},
-            "application_count": count
-        }
-        jobs_with_counts.append(schemas.JobWithApplicationCount(**job_dict))
+        headers.update(pagination.cursor_headers(page))
+        return page.items
     
-    return jobs_with_counts
+    return await cache.cached_response(
+        request, ("jobs", "applications"), load, List[schemas.JobWithApplicationCount], fast=True
+    )
 
 @app.post("/api/jobs", response_model=schemas.Job)
 async def create_job(
@@ -284,24 +336,29 @@ async def create_job(
     db.add(db_job)
     await db.commit()
     await db.refresh(db_job)
+    events.publish("job", "created", db_job.id, fields=queries.row_to_dict(db_job))
     return db_job
 
 @app.get("/api/jobs/{job_id}", response_model=schemas.Job)
 async def get_job(
     job_id: int,
-    db: AsyncSession = Depends(get_db),
+    request: Request,
+    db: AsyncSession = Depends(get_read_db),
     user: dict = Depends(get_current_user)
 ):
     """Get a specific job by ID"""
-    result = await db.execute(
-        select(models.Job).where(models.Job.id == job_id)
-    )
-    job = result.scalar_one_or_none()
-    
-    if not job:
-        raise HTTPException(status_code=404, detail="Job not found")
+    async def load(headers):
+        result = await db.execute(
+            select(models.Job).where(models.Job.id == job_id)
+        )
+        job = result.scalar_one_or_none()
+        
+        if not job:
+            raise HTTPException(status_code=404, detail="Job not found")
+        
+        return job
     
-    return job
+    return await cache.cached_response(request, ("jobs",), load, schemas.Job)
 
 @app.put("/api/jobs/{job_id}", response_model=schemas.Job)
 async def update_job(
@@ -326,6 +383,7 @@ async def update_job(
     
     await db.commit()
     await db.refresh(db_job)
+    events.publish("job", "updated", db_job.id, fields=events.changed_fields(db_job, update_data))
     return db_job
 
 @app.delete("/api/jobs/{job_id}")
@@ -345,31 +403,40 @@ async def delete_job(
     
     await db.delete(db_job)
     await db.commit()
+    events.publish("job", "deleted", job_id)
     return {"message": "Job deleted successfully"}
 
 # ============== CANDIDATE MANAGEMENT API ==============
 
 @app.get("/api/candidates", response_model=List[schemas.Candidate])
 async def list_candidates(
+    request: Request,
     search: Optional[str] = None,
     skip: int = 0,
     limit: int = 100,
-    db: AsyncSession = Depends(get_db),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db),
     user: dict = Depends(get_current_user)
 ):
-    """List all candidates with optional search"""
-    query = select(models.Candidate)
-    
-    if search:
-        query = query.where(
-            models.Candidate.name.contains(search) | 
-            models.Candidate.email.contains(search) |
-            models.Candidate.skills.contains(search)
+    """List all candidates with optional search (cursor pagination via X-Next-Cursor / X-Prev-Cursor)"""
+    async def load(headers):
+        key = pagination.decode_cursor(cursor) if cursor else None
+        query = select(models.Candidate)
+        
+        if search:
+            query = query.where(fulltext.search_filter(models.Candidate, search))
+        
+        query = pagination.apply_keyset(
+            query, models.Candidate.created_at, models.Candidate.id, key, skip, limit
         )
+        result = await db.execute(query)
+        page = pagination.build_page(result.scalars().all(), key, skip, limit, lambda c: (c.created_at, c.id))
+        headers.update(pagination.cursor_headers(page))
+        return page.items
     
-    query = query.offset(skip).limit(limit).order_by(models.Candidate.created_at.desc())
-    result = await db.execute(query)
-    return result.scalars().all()
+    return await cache.cached_response(
+        request, ("candidates",), load, List[schemas.Candidate], fast=True
+    )
 
 @app.post("/api/candidates", response_model=schemas.Candidate)
 async def create_candidate(
@@ -389,26 +456,57 @@ async def create_candidate(
     
     db_candidate = models.Candidate(**candidate.model_dump())
     db.add(db_candidate)
+    await db.flush()
+    # The skill index is derived data; rebuild it once the candidate is committed
+    await tasks.enqueue(db, "skills.index_candidates", {"candidate_ids": [db_candidate.id]})
     await db.commit()
     await db.refresh(db_candidate)
+    events.publish("candidate", "created", db_candidate.id, fields=queries.row_to_dict(db_candidate))
     return db_candidate
 
+@app.post("/api/candidates/import", response_model=schemas.CandidateImportReport)
+async def import_candidates(
+    file: UploadFile = File(...),
+    format: Optional[str] = None,
+    batch_size: int = Query(500, ge=1, le=5000),
+    on_duplicate: str = "skip",
+    db: AsyncSession = Depends(get_db),
+    user: dict = Depends(get_current_user)
+):
+    """Bulk import candidates from a CSV or NDJSON upload (on_duplicate: skip or update)"""
+    fmt = importer.detect_format(file, format)
+    if not fmt:
+        raise HTTPException(status_code=400, detail="Unsupported format; upload a .csv or .ndjson file or pass format=csv|ndjson")
+    
+    if on_duplicate not in ("skip", "update"):
+        raise HTTPException(status_code=400, detail="on_duplicate must be 'skip' or 'update'")
+    
+    report = await importer.import_candidates(db, file, fmt, batch_size=batch_size, on_duplicate=on_duplicate)
+    if report["inserted"] or report["updated"]:
+        # Too many rows to describe one by one; clients reload their candidate list
+        events.publish("candidate", "imported", inserted=report["inserted"], updated=report["updated"])
+    return report
+
 @app.get("/api/candidates/{candidate_id}", response_model=schemas.Candidate)
 async def get_candidate(
     candidate_id: int,
-    db: AsyncSession = Depends(get_db),
+    request: Request,
+    db: AsyncSession = Depends(get_read_db),
     user: dict = Depends(get_current_user)
 ):
     """Get a specific candidate by ID"""
-    result = await db.execute(
-        select(models.Candidate).where(models.Candidate.id == candidate_id)
-    )
-    candidate = result.scalar_one_or_none()
-    
-    if not candidate:
-        raise HTTPException(status_code=404, detail="Candidate not found")
+    async def load(headers):
+        result = await db.execute(
+            select(models.Candidate).where(models.Candidate.id == candidate_id)
+        )
+        candidate = result.scalar_one_or_none()
+        
+        if not candidate:
+            raise HTTPException(status_code=404, detail="Candidate not found")
+        
+        return candidate
     
-    return candidate
+    return await cache.cached_response(request, ("candidates",), load, schemas.Candidate)
 
 @app.put("/api/candidates/{candidate_id}", response_model=schemas.Candidate)
 async def update_candidate(
@@ -431,8 +529,12 @@ async def update_candidate(
     for field, value in update_data.items():
         setattr(db_candidate, field, value)
     
+    if 'skills' in update_data:
+        await tasks.enqueue(db, "skills.index_candidates", {"candidate_ids": [db_candidate.id]})
+    
     await db.commit()
     await db.refresh(db_candidate)
+    events.publish("candidate", "updated", db_candidate.id, fields=events.changed_fields(db_candidate, update_data))
     return db_candidate
 
 @app.delete("/api/candidates/{candidate_id}")
@@ -452,49 +554,279 @@ async def delete_candidate(
     
     await db.delete(db_candidate)
     await db.commit()
+    events.publish("candidate", "deleted", candidate_id)
     return {"message": "Candidate deleted successfully"}
 
+@app.post("/api/candidates/{candidate_id}/resume", response_model=schemas.Candidate)
+async def upload_resume(
+    candidate_id: int,
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    user: dict = Depends(get_current_user)
+):
+    """Upload a resume (multipart field "file"), streamed to content-addressed storage"""
+    result = await db.execute(
+        select(models.Candidate).where(models.Candidate.id == candidate_id)
+    )
+    db_candidate = result.scalar_one_or_none()
+
+    if not db_candidate:
+        raise HTTPException(status_code=404, detail="Candidate not found")
+
+    stored = await resumes.receive_upload(request)
+    await resumes.attach(db, db_candidate, stored)
+    queued = await extraction.refresh_candidate(db, db_candidate)
+    await db.commit()
+    await db.refresh(db_candidate)
+    if queued:
+        extraction.notify()
+    events.publish("candidate", "updated", db_candidate.id, fields={
+        "resume_url": db_candidate.resume_url, "resume_filename": db_candidate.resume_filename
+    })
+    return db_candidate
+
+@app.api_route("/api/candidates/{candidate_id}/resume", methods=["GET", "HEAD"])
+async def download_resume(
+    candidate_id: int,
+    request: Request,
+    db: AsyncSession = Depends(get_read_db),
+    user: dict = Depends(get_current_user)
+):
+    """Download a candidate's resume; supports Range, If-Range and conditional GET"""
+    result = await db.execute(
+        select(models.Candidate.resume_filename, models.ResumeFile)
+        .join(models.ResumeFile, models.ResumeFile.sha256 == models.Candidate.resume_sha256)
+        .where(models.Candidate.id == candidate_id)
+    )
+    row = result.first()
+
+    if not row:
+        raise HTTPException(status_code=404, detail="Resume not found")
+
+    filename, stored = row
+    return resumes.file_response(request, stored, filename)
+
+@app.delete("/api/candidates/{candidate_id}/resume")
+async def delete_resume(
+    candidate_id: int,
+    db: AsyncSession = Depends(get_db),
+    user: dict = Depends(get_current_user)
+):
+    """Detach a candidate's resume; the file is reclaimed by `python resumes.py gc`"""
+    result = await db.execute(
+        select(models.Candidate).where(models.Candidate.id == candidate_id)
+    )
+    db_candidate = result.scalar_one_or_none()
+
+    if not db_candidate or not db_candidate.resume_sha256:
+        raise HTTPException(status_code=404, detail="Resume not found")
+
+    db_candidate.resume_sha256 = None
+    db_candidate.resume_filename = None
+    db_candidate.resume_url = None
+    await extraction.refresh_candidate(db, db_candidate)
+    await db.commit()
+    events.publish("candidate", "updated", candidate_id, fields={"resume_url": None, "resume_filename": None})
+    return {"message": "Resume deleted successfully"}
+
+@app.get("/api/resumes/extraction", response_model=schemas.ExtractionStatus)
+async def resume_extraction_status(
+    db: AsyncSession = Depends(get_read_db),
+    user: dict = Depends(get_current_user)
+):
+    """Resume text extraction queue depth, throughput and recent failures"""
+    return await extraction.status(db)
+
+# ============== TASKS API ==============
+
+@app.get("/api/tasks", response_model=List[schemas.Task])
+async def list_tasks(
+    status: Optional[str] = tasks.DEAD,
+    name: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+    db: AsyncSession = Depends(get_read_db),
+    user: dict = Depends(get_current_user)
+):
+    """Background tasks, newest first (the dead-letter list by default)"""
+    if status and status not in tasks.STATUSES:
+        raise HTTPException(status_code=400, detail=f"status must be one of: {', '.join(tasks.STATUSES)}")
+    return await tasks.list_tasks(db, status=status, name=name, limit=limit)
+
+@app.get("/api/tasks/stats", response_model=schemas.TaskStats)
+async def task_stats(
+    db: AsyncSession = Depends(get_read_db),
+    user: dict = Depends(get_current_user)
+):
+    """Task counts by status and how far behind the workers are"""
+    return await tasks.stats(db)
+
+@app.post("/api/tasks/{task_id}/retry")
+async def retry_task(
+    task_id: int,
+    db: AsyncSession = Depends(get_db),
+    user: dict = Depends(get_current_user)
+):
+    """Requeue a dead task with a fresh set of attempts"""
+    await tasks.retry_dead(db, task_id)
+    await db.commit()
+    return {"message": "Task requeued"}
+
+@app.delete("/api/tasks/{task_id}")
+async def discard_task(
+    task_id: int,
+    db: AsyncSession = Depends(get_db),
+    user: dict = Depends(get_current_user)
+):
+    """Drop a dead task from the dead-letter list"""
+    await tasks.discard_dead(db, task_id)
+    await db.commit()
+    return {"message": "Task discarded"}
+
+# ============== MATCHING API ==============
+
+@app.get("/api/jobs/{job_id}/matches", response_model=List[schemas.Match])
+async def job_matches(
+    job_id: int,
+    limit: int = Query(20, ge=1, le=200),
+    db: AsyncSession = Depends(get_read_db),
+    user: dict = Depends(get_current_user)
+):
+    """Candidates ranked by how well they fit a job, with the terms behind each score"""
+    result = await db.execute(select(models.Job).where(models.Job.id == job_id))
+    job = result.scalar_one_or_none()
+    
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    return await matching.engine.match_candidates(db, job, limit)
+
+@app.get("/api/candidates/{candidate_id}/matches", response_model=List[schemas.Match])
+async def candidate_matches(
+    candidate_id: int,
+    limit: int = Query(20, ge=1, le=200),
+    db: AsyncSession = Depends(get_read_db),
+    user: dict = Depends(get_current_user)
+):
+    """Active jobs ranked by how well a candidate fits them"""
+    result = await db.execute(select(models.Candidate).where(models.Candidate.id == candidate_id))
+    candidate = result.scalar_one_or_none()
+    
+    if not candidate:
+        raise HTTPException(status_code=404, detail="Candidate not found")
+    
+    return await matching.engine.match_jobs(db, candidate, limit)
+
+@app.get("/api/matching/status", response_model=schemas.MatchingStatus)
+async def matching_status(
+    db: AsyncSession = Depends(get_read_db),
+    user: dict = Depends(get_current_user)
+):
+    """Matching index generation, size and pending incremental changes"""
+    return await matching.engine.status(db)
+
+# ============== SKILLS API ==============
+
+@app.get("/api/skills", response_model=List[schemas.SkillFacet])
+async def list_skills(
+    prefix: Optional[str] = None,
+    limit: int = 50,
+    db: AsyncSession = Depends(get_read_db),
+    user: dict = Depends(get_current_user)
+):
+    """Most common candidate skills, optionally filtered by prefix"""
+    return await skill_index.top_skills(db, prefix=prefix, limit=limit)
+
+@app.get("/api/skills/candidates", response_model=schemas.CandidateSkillSearch)
+async def filter_candidates_by_skills(
+    skills: List[str] = Query(...),
+    match: str = "any",
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    response: Response = None,
+    db: AsyncSession = Depends(get_read_db),
+    user: dict = Depends(get_current_user)
+):
+    """Candidates having any/all of the given skills, with skill facet counts for the result set"""
+    if match not in ("any", "all"):
+        raise HTTPException(status_code=400, detail="match must be 'any' or 'all'")
+    
+    # Accept both ?skills=a&skills=b and ?skills=a,b
+    requested = [s for value in skills for s in value.split(",") if s.strip()]
+    if not requested:
+        raise HTTPException(status_code=400, detail="At least one skill is required")
+    
+    page, total, facets = await skill_index.filter_candidates(
+        db,
+        requested,
+        match_all=match == "all",
+        skip=skip,
+        limit=limit,
+        cursor=pagination.decode_cursor(cursor) if cursor else None
+    )
+    pagination.set_cursor_headers(response, page)
+    return {"candidates": page.items, "total": total, "facets": facets}
+
 # ============== APPLICATION TRACKING API ==============
 
-@app.get("/api/applications", response_model=List[schemas.ApplicationWithDetails])
+@app.get(
+    "/api/applications",
+    response_model=Union[List[schemas.ApplicationWithDetails], List[schemas.ApplicationSlim]]
+)
 async def list_applications(
+    request: Request,
     job_id: Optional[int] = None,
     candidate_id: Optional[int] = None,
     status: Optional[str] = None,
     skip: int = 0,
     limit: int = 100,
-    db: AsyncSession = Depends(get_db),
+    slim: bool = False,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db),
     user: dict = Depends(get_current_user)
 ):
-    """List all applications with optional filters"""
-    query = select(models.Application)
-    
-    if job_id:
-        query = query.where(models.Application.job_id == job_id)
-    
-    if candidate_id:
-        query = query.where(models.Application.candidate_id == candidate_id)
-    
-    if status:
-        query = query.where(models.Application.status == status)
-    
-    query = query.offset(skip).limit(limit).order_by(models.Application.applied_at.desc())
-    result = await db.execute(query)
-    applications = result.scalars().all()
+    """List all applications with optional filters (slim=true returns only job title and candidate name/email)"""
+    async def load(headers):
+        page = await queries.list_applications_with_details(
+            db,
+            job_id=job_id,
+            candidate_id=candidate_id,
+            status=status,
+            skip=skip,
+            limit=limit,
+            slim=slim,
+            cursor=pagination.decode_cursor(cursor) if cursor else None
+        )
+        headers.update(pagination.cursor_headers(page))
+        return page.items
     
-    # Load related job and candidate data
-    applications_with_details = []
-    for app in applications:
-        job_result = await db.execute(select(models.Job).where(models.Job.id == app.job_id))
-        candidate_result = await db.execute(select(models.Candidate).where(models.Candidate.id == app.candidate_id))
-        
-        app_dict = {c.name: getattr(app, c.name) for c in app.__table__.columns}
-        app_dict['job'] = job_result.scalar_one()
-        app_dict['candidate'] = candidate_result.scalar_one()
-        
-        applications_with_details.append(schemas.ApplicationWithDetails(**app_dict))
+    response_model = List[schemas.ApplicationSlim] if slim else List[schemas.ApplicationWithDetails]
+    return await cache.cached_response(
+        request, ("applications", "jobs", "candidates"), load, response_model, fast=True
+    )
+
+@app.get("/api/applications/export")
+async def export_applications(
+    format: str = "csv",
+    job_id: Optional[int] = None,
+    candidate_id: Optional[int] = None,
+    status: Optional[str] = None,
+    applied_from: Optional[datetime] = None,
+    applied_to: Optional[datetime] = None,
+    chunk_size: int = Query(1000, ge=100, le=10000),
+    user: dict = Depends(get_current_user)
+):
+    """Stream applications with job and candidate details as CSV or NDJSON"""
+    if format not in exporter.MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail="format must be 'csv' or 'ndjson'")
     
-    return applications_with_details
+    query = exporter.export_query(job_id, candidate_id, status, applied_from, applied_to)
+    filename = f"applications-{datetime.utcnow():%Y%m%d-%H%M%S}.{format}"
+    return StreamingResponse(
+        exporter.stream_export(query, format, chunk_size=chunk_size),
+        media_type=exporter.MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
 
 @app.post("/api/applications", response_model=schemas.Application)
 async def create_application(
@@ -503,22 +835,22 @@ async def create_application(
     user: dict = Depends(get_current_user)
 ):
     """Create a new job application"""
-    # Check if application already exists
-    result = await db.execute(
-        select(models.Application).where(
-            models.Application.job_id == application.job_id,
-            models.Application.candidate_id == application.candidate_id
-        )
-    )
-    existing = result.scalar_one_or_none()
-    
-    if existing:
-        raise HTTPException(status_code=400, detail="Application already exists for this job and candidate")
-    
+    # Uniqueness is enforced by uq_applications_job_candidate, so concurrent
+    # requests can't both succeed and no pre-check query is needed
     db_application = models.Application(**application.model_dump())
     db.add(db_application)
-    await db.commit()
+    try:
+        await db.commit()
+    except IntegrityError as e:
+        await db.rollback()
+        if queries.is_unique_violation(e, "uq_applications_job_candidate", "applications.job_id, applications.candidate_id"):
+            raise HTTPException(status_code=400, detail="Application already exists for this job and candidate")
+        raise
     await db.refresh(db_application)
+    events.publish(
+        "application", "created", db_application.id,
+        status=db_application.status, fields=queries.row_to_dict(db_application)
+    )
     return db_application
 
 @app.put("/api/applications/{application_id}", response_model=schemas.Application)
@@ -557,65 +889,251 @@ async def update_application(
     
     await db.commit()
     await db.refresh(db_application)
+    events.publish(
+        "application", "updated", application_id,
+        status=db_application.status, fields=events.changed_fields(db_application, update_data)
+    )
     return db_application
 
+@app.post("/api/applications/bulk-status", response_model=schemas.BulkStatusResult)
+async def bulk_update_application_status(
+    bulk_update: schemas.BulkStatusUpdate,
+    db: AsyncSession = Depends(get_db),
+    user: dict = Depends(get_current_user)
+):
+    """Move a set of applications (by id or by filter) to a new status in one transaction"""
+    has_ids = bulk_update.application_ids is not None
+    has_filter = bulk_update.filter is not None and any(
+        value is not None for value in bulk_update.filter.model_dump().values()
+    )
+    if has_ids == has_filter:
+        raise HTTPException(status_code=400, detail="Provide either application_ids or a non-empty filter")
+    
+    criteria = bulk_update.filter.model_dump() if has_filter else {}
+    result = await transitions.bulk_transition(
+        db,
+        bulk_update.status,
+        changed_by=user['id'],
+        notes=bulk_update.notes,
+        application_ids=bulk_update.application_ids,
+        **criteria
+    )
+    await db.commit()
+    if result["updated"]:
+        moved = [item["application_id"] for item in result["results"] if item["result"] == "updated"]
+        events.publish("application", "bulk_updated", status=result["status"], ids=moved)
+    return result
+
 @app.get("/api/applications/{application_id}/history", response_model=List[schemas.StatusHistory])
 async def get_application_history(
     application_id: int,
-    db: AsyncSession = Depends(get_db),
+    request: Request,
+    db: AsyncSession = Depends(get_read_db),
     user: dict = Depends(get_current_user)
 ):
     """Get status history for an application"""
-    result = await db.execute(
-        select(models.StatusHistory)
-        .where(models.StatusHistory.application_id == application_id)
-        .order_by(models.StatusHistory.changed_at.desc())
+    async def load(headers):
+        result = await db.execute(
+            select(models.StatusHistory)
+            .where(models.StatusHistory.application_id == application_id)
+            .order_by(models.StatusHistory.changed_at.desc())
+        )
+        return result.scalars().all()
+    
+    return await cache.cached_response(
+        request, ("status_history",), load, List[schemas.StatusHistory], fast=True
+    )
+
+# ============== LIVE EVENTS API ==============
+
+@app.get("/api/events")
+async def stream_events(
+    request: Request,
+    entities: Optional[str] = None,
+    user: dict = Depends(get_current_user)
+):
+    """Server-Sent Events stream of job / candidate / application changes (entities=job,application,...)"""
+    subscription = events.hub.subscribe(
+        entities=events.parse_entities(entities),
+        last_event_id=request.headers.get("last-event-id")
+    )
+    return StreamingResponse(
+        events.stream(request, subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+# ============== DELTA SYNC API ==============
+
+@app.get("/api/sync", response_model=schemas.SyncResponse)
+async def sync_changes(
+    since: Optional[str] = None,
+    entities: Optional[str] = None,
+    limit: int = Query(500, ge=1, le=5000),
+    db: AsyncSession = Depends(get_read_db),
+    user: dict = Depends(get_current_user)
+):
+    """Jobs, candidates and applications changed since a sync token, plus deletions (call again while has_more)"""
+    requested = None
+    if entities:
+        requested = [e.strip() for e in entities.split(",") if e.strip()]
+        unknown = set(requested) - set(sync.SYNC_ENTITIES)
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown entities: {', '.join(sorted(unknown))}")
+    
+    return await sync.changes_since(db, since, entities=requested, limit=limit)
+
+# ============== SEARCH API ==============
+
+@app.get("/api/search/jobs", response_model=List[schemas.JobSearchResult])
+async def search_jobs(
+    q: str,
+    limit: int = 20,
+    db: AsyncSession = Depends(get_read_db),
+    user: dict = Depends(get_current_user)
+):
+    """Full-text job search ranked by relevance, with highlighted snippets"""
+    return await fulltext.ranked_search(db, models.Job, q, limit=limit)
+
+@app.get("/api/search/candidates", response_model=List[schemas.CandidateSearchResult])
+async def search_candidates(
+    q: str,
+    limit: int = 20,
+    db: AsyncSession = Depends(get_read_db),
+    user: dict = Depends(get_current_user)
+):
+    """Full-text candidate search ranked by relevance, with highlighted snippets"""
+    return await fulltext.ranked_search(db, models.Candidate, q, limit=limit)
+
+# ============== PIPELINE ANALYTICS API ==============
+
+def _analytics_range(date_from: Optional[date], date_to: Optional[date]):
+    date_to = date_to or datetime.utcnow().date()
+    date_from = date_from or date_to - timedelta(days=29)
+    if date_from > date_to:
+        raise HTTPException(status_code=400, detail="date_from must not be after date_to")
+    return date_from, date_to
+
+@app.get("/api/analytics/funnel", response_model=schemas.FunnelReport)
+async def pipeline_funnel(
+    request: Request,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    job_id: Optional[int] = None,
+    recruiter_id: Optional[int] = None,
+    group_by: Optional[str] = Query(None, pattern="^(job|recruiter)$"),
+    limit: int = Query(50, ge=1, le=500),
+    db: AsyncSession = Depends(get_read_db),
+    user: dict = Depends(get_current_user)
+):
+    """Applications entering each stage and stage-to-stage conversion (default: last 30 days)"""
+    date_from, date_to = _analytics_range(date_from, date_to)
+
+    async def load(headers):
+        groups = await analytics.funnel(db, date_from, date_to, job_id, recruiter_id, group_by, limit)
+        return {"date_from": date_from, "date_to": date_to, "group_by": group_by, "groups": groups}
+
+    return await cache.cached_response(request, ("applications", "status_history"), load, schemas.FunnelReport)
+
+@app.get("/api/analytics/time-in-stage", response_model=schemas.TimeInStageReport)
+async def pipeline_time_in_stage(
+    request: Request,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    job_id: Optional[int] = None,
+    recruiter_id: Optional[int] = None,
+    group_by: Optional[str] = Query(None, pattern="^(job|recruiter)$"),
+    limit: int = Query(50, ge=1, le=500),
+    db: AsyncSession = Depends(get_read_db),
+    user: dict = Depends(get_current_user)
+):
+    """Mean / median / p90 hours spent in each stage, by the day applications left it"""
+    date_from, date_to = _analytics_range(date_from, date_to)
+
+    async def load(headers):
+        groups = await analytics.time_in_stage(db, date_from, date_to, job_id, recruiter_id, group_by, limit)
+        return {"date_from": date_from, "date_to": date_to, "group_by": group_by, "groups": groups}
+
+    return await cache.cached_response(request, ("applications", "status_history"), load, schemas.TimeInStageReport)
+
+# ============== TRENDS API ==============
+
+@app.get("/api/trends", response_model=schemas.TrendReport)
+async def get_trends(
+    request: Request,
+    metric: str = Query("applications", pattern="^(applications|hires|candidates)$"),
+    bucket: str = Query("day", pattern="^(day|week|month)$"),
+    days: int = Query(trends.TRENDS_DEFAULT_DAYS, ge=1, le=3660),
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    job_id: Optional[int] = None,
+    recruiter_id: Optional[int] = None,
+    group_by: Optional[str] = Query(None, pattern="^(job|recruiter)$"),
+    limit: int = Query(20, ge=1, le=200),
+    db: AsyncSession = Depends(get_read_db),
+    user: dict = Depends(get_current_user)
+):
+    """Zero-filled daily / weekly / monthly counts (default: the last 90 days, per day)"""
+    date_to = date_to or datetime.utcnow().date()
+    date_from, date_to = _analytics_range(date_from or date_to - timedelta(days=days - 1), date_to)
+
+    async def load(headers):
+        series = await trends.series(db, metric, date_from, date_to, bucket, job_id, recruiter_id, group_by, limit)
+        return {
+            "metric": metric, "bucket": bucket, "date_from": date_from, "date_to": date_to,
+            "group_by": group_by, "series": series
+        }
+
+    return await cache.cached_response(
+        request, ("applications", "candidates", "status_history"), load, schemas.TrendReport
     )
-    return result.scalars().all()
 
 # ============== DASHBOARD STATS API ==============
 
 @app.get("/api/stats")
 async def get_dashboard_stats(
-    db: AsyncSession = Depends(get_db),
+    request: Request,
+    db: AsyncSession = Depends(get_read_db),
     user: dict = Depends(get_current_user)
 ):
     """Get dashboard statistics"""
-    # Total jobs
-    jobs_count = await db.execute(select(func.count(models.Job.id)))
-    total_jobs = jobs_count.scalar()
+    async def load(headers):
+        # Counters are maintained on every write, so this is a single read
+        counters = await stats.read_counters(db)
+        return stats.dashboard_stats(counters)
     
-    # Active jobs
-    active_jobs_count = await db.execute(
-        select(func.count(models.Job.id)).where(models.Job.status == models.JobStatus.ACTIVE)
-    )
-    active_jobs = active_jobs_count.scalar()
-    
-    # Total candidates
-    candidates_count = await db.execute(select(func.count(models.Candidate.id)))
-    total_candidates = candidates_count.scalar()
-    
-    # Total applications
-    applications_count = await db.execute(select(func.count(models.Application.id)))
-    total_applications = applications_count.scalar()
-    
-    # Applications by status
-    status_counts = {}
-    for status in models.ApplicationStatus:
-        status_result = await db.execute(
-            select(func.count(models.Application.id)).where(
-                models.Application.status == status
-            )
-        )
-        status_counts[status.value] = status_result.scalar()
-    
-    return {
-        "total_jobs": total_jobs,
-        "active_jobs": active_jobs,
-        "total_candidates": total_candidates,
-        "total_applications": total_applications,
-        "applications_by_status": status_counts
-    }
+    return await cache.cached_response(request, ("jobs", "candidates", "applications"), load)
+
+# ============== PROFILER API ==============
+
+@app.get("/api/profiles", include_in_schema=False, dependencies=[Depends(require_profiler_token)])
+async def list_profiles(
+    endpoint: Optional[str] = None,
+    route: Optional[str] = None,
+    sort: str = Query("recent", pattern="^(recent|slowest)$"),
+    limit: int = Query(20, ge=1, le=200)
+):
+    """Stored request profiles, e.g. ?endpoint=list_applications&sort=slowest"""
+    return await asyncio.to_thread(profiler.list_profiles, endpoint, route, sort, limit)
+
+@app.get("/api/profiles/{profile_id}", include_in_schema=False, dependencies=[Depends(require_profiler_token)])
+async def get_profile_stacks(profile_id: str):
+    """Collapsed stacks of one profile, for flamegraph.pl or speedscope"""
+    stacks = await asyncio.to_thread(profiler.read_stacks, profile_id)
+    if stacks is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return PlainTextResponse(stacks)
+
+# ============== METRICS ==============
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics(request: Request):
+    """Request latency and SQL usage per route in Prometheus text format"""
+    if metrics.METRICS_TOKEN and not secrets.compare_digest(
+        request.headers.get("authorization", "").encode(), f"Bearer {metrics.METRICS_TOKEN}".encode()
+    ):
+        raise HTTPException(status_code=401, detail="Invalid metrics token")
+    return PlainTextResponse(metrics.render(), media_type=metrics.CONTENT_TYPE)
 
 if __name__ == "__main__":
     import uvicorn
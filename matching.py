@@ -0,0 +1,685 @@
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+import asyncio
+import heapq
+import json
+import logging
+import math
+import os
+import re
+import shutil
+import sys
+import time
+import metrics
+import models
+import resume_text
+import skills as skill_index
+import sync
+from database import async_session
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency: the same index, scored in Python
+    np = None
+
+# Candidate <-> job matching with TF-IDF term vectors.
+#
+# A job is described by its title, requirements and description, a
+# candidate by their skills (profile and resume-detected) and current
+# position. Both become L2-normalized TF-IDF vectors over one vocabulary of
+# words and multi-word skills ("machine learning"); a match score is the
+# cosine similarity of the two, scaled down when the candidate has fewer
+# years than the job asks for ("5+ years"). Each match lists the terms it
+# came from, and their contributions add up to the score.
+#
+# An index generation is a directory under MATCHING_INDEX_DIR holding, per
+# side, a term-major sparse matrix (term_ptr / rows / weights postings) as
+# raw little-endian arrays. NumPy memory-maps them, so a restart costs no
+# rebuild, and a query only touches the postings of its own terms: ranking
+# 500k candidates is a few vectorized gathers and adds plus an argpartition
+# for the top k. Without NumPy the same files are read into arrays and
+# scored in Python, which is fine for small installs.
+#
+# Writes are picked up incrementally: before each query the engine applies
+# the rows changed since the index was built (sync.changes_since, the delta
+# sync feed) to an in-memory delta that shadows the memory-mapped matrix.
+# After a restart the delta is replayed from the position stored with the
+# index. Requests never wait for a build: until the first generation is
+# published they get a 503. A full rebuild, which also refreshes the IDF
+# weights, runs daily on the task queue, in the background once the delta
+# passes MATCHING_MAX_DELTA documents or the index falls out of the
+# tombstone retention window, or by hand:
+#
+#   python matching.py rebuild
+#   python matching.py status
+
+MATCHING_INDEX_DIR = os.getenv("MATCHING_INDEX_DIR", "./storage/matching")
+# Changed documents kept in memory before a background rebuild folds them in
+MATCHING_MAX_DELTA = int(os.getenv("MATCHING_MAX_DELTA", 10000))
+# Rows read per query while building or catching up
+MATCHING_BATCH_SIZE = int(os.getenv("MATCHING_BATCH_SIZE", 2000))
+# Share of the score a candidate with no experience keeps against a job's required years
+MATCHING_EXPERIENCE_FLOOR = float(os.getenv("MATCHING_EXPERIENCE_FLOOR", 0.5))
+# Terms listed per match
+MATCHING_EXPLAIN_TERMS = int(os.getenv("MATCHING_EXPLAIN_TERMS", 8))
+
+# Field weights: repeated terms are damped with 1 + log(tf), so these mostly
+# decide which field a shared word counts for
+JOB_FIELDS = (("title", 3.0), ("requirements", 2.0), ("description", 1.0))
+CANDIDATE_FIELDS = (("current_position", 2.0),)
+CANDIDATE_SKILL_FIELDS = (("skills", 3.0), ("resume_skills", 2.0))
+
+SIDES = ("jobs", "candidates")
+CURRENT = "CURRENT"
+
+logger = logging.getLogger("hireops.matching")
+
+match_time = metrics.Histogram(
+    "hireops_match_seconds", "Time to rank matches by the side ranked", ("side",), metrics.LATENCY_BUCKETS
+)
+rebuild_time = metrics.Histogram(
+    "hireops_match_rebuild_seconds", "Full matching index rebuilds", (), metrics.LATENCY_BUCKETS
+)
+metrics.register(match_time, rebuild_time)
+
+# ============== TERMS ==============
+
+_STOPWORDS = frozenset("""
+a about across all also an and any are as at be been but by can do etc for
+from has have if in into is it its more must not of on or our should so such
+than that the their them there these they this to us was we were what when
+which who will with within work working you your year years experience
+""".split())
+
+_YEARS = re.compile(r"\b(\d{1,2})\s*\+?\s*(?:(?:-|–|to)\s*\d{1,2}\s*)?(?:years?|yrs?)\b", re.I)
+
+class Phrases(set):
+    """Multi-word terms to recognize in free text"""
+
+    def __init__(self, terms=()):
+        super().__init__()
+        self.longest = 0
+        for term in terms:
+            self.add(term)
+
+    def add(self, term: str):
+        super().add(term)
+        self.longest = max(self.longest, term.count(" ") + 1)
+
+def _words(tokens: List[str]) -> List[str]:
+    return [t for t in tokens if len(t) > 1 and not t[0].isdigit() and t not in _STOPWORDS]
+
+def _phrases_in(tokens: List[str], phrases: Phrases) -> List[str]:
+    found = []
+    for start in range(len(tokens)):
+        for length in range(2, min(phrases.longest, len(tokens) - start) + 1):
+            gram = " ".join(tokens[start:start + length])
+            if gram in phrases:
+                found.append(gram)
+    return found
+
+def _add_text(tf: Counter, text: Optional[str], weight: float, phrases: Phrases):
+    if not text:
+        return
+    tokens = resume_text.tokenize(text)
+    for term in _words(tokens) + _phrases_in(tokens, phrases):
+        tf[term] += weight
+
+def _add_skills(tf: Counter, raw: Optional[str], weight: float):
+    for name in skill_index.parse_skills(raw):
+        tokens = resume_text.tokenize(name)
+        if len(tokens) > 1:
+            tf[" ".join(tokens)] += weight
+        for term in _words(tokens):
+            tf[term] += weight
+
+def job_terms(job, phrases: Phrases) -> Counter:
+    """Weighted term frequencies of a job (any object with the job's columns)"""
+    tf = Counter()
+    for field, weight in JOB_FIELDS:
+        _add_text(tf, getattr(job, field), weight, phrases)
+    return tf
+
+def candidate_terms(candidate, phrases: Phrases) -> Counter:
+    """Weighted term frequencies of a candidate (any object with the candidate's columns)"""
+    tf = Counter()
+    for field, weight in CANDIDATE_SKILL_FIELDS:
+        _add_skills(tf, getattr(candidate, field), weight)
+    for field, weight in CANDIDATE_FIELDS:
+        _add_text(tf, getattr(candidate, field), weight, phrases)
+    return tf
+
+def required_years(job) -> Optional[float]:
+    """Years of experience a job asks for ("5+ years", "3-5 yrs"), if it says"""
+    for text in (job.requirements, job.description, job.title):
+        match = _YEARS.search(text or "")
+        if match:
+            return float(match.group(1))
+    return None
+
+def weigh(tf: Dict[str, float], idf) -> Dict[str, float]:
+    """L2-normalized TF-IDF vector; idf maps a term to its weight"""
+    vector = {term: (1.0 + math.log(count)) * idf(term) for term, count in tf.items()}
+    norm = math.sqrt(sum(w * w for w in vector.values()))
+    return {term: w / norm for term, w in vector.items()} if norm else {}
+
+def _known(value) -> Optional[float]:
+    return None if value is None or math.isnan(value) else float(value)
+
+def experience_factor(years: Optional[float], required: Optional[float]) -> float:
+    """Score multiplier for a candidate with `years` against a job requiring `required`"""
+    years, required = _known(years), _known(required)
+    if years is None or not required or years >= required:
+        return 1.0
+    return MATCHING_EXPERIENCE_FLOOR + (1.0 - MATCHING_EXPERIENCE_FLOOR) * max(years, 0.0) / required
+
+def _experience_factors(years, required):
+    # Vectorized experience_factor; either side may be an array, NaN is unknown
+    years = np.asarray(np.nan if years is None else years, dtype=np.float32)
+    required = np.asarray(np.nan if required is None else required, dtype=np.float32)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        short = (years < required) & (required > 0)
+        partial = MATCHING_EXPERIENCE_FLOOR + (1.0 - MATCHING_EXPERIENCE_FLOOR) * np.maximum(years, 0) / required
+    return np.where(short, partial, 1.0).astype(np.float32)
+
+# ============== STORAGE ==============
+
+_DTYPES = {"q": "<i8", "i": "<i4", "f": "<f4"}
+
+def _write_array(path: str, values, typecode: str):
+    if np is not None and isinstance(values, np.ndarray):
+        values.astype(_DTYPES[typecode], copy=False).tofile(path)
+        return
+    values = array(typecode, values)
+    if sys.byteorder == "big":
+        values.byteswap()
+    with open(path, "wb") as f:
+        values.tofile(f)
+
+def _read_array(path: str, typecode: str, count: int):
+    if np is not None:
+        if count == 0:
+            return np.zeros(0, dtype=_DTYPES[typecode])
+        return np.memmap(path, dtype=_DTYPES[typecode], mode="r", shape=(count,))
+    values = array(typecode)
+    with open(path, "rb") as f:
+        values.fromfile(f, count)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+def _as_numpy(values: array, dtype):
+    return np.frombuffer(values, dtype=dtype) if len(values) else np.zeros(0, dtype=dtype)
+
+class Segment:
+    """One side of an index generation: its documents and term-major postings"""
+
+    def __init__(self, path: str, documents: int, postings: int, terms: int):
+        self.size = documents
+        self.doc_ids = _read_array(f"{path}.ids", "q", documents)  # ascending
+        self.years = _read_array(f"{path}.years", "f", documents)  # NaN when unknown
+        self.term_ptr = _read_array(f"{path}.ptr", "q", terms + 1)
+        self.rows = _read_array(f"{path}.rows", "i", postings)  # ascending within a term
+        self.weights = _read_array(f"{path}.weights", "f", postings)
+        # Rows superseded by the delta or deleted
+        self.live = np.ones(documents, dtype=bool) if np is not None else bytearray(b"\x01") * documents
+
+    def row_of(self, doc_id: int) -> Optional[int]:
+        row = bisect_left(self.doc_ids, doc_id)
+        return row if row < self.size and self.doc_ids[row] == doc_id else None
+
+    def kill(self, doc_id: int):
+        row = self.row_of(doc_id)
+        if row is not None:
+            self.live[row] = False
+
+    def score(self, query: List[Tuple[int, float]]):
+        """Dot products with a query of (term id, weight): an array by row, or {row: score} without NumPy"""
+        if np is not None:
+            scores = np.zeros(self.size, dtype=np.float32)
+            for term_id, weight in query:
+                start, end = self.term_ptr[term_id], self.term_ptr[term_id + 1]
+                if start < end:
+                    # Rows are unique within a term, so fancy-index += is exact
+                    scores[self.rows[start:end]] += np.float32(weight) * self.weights[start:end]
+            return scores
+        scores = {}
+        for term_id, weight in query:
+            for i in range(self.term_ptr[term_id], self.term_ptr[term_id + 1]):
+                row = self.rows[i]
+                scores[row] = scores.get(row, 0.0) + weight * self.weights[i]
+        return scores
+
+    def weight(self, row: int, term_id: int) -> float:
+        start, end = int(self.term_ptr[term_id]), int(self.term_ptr[term_id + 1])
+        i = bisect_left(self.rows, row, start, end)
+        return float(self.weights[i]) if i < end and self.rows[i] == row else 0.0
+
+class _SideBuilder:
+    """Accumulates one side's documents as (term, row, tf) triples"""
+
+    def __init__(self):
+        self.doc_ids, self.years = array("q"), array("f")
+        self.terms, self.rows, self.tf = array("i"), array("i"), array("f")
+
+    def add(self, doc_id: int, tf: Dict[str, float], years: Optional[float], vocabulary: Dict[str, int], df: List[int]):
+        row = len(self.doc_ids)
+        self.doc_ids.append(doc_id)
+        self.years.append(math.nan if years is None else years)
+        for term, count in tf.items():
+            term_id = vocabulary.get(term)
+            if term_id is None:
+                term_id = vocabulary[term] = len(df)
+                df.append(0)
+            df[term_id] += 1
+            self.terms.append(term_id)
+            self.rows.append(row)
+            self.tf.append(count)
+
+    def write(self, path: str, idf, vocabulary_size: int) -> int:
+        """Normalize, sort term-major and write the arrays; returns the posting count"""
+        documents = len(self.doc_ids)
+        if np is not None:
+            terms = _as_numpy(self.terms, np.int32)
+            rows = _as_numpy(self.rows, np.int32)
+            weights = (1.0 + np.log(_as_numpy(self.tf, np.float32))) * idf[terms]
+            norms = np.sqrt(np.bincount(rows, weights=np.square(weights, dtype=np.float64), minlength=documents))
+            weights = (weights / norms[rows]).astype(np.float32)
+            order = np.argsort(terms, kind="stable")
+            term_ptr = np.zeros(vocabulary_size + 1, dtype=np.int64)
+            np.cumsum(np.bincount(terms, minlength=vocabulary_size), out=term_ptr[1:])
+            rows, weights = rows[order], weights[order]
+        else:
+            weights = [(1.0 + math.log(tf)) * idf[t] for t, tf in zip(self.terms, self.tf)]
+            norms = [0.0] * documents
+            for row, w in zip(self.rows, weights):
+                norms[row] += w * w
+            order = sorted(range(len(weights)), key=self.terms.__getitem__)
+            counts = Counter(self.terms)
+            term_ptr = [0]
+            for term_id in range(vocabulary_size):
+                term_ptr.append(term_ptr[-1] + counts[term_id])
+            rows = [self.rows[i] for i in order]
+            weights = [weights[i] / math.sqrt(norms[self.rows[i]]) for i in order]
+
+        _write_array(f"{path}.ids", self.doc_ids, "q")
+        _write_array(f"{path}.years", self.years, "f")
+        _write_array(f"{path}.ptr", term_ptr, "q")
+        _write_array(f"{path}.rows", rows, "i")
+        _write_array(f"{path}.weights", weights, "f")
+        return len(rows)
+
+class MatchIndex:
+    """A memory-mapped index generation"""
+
+    def __init__(self, directory: str, generation: str):
+        path = os.path.join(directory, generation)
+        with open(os.path.join(path, "manifest.json")) as f:
+            manifest = json.load(f)
+        with open(os.path.join(path, "terms.json")) as f:
+            terms = json.load(f)
+
+        self.generation = generation
+        self.token = manifest["token"]
+        self.built_at = datetime.fromisoformat(manifest["built_at"])
+        self.vocabulary = {term: term_id for term_id, term in enumerate(terms)}
+        self.idf = _read_array(os.path.join(path, "idf"), "f", len(terms))
+        # Terms the index has never seen are rarer than any it has
+        self.default_idf = math.log(1 + manifest["documents"]) + 1.0
+        self.phrases = Phrases(term for term in terms if " " in term)
+        self.segments = {
+            side: Segment(os.path.join(path, side), manifest[side]["documents"], manifest[side]["postings"], len(terms))
+            for side in SIDES
+        }
+
+    def idf_of(self, term: str) -> float:
+        term_id = self.vocabulary.get(term)
+        return self.default_idf if term_id is None else float(self.idf[term_id])
+
+async def _stream(db: AsyncSession, query, id_column):
+    last = 0
+    while True:
+        result = await db.execute(query.where(id_column > last).order_by(id_column).limit(MATCHING_BATCH_SIZE))
+        rows = result.all()
+        for row in rows:
+            yield row
+        if len(rows) < MATCHING_BATCH_SIZE:
+            return
+        last = rows[-1].id
+
+async def _skill_phrases(db: AsyncSession) -> Phrases:
+    result = await db.execute(select(models.Skill.name).where(models.Skill.name.contains(" ")))
+    phrases = Phrases()
+    for (name,) in result:
+        tokens = resume_text.tokenize(name)
+        if len(tokens) > 1:
+            phrases.add(" ".join(tokens))
+    return phrases
+
+def _write_generation(path: str, builders: Dict[str, _SideBuilder], vocabulary: Dict[str, int], df: List[int], manifest: dict):
+    documents = manifest["documents"]
+    idf = [math.log((1 + documents) / (1 + count)) + 1.0 for count in df]
+    if np is not None:
+        idf = np.asarray(idf, dtype=np.float32)
+    terms = [None] * len(df)
+    for term, term_id in vocabulary.items():
+        terms[term_id] = term
+
+    os.makedirs(path)
+    for side, builder in builders.items():
+        postings = builder.write(os.path.join(path, side), idf, len(terms))
+        manifest[side] = {"documents": len(builder.doc_ids), "postings": postings}
+    _write_array(os.path.join(path, "idf"), idf, "f")
+    with open(os.path.join(path, "terms.json"), "w") as f:
+        json.dump(terms, f, ensure_ascii=False)
+    with open(os.path.join(path, "manifest.json"), "w") as f:
+        json.dump(manifest, f)
+
+def _publish(directory: str, generation: str):
+    # CURRENT is swapped atomically; processes holding an older generation
+    # memory-mapped keep reading it until they reload. The previous
+    # generation is kept too, for workers that read CURRENT just before the
+    # swap and are still opening it. Names sort by build time.
+    pointer = os.path.join(directory, CURRENT)
+    with open(pointer + ".tmp", "w") as f:
+        f.write(generation)
+    os.replace(pointer + ".tmp", pointer)
+    older = sorted(
+        name for name in os.listdir(directory)
+        if name != generation and not name.endswith(".tmp") and os.path.isdir(os.path.join(directory, name))
+    )
+    for name in older[:-1]:
+        shutil.rmtree(os.path.join(directory, name), ignore_errors=True)
+
+async def build_index(db: AsyncSession, directory: str = MATCHING_INDEX_DIR) -> str:
+    """Write a new index generation from the database and publish it; returns its name"""
+    started = datetime.utcnow()
+    # The engine replays rows changed from here on, so writes racing the build are not lost
+    position = (started - timedelta(seconds=sync.SYNC_OVERLAP_SECONDS), 0)
+    token = sync.encode_token({"jobs": position, "candidates": position, sync.DELETED: position}, started)
+
+    phrases = await _skill_phrases(db)
+    vocabulary: Dict[str, int] = {}
+    df: List[int] = []
+    builders = {side: _SideBuilder() for side in SIDES}
+
+    candidates = select(
+        models.Candidate.id, models.Candidate.skills, models.Candidate.resume_skills,
+        models.Candidate.current_position, models.Candidate.experience_years
+    )
+    async for row in _stream(db, candidates, models.Candidate.id):
+        builders["candidates"].add(row.id, candidate_terms(row, phrases), row.experience_years, vocabulary, df)
+
+    jobs = (
+        select(models.Job.id, models.Job.title, models.Job.requirements, models.Job.description)
+        .where(models.Job.status == models.JobStatus.ACTIVE)
+    )
+    async for row in _stream(db, jobs, models.Job.id):
+        builders["jobs"].add(row.id, job_terms(row, phrases), required_years(row), vocabulary, df)
+
+    generation = f"{started:%Y%m%dT%H%M%S%f}-{os.getpid()}"
+    manifest = {
+        "token": token,
+        "built_at": started.isoformat(),
+        "documents": sum(len(builder.doc_ids) for builder in builders.values()),
+    }
+    os.makedirs(directory, exist_ok=True)
+    staging = os.path.join(directory, generation + ".tmp")
+    try:
+        await asyncio.to_thread(_write_generation, staging, builders, vocabulary, df, manifest)
+        os.replace(staging, os.path.join(directory, generation))
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+    _publish(directory, generation)
+    return generation
+
+# ============== ENGINE ==============
+
+Hit = Tuple[float, int, Optional[int], float, Optional[float]]  # score, id, base row, factor, doc years
+
+class MatchingEngine:
+    """The current index generation plus the documents changed since it was built"""
+
+    def __init__(self, directory: str = MATCHING_INDEX_DIR):
+        self.directory = directory
+        self.index: Optional[MatchIndex] = None
+        self.token: Optional[str] = None
+        # side -> id -> (normalized vector, years); shadows the index rows
+        self.delta: Dict[str, Dict[int, Tuple[Dict[str, float], Optional[float]]]] = {side: {} for side in SIDES}
+        self.lock = asyncio.Lock()
+        self.build_lock = asyncio.Lock()
+        self.rebuilding: Optional[asyncio.Task] = None
+
+    def _current(self) -> Optional[str]:
+        try:
+            with open(os.path.join(self.directory, CURRENT)) as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    async def rebuild(self, db: AsyncSession, only_if_missing: bool = False) -> Optional[str]:
+        """Build and publish a new generation; loaded by the next refresh()"""
+        async with self.build_lock:
+            if only_if_missing and self._current() is not None:
+                return None
+            started = time.perf_counter()
+            generation = await build_index(db, self.directory)
+            rebuild_time.observe((), time.perf_counter() - started)
+            logger.info("Built matching index %s in %.1fs", generation, time.perf_counter() - started)
+            return generation
+
+    def _rebuild_in_background(self, only_if_missing: bool = False):
+        if self.rebuilding is not None:
+            return
+        async def run():
+            try:
+                async with async_session() as db:
+                    await self.rebuild(db, only_if_missing)
+            except Exception:
+                logger.exception("Background matching index rebuild failed")
+            finally:
+                self.rebuilding = None
+        self.rebuilding = asyncio.create_task(run())
+
+    async def refresh(self, db: AsyncSession):
+        """Switch to the newest generation and apply the writes made since it was built"""
+        if self._current() is None:
+            self._rebuild_in_background(only_if_missing=True)
+            raise HTTPException(
+                status_code=503,
+                detail="Matching index is being built; try again shortly",
+                headers={"Retry-After": "30"}
+            )
+        async with self.lock:
+            try:
+                await self._catch_up(db)
+            except HTTPException as exc:
+                if exc.status_code != 410:
+                    raise
+                # Keep serving the loaded generation; the next refresh after
+                # the new one is published switches to it
+                if self.rebuilding is None:
+                    logger.warning("Matching index predates the tombstone retention window; rebuilding")
+                    self._rebuild_in_background()
+
+    def _load(self, generation: str) -> MatchIndex:
+        # Two publishes while this worker was opening `generation` can prune
+        # it; the generation CURRENT names by then is there
+        for attempt in range(3):
+            try:
+                return MatchIndex(self.directory, generation)
+            except FileNotFoundError:
+                if attempt == 2:
+                    raise
+                generation = self._current()
+
+    async def _catch_up(self, db: AsyncSession):
+        generation = self._current()
+        if self.index is None or self.index.generation != generation:
+            self.index = self._load(generation)
+            self.token = self.index.token
+            self.delta = {side: {} for side in SIDES}
+
+        phrases = self.index.phrases
+        while True:
+            changes = await sync.changes_since(db, self.token, SIDES, MATCHING_BATCH_SIZE)
+            # Deleted rows are never in the same feed as rows, so deletes go first
+            for tombstone in changes[sync.DELETED]:
+                self._remove(tombstone["entity"], tombstone["id"])
+            for job in changes["jobs"]:
+                if job.status == models.JobStatus.ACTIVE:
+                    self._put("jobs", job.id, job_terms(job, phrases), required_years(job))
+                else:
+                    self._remove("jobs", job.id)
+            for candidate in changes["candidates"]:
+                self._put("candidates", candidate.id, candidate_terms(candidate, phrases), candidate.experience_years)
+            self.token = changes["next_token"]
+            if not changes["has_more"]:
+                break
+
+        if sum(map(len, self.delta.values())) > MATCHING_MAX_DELTA:
+            self._rebuild_in_background()
+
+    def _put(self, side: str, doc_id: int, tf: Counter, years: Optional[float]):
+        vector = weigh(tf, self.index.idf_of)
+        self.index.segments[side].kill(doc_id)
+        self.delta[side][doc_id] = (vector, years)
+        for term in vector:
+            if " " in term:
+                self.index.phrases.add(term)
+
+    def _remove(self, side: str, doc_id: int):
+        self.index.segments[side].kill(doc_id)
+        self.delta[side].pop(doc_id, None)
+
+    def _rank(self, side: str, query: Dict[str, float], limit: int, years: Optional[float], required: Optional[float]) -> List[Hit]:
+        # Ranking candidates: `required` is the job's and the documents carry
+        # their experience; ranking jobs: `years` is the candidate's and the
+        # documents carry the years they require
+        def factor(doc_years):
+            return experience_factor(doc_years, required) if side == "candidates" else experience_factor(years, doc_years)
+
+        index = self.index
+        segment = index.segments[side]
+        terms = [(index.vocabulary[t], w) for t, w in query.items() if t in index.vocabulary]
+        hits: List[Hit] = []
+
+        if np is not None and segment.size and terms:
+            scores = segment.score(terms)
+            if side == "candidates":
+                factors = _experience_factors(segment.years, required)
+            else:
+                factors = _experience_factors(years, segment.years)
+            scores *= factors
+            scores[~segment.live] = 0
+            k = min(limit, segment.size)
+            for row in np.argpartition(scores, segment.size - k)[segment.size - k:]:
+                if scores[row] > 0:
+                    hits.append((float(scores[row]), int(segment.doc_ids[row]), int(row), float(factors[row]), _known(segment.years[row])))
+        elif np is None and terms:
+            for row, score in segment.score(terms).items():
+                if segment.live[row] and score > 0:
+                    doc_years = _known(segment.years[row])
+                    f = factor(doc_years)
+                    hits.append((score * f, segment.doc_ids[row], row, f, doc_years))
+
+        for doc_id, (vector, doc_years) in self.delta[side].items():
+            small, large = (query, vector) if len(query) < len(vector) else (vector, query)
+            score = sum(w * large.get(t, 0.0) for t, w in small.items())
+            if score > 0:
+                f = factor(doc_years)
+                hits.append((score * f, doc_id, None, f, _known(doc_years)))
+
+        return heapq.nlargest(limit, hits, key=lambda hit: (hit[0], -hit[1]))
+
+    def _explain(self, side: str, hit: Hit, query: Dict[str, float]) -> List[dict]:
+        _, doc_id, row, factor, _ = hit
+        if row is None:
+            vector = self.delta[side][doc_id][0]
+            contributions = {t: w * vector[t] for t, w in query.items() if t in vector}
+        else:
+            segment, vocabulary = self.index.segments[side], self.index.vocabulary
+            contributions = {t: w * segment.weight(row, vocabulary[t]) for t, w in query.items() if t in vocabulary}
+        top = heapq.nlargest(MATCHING_EXPLAIN_TERMS, ((c * factor, t) for t, c in contributions.items() if c > 0))
+        return [{"term": term, "score": round(score, 4)} for score, term in top]
+
+    async def _matches(self, db: AsyncSession, side: str, query: Dict[str, float], limit: int, years, required) -> List[dict]:
+        started = time.perf_counter()
+        hits = self._rank(side, query, limit, years, required)
+        matches = [
+            {
+                "id": hit[1],
+                "score": round(hit[0], 4),
+                "experience_factor": round(hit[3], 4),
+                # The candidate's years and the job's requirement, whichever side ranked
+                "experience_years": hit[4] if side == "candidates" else years,
+                "required_years": required if side == "candidates" else hit[4],
+                "terms": self._explain(side, hit, query),
+            }
+            for hit in hits
+        ]
+        match_time.observe((side,), time.perf_counter() - started)
+
+        model = models.Candidate if side == "candidates" else models.Job
+        label = models.Candidate.name if side == "candidates" else models.Job.title
+        result = await db.execute(select(model.id, label).where(model.id.in_([m["id"] for m in matches])))
+        names = dict(result.all())
+        # Rows deleted since the last refresh drop out
+        return [{**match, "name": names[match["id"]]} for match in matches if match["id"] in names]
+
+    async def match_candidates(self, db: AsyncSession, job: models.Job, limit: int = 20) -> List[dict]:
+        """Best candidates for a job, with the terms behind each score"""
+        await self.refresh(db)
+        query = weigh(job_terms(job, self.index.phrases), self.index.idf_of)
+        return await self._matches(db, "candidates", query, limit, None, required_years(job))
+
+    async def match_jobs(self, db: AsyncSession, candidate: models.Candidate, limit: int = 20) -> List[dict]:
+        """Best active jobs for a candidate, with the terms behind each score"""
+        await self.refresh(db)
+        query = weigh(candidate_terms(candidate, self.index.phrases), self.index.idf_of)
+        return await self._matches(db, "jobs", query, limit, _known(candidate.experience_years), None)
+
+    async def status(self, db: AsyncSession) -> dict:
+        """The loaded generation, its size and the changes applied on top of it"""
+        await self.refresh(db)
+        index = self.index
+        return {
+            "generation": index.generation,
+            "built_at": index.built_at,
+            "backend": "numpy" if np is not None else "python",
+            "terms": len(index.vocabulary),
+            "indexed_jobs": index.segments["jobs"].size,
+            "indexed_candidates": index.segments["candidates"].size,
+            "changed_jobs": len(self.delta["jobs"]),
+            "changed_candidates": len(self.delta["candidates"]),
+            "rebuilding": self.rebuilding is not None,
+        }
+
+engine = MatchingEngine()
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build and inspect the candidate/job matching index")
+    parser.add_argument("command", choices=["rebuild", "status"])
+    args = parser.parse_args()
+
+    async def _run():
+        if args.command == "status" and engine._current() is None:
+            print("No matching index yet; run `python matching.py rebuild`")
+            return
+        async with async_session() as db:
+            if args.command == "rebuild":
+                started = time.perf_counter()
+                generation = await engine.rebuild(db)
+                print(f"Built {generation} in {time.perf_counter() - started:.1f}s")
+            for key, value in (await engine.status(db)).items():
+                print(f"{key}: {value}")
+
+    asyncio.run(_run())
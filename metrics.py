@@ -0,0 +1,300 @@
+from contextvars import ContextVar
+from starlette.datastructures import Headers
+from starlette.routing import Mount
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from sqlalchemy import event
+from typing import Dict, List, Optional, Tuple
+import logging
+import os
+import time
+
+# Request latency and SQL instrumentation, exported in Prometheus text format.
+#
+# MetricsMiddleware times every HTTP request and labels it with the route
+# template ("/api/jobs/{job_id}"), never the raw path, so label cardinality
+# stays bounded. Engine event listeners count each SQL statement and its
+# execution time into a per-request tally held in a ContextVar, which follows
+# the request into its session dependencies and streaming bodies.
+#
+# Routes with a query budget log a warning when a request goes over it, so an
+# N+1 in a list handler shows up in the logs on the first request. Budgets
+# come from QUERY_BUDGETS, METRICS_QUERY_BUDGETS ("GET /api/jobs=2,...") and
+# METRICS_DEFAULT_QUERY_BUDGET for every other route (0 disables).
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+# When set, /metrics requires "Authorization: Bearer <token>"
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+METRICS_DEFAULT_QUERY_BUDGET = int(os.getenv("METRICS_DEFAULT_QUERY_BUDGET", 0))
+
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+# Statements per request that the hot read paths are expected to stay within
+QUERY_BUDGETS = {
+    "GET /api/jobs": 2,
+    "GET /api/jobs/{job_id}": 2,
+    "GET /api/candidates": 2,
+    "GET /api/candidates/{candidate_id}": 2,
+    "GET /api/applications": 4,
+    "GET /api/applications/{application_id}/history": 2,
+    "GET /api/skills/candidates": 4,
+    "GET /api/stats": 1,
+    "GET /api/sync": 5,
+}
+
+UNMATCHED = "<unmatched>"
+
+logger = logging.getLogger("hireops.metrics")
+
+def _parse_budgets(value: Optional[str]) -> Dict[str, int]:
+    budgets = {}
+    for item in (value or "").split(","):
+        key, _, budget = item.strip().rpartition("=")
+        if key and budget.strip().isdigit():
+            budgets[" ".join(key.split())] = int(budget)
+    return budgets
+
+QUERY_BUDGETS.update(_parse_budgets(os.getenv("METRICS_QUERY_BUDGETS")))
+
+# ============== METRIC TYPES ==============
+
+Labels = Tuple[str, ...]
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+def _format_labels(names: Tuple[str, ...], values: Labels, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+class Counter:
+    """Monotonic counter keyed by label values"""
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...]):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.values: Dict[Labels, float] = {}
+
+    def inc(self, labels: Labels, amount: float = 1):
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self.values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labels, labels)} {_format_value(value)}")
+        return lines
+
+class Gauge:
+    """Point-in-time value keyed by label values"""
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...]):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.values: Dict[Labels, float] = {}
+
+    def set(self, labels: Labels, value: float):
+        self.values[labels] = value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge"]
+        for labels, value in sorted(self.values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labels, labels)} {_format_value(value)}")
+        return lines
+
+class Histogram:
+    """Fixed-bucket histogram keyed by label values"""
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...], buckets: Tuple[float, ...]):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        # label values -> [per-bucket counts..., +Inf count, sum]
+        self.values: Dict[Labels, List[float]] = {}
+
+    def observe(self, labels: Labels, value: float):
+        series = self.values.get(labels)
+        if series is None:
+            series = self.values[labels] = [0] * (len(self.buckets) + 2)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[i] += 1
+                break
+        else:
+            series[len(self.buckets)] += 1
+        series[-1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, series in sorted(self.values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), series):
+                cumulative += count
+                le = 'le="+Inf"' if bound == "+Inf" else f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, labels, le)} {int(cumulative)}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, labels)} {_format_value(series[-1])}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, labels)} {int(cumulative)}")
+        return lines
+
+ROUTE_LABELS = ("method", "route")
+
+http_requests = Counter(
+    "hireops_http_requests_total", "HTTP requests by route template and status code",
+    ROUTE_LABELS + ("status",)
+)
+http_latency = Histogram(
+    "hireops_http_request_duration_seconds", "HTTP request latency by route template",
+    ROUTE_LABELS, LATENCY_BUCKETS
+)
+db_statements = Histogram(
+    "hireops_db_statements_per_request", "SQL statements executed per HTTP request",
+    ROUTE_LABELS, STATEMENT_BUCKETS
+)
+db_time = Histogram(
+    "hireops_db_duration_seconds", "Time spent executing SQL per HTTP request",
+    ROUTE_LABELS, LATENCY_BUCKETS
+)
+budget_exceeded = Counter(
+    "hireops_db_query_budget_exceeded_total", "Requests that issued more SQL statements than their route's budget",
+    ROUTE_LABELS
+)
+background_statements = Counter(
+    "hireops_db_background_statements_total", "SQL statements executed outside an HTTP request", ()
+)
+
+METRICS = [http_requests, http_latency, db_statements, db_time, budget_exceeded, background_statements]
+
+def register(*extra):
+    """Export metrics owned by other modules alongside the HTTP and SQL ones"""
+    METRICS.extend(extra)
+
+def render() -> str:
+    """All metrics in Prometheus text exposition format"""
+    lines = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+# ============== SQL INSTRUMENTATION ==============
+
+class QueryTally:
+    """SQL statements and their total execution time within one request"""
+    __slots__ = ("statements", "seconds")
+
+    def __init__(self):
+        self.statements = 0
+        self.seconds = 0.0
+
+_current_tally: ContextVar[Optional[QueryTally]] = ContextVar("query_tally", default=None)
+
+def current_tally() -> Optional[QueryTally]:
+    return _current_tally.get()
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_started"].pop()
+    tally = _current_tally.get()
+    if tally is None:
+        background_statements.inc(())
+        return
+    tally.statements += 1
+    tally.seconds += time.perf_counter() - started
+
+def _handle_error(exception_context):
+    # A failed statement never reaches after_cursor_execute
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("query_started"):
+        connection.info["query_started"].pop()
+
+def instrument_engine(async_engine):
+    """Count and time statements on an engine (idempotent)"""
+    target = async_engine.sync_engine
+    if event.contains(target, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(target, "before_cursor_execute", _before_cursor_execute)
+    event.listen(target, "after_cursor_execute", _after_cursor_execute)
+    event.listen(target, "handle_error", _handle_error)
+
+# ============== MIDDLEWARE ==============
+
+_templates: Dict[object, str] = {}
+
+def route_template(scope: Scope) -> str:
+    """The path template of the route that handled the request"""
+    endpoint = scope.get("endpoint")
+    app = scope.get("app")
+    if endpoint is None or app is None:
+        return UNMATCHED
+    template = _templates.get(endpoint)
+    if template is None:
+        for route in app.router.routes:
+            if getattr(route, "endpoint", None) is endpoint or (isinstance(route, Mount) and route.app is endpoint):
+                template = _templates[endpoint] = route.path
+                break
+        else:
+            return UNMATCHED
+    return template
+
+def query_budget(method: str, route: str) -> int:
+    return QUERY_BUDGETS.get(f"{method} {route}", METRICS_DEFAULT_QUERY_BUDGET)
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency, status and SQL usage per route template"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        tally = QueryTally()
+        token = _current_tally.set(tally)
+        started = time.perf_counter()
+        status = 500
+        streaming = False
+
+        async def send_with_metrics(message: Message):
+            nonlocal status, streaming
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                # Event streams stay open for minutes; their duration is not latency
+                streaming = Headers(raw=message["headers"]).get("content-type", "").startswith("text/event-stream")
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            _current_tally.reset(token)
+            self._record(scope, status, time.perf_counter() - started, tally, streaming)
+
+    def _record(self, scope: Scope, status: int, elapsed: float, tally: QueryTally, streaming: bool):
+        method = scope["method"]
+        route = route_template(scope)
+        labels = (method, route)
+
+        http_requests.inc(labels + (str(status),))
+        if not streaming:
+            http_latency.observe(labels, elapsed)
+        db_statements.observe(labels, tally.statements)
+        db_time.observe(labels, tally.seconds)
+
+        budget = query_budget(method, route)
+        if budget and tally.statements > budget:
+            budget_exceeded.inc(labels)
+            logger.warning(
+                "%s %s issued %d SQL statements (budget %d, %.1f ms in the database) for %s",
+                method, route, tally.statements, budget, tally.seconds * 1000, scope.get("path")
+            )
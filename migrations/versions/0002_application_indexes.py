@@ -0,0 +1,149 @@
+"""skills index, dashboard counters, keyset and application indexes, job/candidate uniqueness
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 20:45:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from datetime import datetime
+import skills
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, Sequence[str], None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Added to models.py before the schema was managed by Alembic: builds from
+# that time created them with create_all, so a database stamped at 0001 may
+# already have some of them
+KEYSET_INDEXES = (
+    ('candidates', 'ix_candidates_created_at_id', ['created_at', 'id']),
+    ('jobs', 'ix_jobs_created_at_id', ['created_at', 'id']),
+    ('applications', 'ix_applications_applied_at_id', ['applied_at', 'id']),
+)
+
+
+def _index_candidate_skills(bind):
+    # Link existing candidates to their parsed skills, as `python skills.py backfill` does
+    parsed = {
+        candidate_id: skills.parse_skills(raw)
+        for candidate_id, raw in bind.execute(sa.text("SELECT id, skills FROM candidates WHERE skills IS NOT NULL"))
+    }
+    names = {}
+    for candidate_skills in parsed.values():
+        for name, display in candidate_skills.items():
+            names.setdefault(name, display)
+    if not names:
+        return
+
+    skill_table = sa.table('skills', sa.column('name'), sa.column('display_name'), sa.column('created_at'))
+    now = datetime.utcnow()
+    bind.execute(skill_table.insert(), [
+        {'name': name, 'display_name': display, 'created_at': now} for name, display in names.items()
+    ])
+    ids = dict(bind.execute(sa.text("SELECT name, id FROM skills")).fetchall())
+    link_table = sa.table('candidate_skills', sa.column('candidate_id'), sa.column('skill_id'))
+    bind.execute(link_table.insert(), [
+        {'candidate_id': candidate_id, 'skill_id': ids[name]}
+        for candidate_id, candidate_skills in parsed.items()
+        for name in candidate_skills
+    ])
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    inspector = sa.inspect(op.get_bind())
+    tables = set(inspector.get_table_names())
+
+    if 'skills' not in tables:
+        op.create_table('skills',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('display_name', sa.String(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+        )
+        with op.batch_alter_table('skills', schema=None) as batch_op:
+            batch_op.create_index(batch_op.f('ix_skills_id'), ['id'], unique=False)
+            batch_op.create_index(batch_op.f('ix_skills_name'), ['name'], unique=True)
+
+    if 'candidate_skills' not in tables:
+        op.create_table('candidate_skills',
+        sa.Column('candidate_id', sa.Integer(), nullable=False),
+        sa.Column('skill_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['candidate_id'], ['candidates.id'], ),
+        sa.ForeignKeyConstraint(['skill_id'], ['skills.id'], ),
+        sa.PrimaryKeyConstraint('candidate_id', 'skill_id')
+        )
+        with op.batch_alter_table('candidate_skills', schema=None) as batch_op:
+            batch_op.create_index('ix_candidate_skills_skill_candidate', ['skill_id', 'candidate_id'], unique=False)
+        _index_candidate_skills(op.get_bind())
+
+    if 'stat_counters' not in tables:
+        op.create_table('stat_counters',
+        sa.Column('key', sa.String(), nullable=False),
+        sa.Column('value', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('key')
+        )
+
+    for table, name, columns in KEYSET_INDEXES:
+        if name not in {index['name'] for index in inspector.get_indexes(table)}:
+            with op.batch_alter_table(table, schema=None) as batch_op:
+                batch_op.create_index(name, columns, unique=False)
+
+    # The unique index can't be built over existing duplicates; fail with a
+    # readable message instead of a bare IntegrityError
+    duplicates = op.get_bind().execute(sa.text(
+        "SELECT job_id, candidate_id, COUNT(*) FROM applications "
+        "GROUP BY job_id, candidate_id HAVING COUNT(*) > 1"
+    )).fetchall()
+    if duplicates:
+        pairs = ", ".join(f"(job {job_id}, candidate {candidate_id})" for job_id, candidate_id, _ in duplicates[:10])
+        raise RuntimeError(
+            f"{len(duplicates)} job/candidate pairs have more than one application, "
+            f"e.g. {pairs}. Merge or delete the duplicates, then rerun the migration."
+        )
+
+    with op.batch_alter_table('applications', schema=None) as batch_op:
+        batch_op.create_index('uq_applications_job_candidate', ['job_id', 'candidate_id'], unique=True)
+        batch_op.create_index('ix_applications_job_status_applied', ['job_id', 'status', 'applied_at'], unique=False)
+        batch_op.create_index('ix_applications_candidate_applied', ['candidate_id', 'applied_at'], unique=False)
+        batch_op.create_index('ix_applications_status_applied', ['status', 'applied_at'], unique=False)
+
+    with op.batch_alter_table('status_history', schema=None) as batch_op:
+        batch_op.create_index('ix_status_history_application_changed', ['application_id', 'changed_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('status_history', schema=None) as batch_op:
+        batch_op.drop_index('ix_status_history_application_changed')
+
+    with op.batch_alter_table('applications', schema=None) as batch_op:
+        batch_op.drop_index('ix_applications_status_applied')
+        batch_op.drop_index('ix_applications_candidate_applied')
+        batch_op.drop_index('ix_applications_job_status_applied')
+        batch_op.drop_index('uq_applications_job_candidate')
+
+    for table, name, _ in reversed(KEYSET_INDEXES):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_index(name)
+
+    op.drop_table('stat_counters')
+    with op.batch_alter_table('candidate_skills', schema=None) as batch_op:
+        batch_op.drop_index('ix_candidate_skills_skill_candidate')
+
+    op.drop_table('candidate_skills')
+    with op.batch_alter_table('skills', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_skills_name'))
+        batch_op.drop_index(batch_op.f('ix_skills_id'))
+
+    op.drop_table('skills')
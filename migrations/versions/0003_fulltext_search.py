@@ -0,0 +1,35 @@
+"""full-text search indexes (SQLite FTS5)
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 20:50:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+import search
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, Sequence[str], None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # No-op on non-SQLite databases and SQLite builds without FTS5;
+    # search then keeps using LIKE
+    search.create_fts_indexes(op.get_bind(), {
+        "jobs": {"index": "jobs_fts", "columns": ["title", "description"]},
+        "candidates": {"index": "candidates_fts", "columns": ["name", "email", "skills"]},
+    })
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == "sqlite":
+        search.drop_fts_indexes(op.get_bind())
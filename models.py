@@ -1,5 +1,5 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Enum, Boolean
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Text, Date, DateTime, Float, ForeignKey, Enum, Boolean, Index
+from sqlalchemy.orm import relationship, deferred
 from datetime import datetime
 import enum
 from database import Base
@@ -35,6 +35,12 @@ class User(Base):
 
 class Job(Base):
     __tablename__ = "jobs"
+    __table_args__ = (
+        # Keyset pagination seeks on (created_at, id)
+        Index("ix_jobs_created_at_id", "created_at", "id"),
+        # Delta sync seeks on (updated_at, id)
+        Index("ix_jobs_updated_at_id", "updated_at", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, nullable=False, index=True)
@@ -54,12 +60,25 @@ class Job(Base):
 
 class Candidate(Base):
     __tablename__ = "candidates"
+    __table_args__ = (
+        # Keyset pagination seeks on (created_at, id)
+        Index("ix_candidates_created_at_id", "created_at", "id"),
+        # Delta sync seeks on (updated_at, id)
+        Index("ix_candidates_updated_at_id", "updated_at", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False, index=True)
     email = Column(String, unique=True, index=True, nullable=False)
     phone = Column(String)
     resume_url = Column(String)
+    # Uploaded resume: resume_files.sha256 (see resumes.py) and original name
+    resume_sha256 = Column(String(64), index=True)
+    resume_filename = Column(String)
+    # Copied from resume_files by extraction.py for full-text search; deferred
+    # so list queries don't read it
+    resume_text = deferred(Column(Text))
+    resume_skills = Column(Text)  # JSON list of skills detected in the resume
     skills = Column(Text)  # JSON string of skills
     experience_years = Column(Integer)
     current_company = Column(String)
@@ -70,9 +89,22 @@ class Candidate(Base):
     
     # Relationships
     applications = relationship("Application", back_populates="candidate", cascade="all, delete-orphan")
+    skill_links = relationship("CandidateSkill", cascade="all, delete-orphan")
 
 class Application(Base):
     __tablename__ = "applications"
+    __table_args__ = (
+        # Keyset pagination seeks on (applied_at, id)
+        Index("ix_applications_applied_at_id", "applied_at", "id"),
+        # One application per candidate per job, enforced by the database
+        Index("uq_applications_job_candidate", "job_id", "candidate_id", unique=True),
+        # List filters (job / candidate / status) ordered by applied_at
+        Index("ix_applications_job_status_applied", "job_id", "status", "applied_at"),
+        Index("ix_applications_candidate_applied", "candidate_id", "applied_at"),
+        Index("ix_applications_status_applied", "status", "applied_at"),
+        # Delta sync seeks on (updated_at, id)
+        Index("ix_applications_updated_at_id", "updated_at", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     job_id = Column(Integer, ForeignKey("jobs.id"), nullable=False)
@@ -91,6 +123,12 @@ class Application(Base):
 
 class StatusHistory(Base):
     __tablename__ = "status_history"
+    __table_args__ = (
+        # History timeline of one application
+        Index("ix_status_history_application_changed", "application_id", "changed_at"),
+        # Hires (and other moves into a status) by date, for trend catch-up
+        Index("ix_status_history_new_status_changed", "new_status", "changed_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     application_id = Column(Integer, ForeignKey("applications.id"), nullable=False)
@@ -102,3 +140,140 @@ class StatusHistory(Base):
     
     # Relationships
     application = relationship("Application", back_populates="status_history")
+
+class Skill(Base):
+    __tablename__ = "skills"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, unique=True, index=True, nullable=False)  # normalized, e.g. "node.js"
+    display_name = Column(String, nullable=False)  # as first entered, e.g. "Node.js"
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+class CandidateSkill(Base):
+    __tablename__ = "candidate_skills"
+    __table_args__ = (
+        # Inverted index: skill -> candidates
+        Index("ix_candidate_skills_skill_candidate", "skill_id", "candidate_id"),
+    )
+    
+    candidate_id = Column(Integer, ForeignKey("candidates.id"), primary_key=True)
+    skill_id = Column(Integer, ForeignKey("skills.id"), primary_key=True)
+
+class StatCounter(Base):
+    __tablename__ = "stat_counters"
+    
+    # Denormalized dashboard totals, maintained by stats.py in the same
+    # transaction as the rows they count
+    key = Column(String, primary_key=True)
+    value = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class Tombstone(Base):
+    __tablename__ = "tombstones"
+    __table_args__ = (
+        # Delta sync seeks on (deleted_at, id)
+        Index("ix_tombstones_deleted_at_id", "deleted_at", "id"),
+    )
+    
+    # Deleted jobs / candidates / applications, recorded by sync.py so
+    # /api/sync can tell clients what to drop
+    id = Column(Integer, primary_key=True)
+    entity = Column(String, nullable=False)  # table name, e.g. "applications"
+    entity_id = Column(Integer, nullable=False)
+    deleted_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+class FunnelDaily(Base):
+    __tablename__ = "funnel_daily"
+    
+    # Applications entering each pipeline stage per day, maintained by
+    # analytics.py; one row set per dimension: "all" (id 0), "job" and
+    # "recruiter" (id 0 = unassigned)
+    dimension = Column(String, primary_key=True)
+    dimension_id = Column(Integer, primary_key=True)
+    day = Column(Date, primary_key=True)
+    stage = Column(String, primary_key=True)  # ApplicationStatus value
+    entered = Column(Integer, nullable=False, default=0)
+
+class StageTimeDaily(Base):
+    __tablename__ = "stage_time_daily"
+    
+    # Histogram of time spent in a stage, by the day applications left it
+    # (see analytics.bucket_for for the bucket bounds)
+    dimension = Column(String, primary_key=True)
+    dimension_id = Column(Integer, primary_key=True)
+    day = Column(Date, primary_key=True)
+    stage = Column(String, primary_key=True)
+    bucket = Column(Integer, primary_key=True)
+    exits = Column(Integer, nullable=False, default=0)
+    total_seconds = Column(Float, nullable=False, default=0)
+
+class TrendDaily(Base):
+    __tablename__ = "trend_daily"
+    
+    # Daily counts behind the dashboard trends, maintained by trends.py:
+    # metric "applications" / "hires" / "candidates" per dimension "all"
+    # (id 0), "job" and "recruiter" (id 0 = unassigned)
+    metric = Column(String, primary_key=True)
+    dimension = Column(String, primary_key=True)
+    dimension_id = Column(Integer, primary_key=True)
+    day = Column(Date, primary_key=True)
+    value = Column(Integer, nullable=False, default=0)
+
+class ResumeFile(Base):
+    __tablename__ = "resume_files"
+    
+    # One row per distinct uploaded file, stored by resumes.py at a path
+    # derived from its SHA-256; candidates share rows for identical files
+    sha256 = Column(String(64), primary_key=True)
+    size = Column(Integer, nullable=False)
+    content_type = Column(String, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    # Last time an upload pointed a candidate at this file; the GC grace
+    # period runs from here
+    attached_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    # Filled in by extraction.py
+    text = deferred(Column(Text))
+    detected_skills = Column(Text)  # JSON list of display names
+    extracted_at = Column(DateTime)
+
+class ResumeExtractionJob(Base):
+    __tablename__ = "resume_extraction_jobs"
+    __table_args__ = (
+        # Workers claim the oldest due pending jobs
+        Index("ix_resume_extraction_jobs_status_run_after", "status", "run_after"),
+    )
+    
+    # Durable text extraction queue, one job per stored file (extraction.py):
+    # pending -> running -> done, or back to pending with a backoff delay
+    # until max attempts, then failed
+    sha256 = Column(String(64), primary_key=True)
+    status = Column(String, nullable=False, default="pending")
+    attempts = Column(Integer, nullable=False, default=0)
+    run_after = Column(DateTime, nullable=False, default=datetime.utcnow)
+    last_error = Column(Text)
+    enqueued_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+
+class Task(Base):
+    __tablename__ = "tasks"
+    __table_args__ = (
+        # Workers claim the oldest due pending task
+        Index("ix_tasks_status_run_after", "status", "run_after"),
+    )
+    
+    # Durable background work, run by tasks.py: pending -> running -> done,
+    # back to pending with a backoff delay on failure, or dead (the
+    # dead-letter list) once max_attempts is used up
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, nullable=False)
+    payload = Column(Text, nullable=False, default="{}")  # JSON keyword arguments
+    status = Column(String, nullable=False, default="pending")
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False)
+    run_after = Column(DateTime, nullable=False, default=datetime.utcnow)
+    idempotency_key = Column(String, unique=True)
+    last_error = Column(Text)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
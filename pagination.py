@@ -0,0 +1,114 @@
+from fastapi import HTTPException, Response
+from sqlalchemy import and_, or_
+from datetime import datetime
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+import base64
+import json
+
+# Keyset (cursor) pagination on a (timestamp, id) key, newest first.
+#
+# Cursors are opaque URL-safe tokens encoding the key of a boundary row and
+# the direction to read in. Seeking with WHERE (ts, id) < (:ts, :id) lets the
+# database start from the index position instead of scanning and discarding
+# `skip` rows, and pages stay stable when new rows are inserted meanwhile.
+# Offset pagination (skip) is still accepted for backward compatibility.
+
+NEXT = "next"
+PREV = "prev"
+
+class Cursor(NamedTuple):
+    timestamp: datetime
+    id: int
+    direction: str
+
+class Page(NamedTuple):
+    items: list
+    next_cursor: Optional[str]
+    prev_cursor: Optional[str]
+
+def encode_cursor(timestamp: datetime, row_id: int, direction: str) -> str:
+    """Encode a boundary key into an opaque cursor token"""
+    payload = json.dumps([timestamp.isoformat(), row_id, direction], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(token: str) -> Cursor:
+    """Decode a cursor token, rejecting anything malformed with a 400"""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        timestamp, row_id, direction = json.loads(base64.urlsafe_b64decode(padded))
+        if direction not in (NEXT, PREV):
+            raise ValueError(direction)
+        return Cursor(datetime.fromisoformat(timestamp), int(row_id), direction)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+
+def keyset_order(ts_col, id_col, cursor: Optional[Cursor]) -> Tuple:
+    """ORDER BY clauses for reading in the cursor's direction"""
+    if cursor and cursor.direction == PREV:
+        return (ts_col.asc(), id_col.asc())
+    return (ts_col.desc(), id_col.desc())
+
+def apply_keyset(query, ts_col, id_col, cursor: Optional[Cursor], skip: int, limit: int):
+    """Seek, order and window a select(); fetches one extra row to detect more pages"""
+    if cursor is None:
+        query = query.offset(skip)
+    elif cursor.direction == PREV:
+        query = query.where(or_(
+            ts_col > cursor.timestamp,
+            and_(ts_col == cursor.timestamp, id_col > cursor.id)
+        ))
+    else:
+        query = query.where(or_(
+            ts_col < cursor.timestamp,
+            and_(ts_col == cursor.timestamp, id_col < cursor.id)
+        ))
+    return query.order_by(*keyset_order(ts_col, id_col, cursor)).limit(limit + 1)
+
+def build_page(
+    rows: List[Any],
+    cursor: Optional[Cursor],
+    skip: int,
+    limit: int,
+    key: Callable[[Any], Tuple[datetime, int]]
+) -> Page:
+    """Trim the look-ahead row, restore newest-first order and compute cursors"""
+    rows = list(rows)
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    reading_back = cursor is not None and cursor.direction == PREV
+    if reading_back:
+        rows.reverse()
+
+    if not rows:
+        # Past either end: offer a way back towards the rows we came from
+        if cursor is None:
+            return Page(rows, None, None)
+        flipped = NEXT if reading_back else PREV
+        token = encode_cursor(cursor.timestamp, cursor.id, flipped)
+        return Page(rows, token if reading_back else None, None if reading_back else token)
+
+    first, last = key(rows[0]), key(rows[-1])
+    if reading_back:
+        has_next, has_prev = True, has_more
+    else:
+        has_next, has_prev = has_more, cursor is not None or skip > 0
+
+    return Page(
+        rows,
+        encode_cursor(*last, NEXT) if has_next else None,
+        encode_cursor(*first, PREV) if has_prev else None
+    )
+
+def cursor_headers(page: Page) -> Dict[str, str]:
+    """Response headers carrying the page cursors, so list bodies stay unchanged"""
+    headers = {}
+    if page.next_cursor:
+        headers["X-Next-Cursor"] = page.next_cursor
+    if page.prev_cursor:
+        headers["X-Prev-Cursor"] = page.prev_cursor
+    return headers
+
+def set_cursor_headers(response: Response, page: Page):
+    """Expose the page cursors without changing the list response body"""
+    response.headers.update(cursor_headers(page))
@@ -0,0 +1,363 @@
+from collections import Counter
+from contextvars import ContextVar
+from datetime import datetime
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from sqlalchemy import event
+from typing import Dict, List, Optional
+import asyncio
+import json
+import os
+import random
+import re
+import secrets
+import sys
+import threading
+import time
+import uuid
+import metrics
+
+# On-demand request profiler.
+#
+# A request is profiled when it carries "X-Profile: <PROFILER_TOKEN>" or is
+# picked by PROFILER_SAMPLE_RATE. While any profiled request is in flight a
+# background thread samples the event-loop thread's stack every
+# PROFILER_INTERVAL_MS and files each sample under one category:
+#
+#   app          the request's own code running on the loop
+#   db           SQLAlchemy / driver code running for the request
+#   pydantic     validation and serialization
+#   jinja        template rendering
+#   db_await     loop idle while the request waits on a SQL statement
+#   io_wait      loop idle while the request waits on anything else
+#   event_loop   the loop busy with other tasks while the request is ready
+#
+# Samples belong to the request when the running task is one of its tasks:
+# the one it arrived on, plus child tasks (streaming bodies) that run SQL or
+# send part of the response for it. Profiles are stored as
+# collapsed stacks ("category;frame;frame count", readable by flamegraph.pl
+# and speedscope) plus a JSON summary, in a ring buffer of the newest
+# PROFILER_MAX_PROFILES files under PROFILER_DIR.
+
+PROFILER_TOKEN = os.getenv("PROFILER_TOKEN")
+PROFILER_SAMPLE_RATE = float(os.getenv("PROFILER_SAMPLE_RATE", 0))
+PROFILER_INTERVAL_MS = float(os.getenv("PROFILER_INTERVAL_MS", 1))
+# Sampled (not explicitly requested) profiles faster than this are discarded
+PROFILER_MIN_DURATION_MS = float(os.getenv("PROFILER_MIN_DURATION_MS", 0))
+PROFILER_DIR = os.getenv("PROFILER_DIR", "./profiles")
+PROFILER_MAX_PROFILES = int(os.getenv("PROFILER_MAX_PROFILES", 200))
+
+PROFILE_HEADER = "x-profile"
+# Never profiled: long-lived streams and the profiler / metrics endpoints themselves
+EXCLUDED_PREFIXES = ("/static", "/metrics", "/api/profiles", "/api/events")
+
+CATEGORIES = ("app", "db", "pydantic", "jinja", "db_await", "io_wait", "event_loop")
+
+# Innermost matching frame decides the category of an on-task sample
+_FRAME_CATEGORIES = (
+    ("/jinja2/", "jinja"),
+    ("/pydantic/", "pydantic"),
+    ("/pydantic_core/", "pydantic"),
+    ("/fastapi/encoders.py", "pydantic"),
+    ("/sqlalchemy/", "db"),
+    ("/aiosqlite/", "db"),
+)
+
+def enabled() -> bool:
+    return bool(PROFILER_TOKEN) or PROFILER_SAMPLE_RATE > 0
+
+def token_matches(value: Optional[str]) -> bool:
+    """Whether a header value is the profiler token, compared in constant time"""
+    return bool(PROFILER_TOKEN) and secrets.compare_digest((value or "").encode(), PROFILER_TOKEN.encode())
+
+# ============== PROFILES ==============
+
+class Profile:
+    """Samples and timings collected for one request"""
+
+    def __init__(self, scope: Scope, task: asyncio.Task, requested: bool):
+        self.id = f"{int(time.time() * 1000)}-{uuid.uuid4().hex[:8]}"
+        self.method = scope["method"]
+        self.path = scope["path"]
+        self.tasks = {task}
+        self.requested = requested
+        self.started_at = datetime.utcnow()
+        self.started = time.perf_counter()
+        self.duration = 0.0
+        self.status = 500
+        self.stacks: Counter = Counter()
+        self.categories: Counter = Counter()
+        # SQL statements currently executing for this request, and their total time
+        self.in_db = 0
+        self.db_statements = 0
+        self.db_seconds = 0.0
+
+    def adopt_current_task(self):
+        task = asyncio.current_task()
+        if task is not None and task not in self.tasks:
+            self.tasks.add(task)
+
+    def summary(self, route: str, endpoint: Optional[str]) -> dict:
+        samples = sum(self.categories.values())
+        duration_ms = self.duration * 1000
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "route": route,
+            "endpoint": endpoint,
+            "status": self.status,
+            "started_at": self.started_at.isoformat(),
+            "duration_ms": round(duration_ms, 3),
+            "samples": samples,
+            "interval_ms": PROFILER_INTERVAL_MS,
+            # Wall-clock split, scaled from sample counts to the measured duration
+            "split_ms": {
+                category: round(duration_ms * self.categories[category] / samples, 3) if samples else 0.0
+                for category in CATEGORIES
+            },
+            "db_statements": self.db_statements,
+            "db_ms": round(self.db_seconds * 1000, 3),
+            "requested": self.requested,
+        }
+
+_current_profile: ContextVar[Optional[Profile]] = ContextVar("profile", default=None)
+
+def _frame_name(code) -> str:
+    filename = code.co_filename
+    marker = filename.rfind("site-packages/")
+    short = filename[marker + 14:] if marker >= 0 else os.path.basename(filename)
+    return f"{code.co_name} ({short}:{code.co_firstlineno})"
+
+def _categorize(frame) -> str:
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        for marker, category in _FRAME_CATEGORIES:
+            if marker in filename:
+                return category
+        frame = frame.f_back
+    return "app"
+
+def _stack(frame) -> List[str]:
+    frames = []
+    while frame is not None:
+        frames.append(frame.f_code)
+        frame = frame.f_back
+    frames.reverse()
+    # Drop the server and event-loop frames below the task step
+    for i in range(len(frames) - 1, -1, -1):
+        if frames[i].co_name == "_run" and frames[i].co_filename.endswith(os.path.join("asyncio", "events.py")):
+            frames = frames[i + 1:]
+            break
+    return [_frame_name(code) for code in frames]
+
+def _loop_idle(frame) -> bool:
+    """Whether the loop thread is waiting for I/O rather than running callbacks"""
+    return frame is None or frame.f_code.co_filename.endswith("selectors.py") or frame.f_code.co_name == "run_forever"
+
+# ============== SAMPLER ==============
+
+class Sampler:
+    """Background thread sampling the event-loop thread while profiles are active"""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.active: Dict[str, Profile] = {}
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.loop_thread_id: Optional[int] = None
+        self.thread: Optional[threading.Thread] = None
+
+    def start(self, profile: Profile):
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.loop = asyncio.get_running_loop()
+                self.loop_thread_id = threading.get_ident()
+                self.thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+                self.thread.start()
+            self.active[profile.id] = profile
+            self.wakeup.set()
+
+    def stop(self, profile: Profile):
+        with self.lock:
+            self.active.pop(profile.id, None)
+            if not self.active:
+                self.wakeup.clear()
+
+    def _run(self):
+        while True:
+            self.wakeup.wait()
+            time.sleep(self.interval)
+            with self.lock:
+                profiles = list(self.active.values())
+            if profiles:
+                self.sample(profiles)
+
+    def sample(self, profiles: List[Profile]):
+        frame = sys._current_frames().get(self.loop_thread_id)
+        running = asyncio.current_task(self.loop)
+
+        stack = None
+        for profile in profiles:
+            if running is None and _loop_idle(frame):
+                category = "db_await" if profile.in_db else "io_wait"
+                key = category
+            elif running is None:
+                category = "event_loop"
+                key = "event_loop;callbacks"
+            elif running in profile.tasks:
+                if stack is None:
+                    stack = _stack(frame)
+                category = _categorize(frame)
+                key = ";".join([category] + stack)
+            else:
+                category = "event_loop"
+                key = f"event_loop;{running.get_name()}"
+            profile.categories[category] += 1
+            profile.stacks[key] += 1
+
+sampler = Sampler(PROFILER_INTERVAL_MS / 1000)
+
+# ============== SQL INSTRUMENTATION ==============
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _current_profile.get()
+    if profile is not None:
+        profile.adopt_current_task()
+        profile.in_db += 1
+        conn.info.setdefault("profile_started", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _current_profile.get()
+    if profile is not None and conn.info.get("profile_started"):
+        profile.in_db -= 1
+        profile.db_statements += 1
+        profile.db_seconds += time.perf_counter() - conn.info["profile_started"].pop()
+
+def _handle_error(exception_context):
+    profile = _current_profile.get()
+    connection = exception_context.connection
+    if profile is not None and connection is not None and connection.info.get("profile_started"):
+        profile.in_db -= 1
+        connection.info["profile_started"].pop()
+
+def instrument_engine(async_engine):
+    """Track in-flight statements of profiled requests on an engine (idempotent)"""
+    target = async_engine.sync_engine
+    if event.contains(target, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(target, "before_cursor_execute", _before_cursor_execute)
+    event.listen(target, "after_cursor_execute", _after_cursor_execute)
+    event.listen(target, "handle_error", _handle_error)
+
+# ============== STORAGE ==============
+
+_PROFILE_ID = re.compile(r"^\d+-[0-9a-f]{8}$")
+
+def _path(profile_id: str, suffix: str) -> str:
+    return os.path.join(PROFILER_DIR, profile_id + suffix)
+
+def save(profile: Profile, summary: dict):
+    """Write the collapsed stacks and summary, then trim the ring buffer"""
+    os.makedirs(PROFILER_DIR, exist_ok=True)
+    with open(_path(profile.id, ".folded"), "w", encoding="utf-8") as f:
+        for stack, count in profile.stacks.most_common():
+            f.write(f"{stack} {count}\n")
+    # The summary goes last: listing only picks up complete profiles
+    with open(_path(profile.id, ".json"), "w", encoding="utf-8") as f:
+        json.dump(summary, f)
+
+    # Ids start with a millisecond timestamp, so name order is age order
+    stored = sorted(name[:-5] for name in os.listdir(PROFILER_DIR) if name.endswith(".json"))
+    for old_id in stored[:-PROFILER_MAX_PROFILES] if PROFILER_MAX_PROFILES > 0 else []:
+        for suffix in (".json", ".folded"):
+            try:
+                os.remove(_path(old_id, suffix))
+            except FileNotFoundError:
+                pass
+
+def list_profiles(
+    endpoint: Optional[str] = None,
+    route: Optional[str] = None,
+    sort: str = "recent",
+    limit: int = 20
+) -> List[dict]:
+    """Stored profile summaries, newest or slowest first"""
+    if not os.path.isdir(PROFILER_DIR):
+        return []
+    summaries = []
+    for name in os.listdir(PROFILER_DIR):
+        if not name.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(PROFILER_DIR, name), encoding="utf-8") as f:
+                summary = json.load(f)
+        except (OSError, ValueError):
+            continue  # trimmed or half-written meanwhile
+        if endpoint and summary.get("endpoint") != endpoint:
+            continue
+        if route and summary.get("route") != route:
+            continue
+        summaries.append(summary)
+
+    key = (lambda s: s["duration_ms"]) if sort == "slowest" else (lambda s: s["id"])
+    summaries.sort(key=key, reverse=True)
+    return summaries[:limit]
+
+def read_stacks(profile_id: str) -> Optional[str]:
+    """Collapsed stacks of a stored profile, or None if it is gone"""
+    if not _PROFILE_ID.match(profile_id):
+        return None
+    try:
+        with open(_path(profile_id, ".folded"), encoding="utf-8") as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+# ============== MIDDLEWARE ==============
+
+def _should_profile(scope: Scope) -> Optional[bool]:
+    """True if explicitly requested, False if sampled, None to skip"""
+    if scope["path"].startswith(EXCLUDED_PREFIXES):
+        return None
+    if token_matches(Headers(scope=scope).get(PROFILE_HEADER)):
+        return True
+    if PROFILER_SAMPLE_RATE > 0 and random.random() < PROFILER_SAMPLE_RATE:
+        return False
+    return None
+
+class ProfilerMiddleware:
+    """ASGI middleware profiling requested or sampled HTTP requests"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        requested = _should_profile(scope) if scope["type"] == "http" and enabled() else None
+        if requested is None:
+            await self.app(scope, receive, send)
+            return
+
+        profile = Profile(scope, asyncio.current_task(), requested)
+
+        async def send_with_profile(message: Message):
+            profile.adopt_current_task()
+            if message["type"] == "http.response.start":
+                profile.status = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [(b"x-profile-id", profile.id.encode())]
+            await send(message)
+
+        token = _current_profile.set(profile)
+        sampler.start(profile)
+        try:
+            await self.app(scope, receive, send_with_profile)
+        finally:
+            sampler.stop(profile)
+            _current_profile.reset(token)
+            profile.duration = time.perf_counter() - profile.started
+
+        if requested or profile.duration * 1000 >= PROFILER_MIN_DURATION_MS:
+            endpoint = scope.get("endpoint")
+            summary = profile.summary(metrics.route_template(scope), getattr(endpoint, "__name__", None))
+            await asyncio.to_thread(save, profile, summary)
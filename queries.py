@@ -0,0 +1,166 @@
+from sqlalchemy import select, func, case, insert, inspect
+from sqlalchemy.dialects import sqlite, postgresql
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import aliased, selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+import models
+import pagination
+import search as fulltext
+
+# Set-based query helpers shared by the list endpoints in main.py.
+# Each helper issues a fixed number of statements regardless of page size
+# and returns dicts or fully loaded ORM rows, so the route's response_model
+# validates each row once without triggering further lazy loads.
+
+def row_to_dict(obj) -> dict:
+    """Copy the loaded column values of an ORM instance into a dict (deferred ones are skipped)"""
+    unloaded = inspect(obj).unloaded
+    return {c.name: getattr(obj, c.name) for c in obj.__table__.columns if c.key not in unloaded}
+
+def insert_ignore(db: AsyncSession, model):
+    """INSERT that silently skips rows violating a unique constraint (SQLite/Postgres)"""
+    dialect = db.bind.dialect.name
+    if dialect == "sqlite":
+        return sqlite.insert(model).on_conflict_do_nothing()
+    if dialect == "postgresql":
+        return postgresql.insert(model).on_conflict_do_nothing()
+    return insert(model)
+
+def upsert_add(dialect: str, model, key_columns: list, add_columns: list):
+    """INSERT that adds add_columns onto an existing row with the same key (SQLite/Postgres)"""
+    if dialect == "sqlite":
+        stmt = sqlite.insert(model)
+    elif dialect == "postgresql":
+        stmt = postgresql.insert(model)
+    else:
+        raise NotImplementedError(f"upsert_add is not supported on {dialect}")
+    table = model.__table__
+    return stmt.on_conflict_do_update(
+        index_elements=key_columns,
+        set_={column: table.c[column] + stmt.excluded[column] for column in add_columns}
+    )
+
+def is_unique_violation(error: IntegrityError, *markers: str) -> bool:
+    """True if an IntegrityError came from the unique constraint named by any marker
+
+    Postgres reports the constraint name, SQLite the column list, so callers
+    pass both.
+    """
+    message = str(error.orig)
+    return any(marker in message for marker in markers)
+
+async def list_jobs_with_counts(
+    db: AsyncSession,
+    status: Optional[str] = None,
+    search: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[pagination.Cursor] = None
+) -> pagination.Page:
+    """Fetch a page of jobs with total and per-status application counts in one query"""
+    page = select(models.Job)
+
+    if status:
+        page = page.where(models.Job.status == status)
+
+    if search:
+        page = page.where(fulltext.search_filter(models.Job, search))
+
+    page = pagination.apply_keyset(
+        page, models.Job.created_at, models.Job.id, cursor, skip, limit
+    ).subquery()
+    job = aliased(models.Job, page)
+
+    # Aggregate only the applications belonging to jobs on this page
+    statuses = list(models.ApplicationStatus)
+    counts = (
+        select(
+            models.Application.job_id,
+            func.count(models.Application.id).label("application_count"),
+            *[
+                func.count(case((models.Application.status == s, 1))).label(s.value)
+                for s in statuses
+            ]
+        )
+        .where(models.Application.job_id.in_(select(page.c.id)))
+        .group_by(models.Application.job_id)
+        .subquery()
+    )
+
+    query = (
+        select(job, counts.c.application_count, *[counts.c[s.value] for s in statuses])
+        .outerjoin(counts, counts.c.job_id == job.id)
+        .order_by(*pagination.keyset_order(job.created_at, job.id, cursor))
+    )
+    result = await db.execute(query)
+
+    jobs = []
+    for row in result:
+        job_dict = row_to_dict(row[0])
+        job_dict["application_count"] = row[1] or 0
+        job_dict["status_counts"] = {s.value: row[i + 2] or 0 for i, s in enumerate(statuses)}
+        jobs.append(job_dict)
+    return pagination.build_page(jobs, cursor, skip, limit, lambda j: (j["created_at"], j["id"]))
+
+def filter_applications(
+    query,
+    job_id: Optional[int] = None,
+    candidate_id: Optional[int] = None,
+    status: Optional[str] = None
+):
+    """Apply the standard application list filters to a select()"""
+    if job_id:
+        query = query.where(models.Application.job_id == job_id)
+
+    if candidate_id:
+        query = query.where(models.Application.candidate_id == candidate_id)
+
+    if status:
+        query = query.where(models.Application.status == status)
+
+    return query
+
+async def list_applications_with_details(
+    db: AsyncSession,
+    job_id: Optional[int] = None,
+    candidate_id: Optional[int] = None,
+    status: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 100,
+    slim: bool = False,
+    cursor: Optional[pagination.Cursor] = None
+) -> pagination.Page:
+    """Fetch a page of applications with their job and candidate in a constant number of queries"""
+    if slim:
+        # One joined query projecting just the fields the pipeline cards need
+        query = (
+            select(
+                *models.Application.__table__.columns,
+                models.Job.title.label("job_title"),
+                models.Candidate.name.label("candidate_name"),
+                models.Candidate.email.label("candidate_email")
+            )
+            .join(models.Job, models.Job.id == models.Application.job_id)
+            .join(models.Candidate, models.Candidate.id == models.Application.candidate_id)
+        )
+        query = filter_applications(query, job_id, candidate_id, status)
+        query = pagination.apply_keyset(
+            query, models.Application.applied_at, models.Application.id, cursor, skip, limit
+        )
+        result = await db.execute(query)
+        rows = [dict(row) for row in result.mappings()]
+        return pagination.build_page(rows, cursor, skip, limit, lambda a: (a["applied_at"], a["id"]))
+
+    # selectinload issues one IN (...) query per relationship, loading each
+    # distinct job and candidate exactly once: 3 statements for any page size
+    query = select(models.Application).options(
+        selectinload(models.Application.job),
+        selectinload(models.Application.candidate)
+    )
+    query = filter_applications(query, job_id, candidate_id, status)
+    query = pagination.apply_keyset(
+        query, models.Application.applied_at, models.Application.id, cursor, skip, limit
+    )
+    result = await db.execute(query)
+    return pagination.build_page(result.scalars().all(), cursor, skip, limit, lambda a: (a.applied_at, a.id))
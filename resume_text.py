@@ -0,0 +1,193 @@
+from typing import Dict, List, Tuple
+from xml.etree import ElementTree
+import os
+import re
+import time
+import zipfile
+import zlib
+
+try:
+    import pypdf
+except ImportError:  # optional dependency: built-in best-effort PDF reader
+    pypdf = None
+
+# Resume text extraction and skill detection.
+#
+# Everything here is CPU-bound and free of database and event-loop state:
+# extraction.py runs process() in ProcessPoolExecutor workers, which import
+# only this module. PDFs are read with pypdf when it is installed, otherwise
+# with a small reader that inflates content streams and collects the string
+# operands of text operators (fine for most generated PDFs, poor for exotic
+# font encodings). DOCX and ODT are read from their XML parts with the
+# standard library, legacy .doc by scanning for text runs.
+#
+# Skills are detected by matching word n-grams of the text against the
+# known skills vocabulary, handed to each worker once by init_worker().
+
+EXTRACTION_MAX_CHARS = int(os.getenv("EXTRACTION_MAX_CHARS", 200_000))
+
+# Guards against zip and deflate bombs
+MAX_INFLATED_BYTES = 50 * 1024 * 1024
+
+# ============== TEXT EXTRACTION ==============
+
+def _normalize(text: str) -> str:
+    lines = (" ".join(line.split()) for line in text.splitlines())
+    return "\n".join(line for line in lines if line)[:EXTRACTION_MAX_CHARS]
+
+def _pdf_text(path: str) -> str:
+    if pypdf is None:
+        return _pdf_text_builtin(path)
+    parts, size = [], 0
+    for page in pypdf.PdfReader(path).pages:
+        text = page.extract_text() or ""
+        parts.append(text)
+        size += len(text)
+        if size >= EXTRACTION_MAX_CHARS:
+            break
+    return "\n".join(parts)
+
+_PDF_STREAM = re.compile(rb"stream\r?\n(.*?)\r?\n?endstream", re.S)
+_PDF_TEXT_OP = re.compile(rb"(\((?:\\.|[^\\)])*\))\s*(?:Tj|'|\")|\[((?:\\.|[^\]\\])*)\]\s*TJ|(T\*|Td|TD|ET)", re.S)
+_PDF_STRING = re.compile(rb"\(((?:\\.|[^\\)])*)\)", re.S)
+_PDF_ESCAPES = {b"n": b"\n", b"r": b"\r", b"t": b"\t", b"b": b"\b", b"f": b"\f"}
+
+def _pdf_unescape(raw: bytes) -> str:
+    def replace(match):
+        escaped = match.group(1)
+        if escaped[:1].isdigit():
+            return bytes([int(escaped, 8) & 0xFF])
+        return _PDF_ESCAPES.get(escaped, escaped)
+    return re.sub(rb"\\([0-7]{1,3}|.)", replace, raw, flags=re.S).decode("latin-1")
+
+def _pdf_text_builtin(path: str) -> str:
+    with open(path, "rb") as f:
+        data = f.read()
+    parts = []
+    for match in _PDF_STREAM.finditer(data):
+        stream = match.group(1)
+        try:
+            stream = zlib.decompressobj().decompress(stream, MAX_INFLATED_BYTES)
+        except zlib.error:
+            pass  # not Flate-encoded
+        for op in _PDF_TEXT_OP.finditer(stream):
+            shown, array, position = op.groups()
+            if position:
+                parts.append("\n" if position in (b"T*", b"ET") else " ")
+            elif shown:
+                parts.append(_pdf_unescape(shown[1:-1]))
+            else:
+                parts.append("".join(_pdf_unescape(s) for s in _PDF_STRING.findall(array)))
+    return "".join(parts)
+
+def _read_member(archive: zipfile.ZipFile, name: str):
+    info = archive.getinfo(name)
+    if info.file_size > MAX_INFLATED_BYTES:
+        raise ValueError(f"{name} is too large to extract")
+    return archive.open(info)
+
+def _docx_text(path: str) -> str:
+    parts = []
+    with zipfile.ZipFile(path) as archive, _read_member(archive, "word/document.xml") as xml:
+        for _, element in ElementTree.iterparse(xml):
+            tag = element.tag.rsplit("}", 1)[-1]
+            if tag == "t":
+                parts.append(element.text or "")
+            elif tag == "tab":
+                parts.append(" ")
+            elif tag in ("p", "br"):
+                parts.append("\n")
+            if tag == "p":
+                element.clear()
+    return "".join(parts)
+
+def _odt_text(path: str) -> str:
+    parts = []
+    with zipfile.ZipFile(path) as archive, _read_member(archive, "content.xml") as xml:
+        for _, element in ElementTree.iterparse(xml):
+            if element.tag.rsplit("}", 1)[-1] in ("p", "h"):
+                parts.append("".join(element.itertext()))
+                element.clear()
+    return "\n".join(parts)
+
+def _rtf_text(path: str) -> str:
+    with open(path, "rb") as f:
+        data = f.read().decode("latin-1")
+    data = re.sub(r"\\'([0-9a-fA-F]{2})", lambda m: chr(int(m.group(1), 16)), data)
+    data = re.sub(r"\\(par|line)\b ?", "\n", data)
+    data = re.sub(r"\\[a-zA-Z]+-?\d* ?|\\[^a-zA-Z]", "", data)
+    return data.replace("{", "").replace("}", "")
+
+def _doc_text(path: str) -> str:
+    # Word 97-2003: the text sits in the WordDocument stream as UTF-16LE or
+    # single-byte runs; collect the longer printable runs of either
+    with open(path, "rb") as f:
+        data = f.read()
+    wide = [run.decode("utf-16-le") for run in re.findall(rb"(?:[\x20-\x7e]\x00){4,}", data)]
+    narrow = [run.decode("latin-1") for run in re.findall(rb"[\x20-\x7e]{8,}", data)]
+    runs = wide if sum(map(len, wide)) >= sum(map(len, narrow)) else narrow
+    return "\n".join(runs)
+
+def _plain_text(path: str) -> str:
+    with open(path, "rb") as f:
+        data = f.read(EXTRACTION_MAX_CHARS * 4)
+    try:
+        return data.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        return data.decode("latin-1")
+
+EXTRACTORS = {
+    "application/pdf": _pdf_text,
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document": _docx_text,
+    "application/vnd.oasis.opendocument.text": _odt_text,
+    "application/rtf": _rtf_text,
+    "application/msword": _doc_text,
+    "text/plain": _plain_text,
+}
+
+def extract_text(path: str, content_type: str) -> str:
+    """Plain text of a stored resume, whitespace-normalized and truncated"""
+    extractor = EXTRACTORS.get(content_type.split(";")[0].strip())
+    if extractor is None:
+        raise ValueError(f"No text extractor for {content_type}")
+    return _normalize(extractor(path))
+
+# ============== SKILL DETECTION ==============
+
+_TOKEN = re.compile(r"\w[\w+#.]*")
+
+# token tuple -> display name, set per worker process by init_worker()
+_vocabulary: Dict[Tuple[str, ...], str] = {}
+_max_ngram = 0
+
+def tokenize(text: str) -> List[str]:
+    # "Node.js," -> "node.js", "C++" -> "c++"; trailing dots end sentences
+    return [token.rstrip(".") for token in _TOKEN.findall(text.lower())]
+
+def init_worker(skills: List[Tuple[str, str]]):
+    """Load the (normalized name, display name) skills vocabulary into this process"""
+    global _vocabulary, _max_ngram
+    _vocabulary = {}
+    for name, display in skills:
+        tokens = tuple(tokenize(name))
+        # One-letter skills ("C", "R") would match initials everywhere
+        if tokens and len(name) > 1:
+            _vocabulary.setdefault(tokens, display)
+    _max_ngram = max((len(tokens) for tokens in _vocabulary), default=0)
+
+def detect_skills(text: str) -> List[str]:
+    """Display names of vocabulary skills mentioned in the text"""
+    tokens = tokenize(text)
+    found = {}
+    for start in range(len(tokens)):
+        for length in range(1, min(_max_ngram, len(tokens) - start) + 1):
+            display = _vocabulary.get(tuple(tokens[start:start + length]))
+            if display is not None:
+                found.setdefault(display.lower(), display)
+    return sorted(found.values(), key=str.lower)
+
+def process(sha256: str, path: str, content_type: str) -> Tuple[str, str, List[str], float]:
+    """Worker entry point: (sha256, text, detected skills, seconds spent)"""
+    started = time.perf_counter()
+    text = extract_text(path, content_type)
+    return sha256, text, detect_skills(text), time.perf_counter() - started
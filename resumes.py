@@ -0,0 +1,406 @@
+from fastapi import HTTPException, Request
+from fastapi.responses import Response, StreamingResponse
+from multipart.multipart import MultipartParser, parse_options_header
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import NamedTuple, Optional, Tuple
+from urllib.parse import quote
+import hashlib
+import os
+import tempfile
+import anyio
+import models
+import queries
+
+# Content-addressed resume storage.
+#
+# Uploads are parsed straight off the request stream with python-multipart's
+# push parser: file bytes are gathered into a buffer of at most
+# RESUME_WRITE_BUFFER bytes, which is hashed and written to a temp file in a
+# worker thread, so memory per upload stays constant whatever the file size.
+# The finished temp file is renamed to <dir>/ab/cd/<sha256>; identical files
+# uploaded for many candidates are stored once and share one resume_files
+# row. Replaced or deleted resumes are not removed inline (another upload
+# may be reusing the blob at that moment); `python resumes.py gc` deletes
+# blobs no candidate references once their last attach is older than a
+# grace period.
+#
+# Downloads stream the blob in RESUME_READ_CHUNK pieces with a strong ETag
+# (the SHA-256), Last-Modified, If-None-Match / If-Modified-Since (304),
+# and single byte ranges with If-Range (206 / 416).
+
+RESUME_STORAGE_DIR = os.getenv("RESUME_STORAGE_DIR", "./storage/resumes")
+RESUME_MAX_BYTES = int(os.getenv("RESUME_MAX_BYTES", 20 * 1024 * 1024))
+RESUME_WRITE_BUFFER = int(os.getenv("RESUME_WRITE_BUFFER", 1024 * 1024))
+RESUME_READ_CHUNK = 64 * 1024
+RESUME_GC_GRACE_HOURS = int(os.getenv("RESUME_GC_GRACE_HOURS", 24))
+
+# Extension -> served content type; the client's Content-Type is not trusted
+CONTENT_TYPES = {
+    ".pdf": "application/pdf",
+    ".doc": "application/msword",
+    ".docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    ".odt": "application/vnd.oasis.opendocument.text",
+    ".rtf": "application/rtf",
+    ".txt": "text/plain; charset=utf-8",
+}
+
+MAX_HEADER_BYTES = 16 * 1024
+
+class StoredFile(NamedTuple):
+    sha256: str
+    size: int
+    filename: str
+    content_type: str
+
+def blob_path(sha256: str) -> str:
+    """Location of a stored blob: two levels of fan-out by hash prefix"""
+    return os.path.join(RESUME_STORAGE_DIR, sha256[:2], sha256[2:4], sha256)
+
+def content_type_for(filename: str) -> Optional[str]:
+    return CONTENT_TYPES.get(os.path.splitext(filename.lower())[1])
+
+# ============== UPLOAD ==============
+
+class _BlobWriter:
+    """Hashes and writes one upload to a temp file; only ever called from worker threads"""
+
+    def __init__(self):
+        tmp_dir = os.path.join(RESUME_STORAGE_DIR, "tmp")
+        os.makedirs(tmp_dir, exist_ok=True)
+        fd, self.tmp_path = tempfile.mkstemp(dir=tmp_dir)
+        self.file = os.fdopen(fd, "wb")
+        self.hash = hashlib.sha256()
+        self.size = 0
+
+    def write(self, data: bytes):
+        self.hash.update(data)
+        self.file.write(data)
+        self.size += len(data)
+
+    def commit(self) -> str:
+        """Move the temp file into place; returns the SHA-256"""
+        self.file.close()
+        sha256 = self.hash.hexdigest()
+        path = blob_path(sha256)
+        if os.path.exists(path):
+            # Already stored: same hash, same bytes. Touch it so a GC pass
+            # racing this upload sees a fresh blob and keeps it
+            os.remove(self.tmp_path)
+            os.utime(path)
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(self.tmp_path, path)
+        return sha256
+
+    def discard(self):
+        self.file.close()
+        try:
+            os.remove(self.tmp_path)
+        except FileNotFoundError:
+            pass
+
+class _FilePart:
+    """python-multipart callbacks that route one named file field into a buffer"""
+
+    def __init__(self, field: str):
+        self.field = field
+        self.headers = {}
+        self.header_field = bytearray()
+        self.header_value = bytearray()
+        self.header_bytes = 0
+        self.in_target = False
+        self.filename: Optional[str] = None
+        self.buffer = bytearray()
+        self.found = False
+        self.finished = False
+
+    def callbacks(self) -> dict:
+        return {
+            "on_part_begin": self.on_part_begin,
+            "on_header_field": self.on_header_field,
+            "on_header_value": self.on_header_value,
+            "on_header_end": self.on_header_end,
+            "on_headers_finished": self.on_headers_finished,
+            "on_part_data": self.on_part_data,
+            "on_part_end": self.on_part_end,
+        }
+
+    def on_part_begin(self):
+        self.headers = {}
+        self.header_bytes = 0
+        self.in_target = False
+
+    def _count(self, size: int):
+        self.header_bytes += size
+        if self.header_bytes > MAX_HEADER_BYTES:
+            raise HTTPException(status_code=400, detail="Multipart part headers too large")
+
+    def on_header_field(self, data: bytes, start: int, end: int):
+        self._count(end - start)
+        self.header_field += data[start:end]
+
+    def on_header_value(self, data: bytes, start: int, end: int):
+        self._count(end - start)
+        self.header_value += data[start:end]
+
+    def on_header_end(self):
+        self.headers[bytes(self.header_field).lower()] = bytes(self.header_value)
+        self.header_field.clear()
+        self.header_value.clear()
+
+    def on_headers_finished(self):
+        _, options = parse_options_header(self.headers.get(b"content-disposition", b""))
+        name = options.get(b"name", b"").decode("utf-8", "replace")
+        if name == self.field and not self.found and b"filename" in options:
+            self.in_target = True
+            self.found = True
+            self.filename = os.path.basename(options[b"filename"].decode("utf-8", "replace").replace("\\", "/"))
+
+    def on_part_data(self, data: bytes, start: int, end: int):
+        if self.in_target:
+            self.buffer += data[start:end]
+
+    def on_part_end(self):
+        if self.in_target:
+            self.in_target = False
+            self.finished = True
+
+async def receive_upload(request: Request, field: str = "file") -> StoredFile:
+    """Stream a multipart/form-data file field to content-addressed storage"""
+    content_type, options = parse_options_header(request.headers.get("content-type", ""))
+    boundary = options.get(b"boundary")
+    if content_type != b"multipart/form-data" or not boundary:
+        raise HTTPException(status_code=400, detail="Expected a multipart/form-data upload")
+    declared = request.headers.get("content-length")
+    if declared and declared.isdigit() and int(declared) > RESUME_MAX_BYTES + MAX_HEADER_BYTES:
+        raise HTTPException(status_code=413, detail=f"Resume exceeds {RESUME_MAX_BYTES} bytes")
+
+    part = _FilePart(field)
+    parser = MultipartParser(boundary, part.callbacks())
+    writer: Optional[_BlobWriter] = None
+    try:
+        async for chunk in request.stream():
+            parser.write(chunk)
+            if part.found and writer is None:
+                if not content_type_for(part.filename or ""):
+                    raise HTTPException(
+                        status_code=415,
+                        detail=f"Unsupported resume type; upload one of {', '.join(sorted(CONTENT_TYPES))}"
+                    )
+                writer = await run_in_threadpool(_BlobWriter)
+            if writer is not None and len(part.buffer) >= RESUME_WRITE_BUFFER:
+                await _flush(writer, part)
+        parser.finalize()
+
+        if writer is None or not part.finished:
+            raise HTTPException(status_code=400, detail=f"Missing file field '{field}'")
+        await _flush(writer, part)
+        if writer.size == 0:
+            raise HTTPException(status_code=400, detail="Uploaded resume is empty")
+        sha256 = await run_in_threadpool(writer.commit)
+    except BaseException:
+        if writer is not None:
+            await run_in_threadpool(writer.discard)
+        raise
+    return StoredFile(sha256, writer.size, part.filename, content_type_for(part.filename))
+
+async def _flush(writer: _BlobWriter, part: _FilePart):
+    if writer.size + len(part.buffer) > RESUME_MAX_BYTES:
+        raise HTTPException(status_code=413, detail=f"Resume exceeds {RESUME_MAX_BYTES} bytes")
+    data = bytes(part.buffer)
+    part.buffer.clear()
+    await run_in_threadpool(writer.write, data)
+
+async def attach(db: AsyncSession, candidate: models.Candidate, stored: StoredFile):
+    """Record the blob (once per hash) and point the candidate at it; the caller commits"""
+    now = datetime.utcnow()
+    await db.execute(
+        queries.insert_ignore(db, models.ResumeFile).values(
+            sha256=stored.sha256, size=stored.size, content_type=stored.content_type, created_at=now, attached_at=now
+        )
+    )
+    # A re-upload of an old file restarts its GC grace period
+    await db.execute(
+        update(models.ResumeFile).where(models.ResumeFile.sha256 == stored.sha256).values(attached_at=now)
+    )
+    candidate.resume_sha256 = stored.sha256
+    candidate.resume_filename = stored.filename
+    candidate.resume_url = f"/api/candidates/{candidate.id}/resume"
+
+# ============== DOWNLOAD ==============
+
+def _http_date(value: datetime) -> str:
+    return format_datetime(value.replace(tzinfo=timezone.utc, microsecond=0), usegmt=True)
+
+def _parse_http_date(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+def _etag_matches(header: str, etag: str) -> bool:
+    # Weak comparison, as If-None-Match requires
+    tags = [tag.strip() for tag in header.split(",")]
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """(start, end) inclusive for a single satisfiable byte range, None to serve the whole file
+
+    Raises 416 for a well-formed range that lies outside the file. Multiple
+    ranges are answered with the full representation, which RFC 9110 allows.
+    """
+    if not header:
+        return None
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, dash, last = spec.strip().partition("-")
+    if not dash:
+        return None
+    try:
+        if first == "":
+            # Suffix range: the last N bytes
+            length = int(last)
+            if length <= 0:
+                raise ValueError
+            start, end = max(size - length, 0), size - 1
+        else:
+            start = int(first)
+            end = int(last) if last else None
+            if end is not None and end < start:
+                return None
+    except ValueError:
+        return None
+    if start >= size:
+        raise HTTPException(
+            status_code=416,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{size}"}
+        )
+    return start, size - 1 if end is None else min(end, size - 1)
+
+async def _read_blob(path: str, start: int, length: int):
+    async with await anyio.open_file(path, "rb") as f:
+        await f.seek(start)
+        while length > 0:
+            chunk = await f.read(min(RESUME_READ_CHUNK, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+def file_response(request: Request, stored: models.ResumeFile, filename: Optional[str]) -> Response:
+    """Serve a stored blob honouring conditional and Range request headers"""
+    path = blob_path(stored.sha256)
+    if not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="Resume file is missing from storage")
+
+    etag = f'"{stored.sha256}"'
+    last_modified = stored.created_at.replace(microsecond=0)
+    headers = {
+        "ETag": etag,
+        "Last-Modified": _http_date(last_modified),
+        "Accept-Ranges": "bytes",
+        # Private data, and the same URL serves a new file after a re-upload
+        "Cache-Control": "private, no-cache",
+        "Content-Disposition": f"inline; filename*=UTF-8''{quote(filename or 'resume')}",
+        "X-Content-Type-Options": "nosniff",
+    }
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if _etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=headers)
+    else:
+        since = _parse_http_date(request.headers.get("if-modified-since"))
+        if since is not None and last_modified <= since:
+            return Response(status_code=304, headers=headers)
+
+    size = stored.size
+    byte_range = None
+    if_range = request.headers.get("if-range")
+    if if_range is None or if_range.strip() == etag or _parse_http_date(if_range) == last_modified:
+        byte_range = parse_range(request.headers.get("range"), size)
+
+    status_code, start, length = 200, 0, size
+    if byte_range is not None:
+        start, end = byte_range
+        status_code, length = 206, end - start + 1
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(length)
+
+    if request.method == "HEAD":
+        return Response(status_code=status_code, headers=headers, media_type=stored.content_type)
+    return StreamingResponse(
+        _read_blob(path, start, length), status_code=status_code, headers=headers, media_type=stored.content_type
+    )
+
+# ============== GARBAGE COLLECTION ==============
+
+async def collect_garbage(db: AsyncSession, grace_hours: int = RESUME_GC_GRACE_HOURS) -> Tuple[int, int]:
+    """Delete blobs and temp files no candidate references; returns (files, bytes) removed"""
+    cutoff = datetime.utcnow() - timedelta(hours=grace_hours)
+    resume_files = models.ResumeFile.__table__
+    orphaned = (
+        (resume_files.c.attached_at < cutoff) &
+        ~select(models.Candidate.id).where(models.Candidate.resume_sha256 == resume_files.c.sha256).exists()
+    )
+    result = await db.execute(select(resume_files.c.sha256, resume_files.c.size).where(orphaned))
+    orphans = result.all()
+    removed, freed = 0, 0
+    for sha256, size in orphans:
+        path = blob_path(sha256)
+        # A fresh mtime means an upload is re-storing this blob right now;
+        # keep the row with it so a later pass can still find the file
+        try:
+            if datetime.utcfromtimestamp(os.stat(path).st_mtime) >= cutoff:
+                continue
+        except FileNotFoundError:
+            pass
+        # Re-checked in the DELETE: an upload may have attached the file since
+        result = await db.execute(resume_files.delete().where(resume_files.c.sha256 == sha256, orphaned))
+        if result.rowcount != 1:
+            continue
+        try:
+            os.remove(path)
+            removed, freed = removed + 1, freed + size
+        except FileNotFoundError:
+            pass
+    await db.commit()
+
+    # Temp files left behind by crashed uploads
+    tmp_dir = os.path.join(RESUME_STORAGE_DIR, "tmp")
+    if os.path.isdir(tmp_dir):
+        for entry in os.scandir(tmp_dir):
+            if datetime.utcfromtimestamp(entry.stat().st_mtime) < cutoff:
+                freed += entry.stat().st_size
+                os.remove(entry.path)
+                removed += 1
+    return removed, freed
+
+if __name__ == "__main__":
+    import argparse
+    import asyncio
+    from database import async_session
+
+    parser = argparse.ArgumentParser(description="Maintain content-addressed resume storage")
+    parser.add_argument("command", choices=["gc"])
+    parser.add_argument("--grace-hours", type=int, default=RESUME_GC_GRACE_HOURS,
+                        help="keep unreferenced files younger than this")
+    args = parser.parse_args()
+
+    async def _run():
+        async with async_session() as db:
+            removed, freed = await collect_garbage(db, args.grace_hours)
+        print(f"Removed {removed} files ({freed} bytes)")
+
+    asyncio.run(_run())
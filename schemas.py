@@ -1,6 +1,6 @@
 from pydantic import BaseModel, EmailStr
-from datetime import datetime
-from typing import Optional, List
+from datetime import date, datetime
+from typing import Optional, List, Dict
 from models import JobStatus, ApplicationStatus
 
 # User schemas
@@ -52,6 +52,11 @@ class Job(JobBase):
 
 class JobWithApplicationCount(Job):
     application_count: int = 0
+    status_counts: Dict[str, int] = {}
+
+class JobSearchResult(Job):
+    rank: float = 0.0
+    snippet: Optional[str] = None
 
 # Candidate schemas
 class CandidateBase(BaseModel):
@@ -80,12 +85,45 @@ class CandidateUpdate(BaseModel):
 class Candidate(CandidateBase):
     id: int
     resume_url: Optional[str] = None
+    resume_filename: Optional[str] = None
     created_at: datetime
     updated_at: datetime
     
     class Config:
         from_attributes = True
 
+class CandidateSearchResult(Candidate):
+    rank: float = 0.0
+    snippet: Optional[str] = None
+
+class ImportRowError(BaseModel):
+    row: int
+    email: Optional[str] = None
+    error: str
+
+class CandidateImportReport(BaseModel):
+    format: str
+    total_rows: int
+    inserted: int
+    updated: int
+    skipped_duplicates: int
+    failed: int
+    batches: int
+    errors: List[ImportRowError]
+    errors_truncated: bool
+    elapsed_seconds: float
+    rows_per_second: Optional[float] = None
+
+# Skill schemas
+class SkillFacet(BaseModel):
+    skill: str
+    count: int
+
+class CandidateSkillSearch(BaseModel):
+    candidates: List[Candidate]
+    total: int
+    facets: List[SkillFacet]
+
 # Application schemas
 class ApplicationBase(BaseModel):
     job_id: int
@@ -110,10 +148,38 @@ class Application(ApplicationBase):
     class Config:
         from_attributes = True
 
+class ApplicationFilter(BaseModel):
+    job_id: Optional[int] = None
+    candidate_id: Optional[int] = None
+    status: Optional[ApplicationStatus] = None
+
+class BulkStatusUpdate(BaseModel):
+    status: ApplicationStatus
+    notes: Optional[str] = None
+    application_ids: Optional[List[int]] = None
+    filter: Optional[ApplicationFilter] = None
+
+class BulkStatusItem(BaseModel):
+    application_id: int
+    result: str  # updated, skipped or not_found
+    old_status: Optional[ApplicationStatus] = None
+
+class BulkStatusResult(BaseModel):
+    status: ApplicationStatus
+    updated: int
+    skipped: int
+    not_found: int
+    results: List[BulkStatusItem]
+
 class ApplicationWithDetails(Application):
     job: Job
     candidate: Candidate
 
+class ApplicationSlim(Application):
+    job_title: str
+    candidate_name: str
+    candidate_email: EmailStr
+
 # Status History schemas
 class StatusHistoryBase(BaseModel):
     old_status: Optional[ApplicationStatus] = None
@@ -128,3 +194,138 @@ class StatusHistory(StatusHistoryBase):
     
     class Config:
         from_attributes = True
+
+# Delta sync schemas
+class SyncTombstone(BaseModel):
+    entity: str  # jobs, candidates or applications
+    id: int
+    deleted_at: datetime
+
+class SyncResponse(BaseModel):
+    jobs: List[Job] = []
+    candidates: List[Candidate] = []
+    applications: List[Application] = []
+    deleted: List[SyncTombstone] = []
+    next_token: str
+    has_more: bool
+
+# Pipeline analytics schemas
+class FunnelStage(BaseModel):
+    stage: ApplicationStatus
+    entered: int
+    conversion_rate: Optional[float] = None  # entered / entered into the previous stage
+
+class FunnelGroup(BaseModel):
+    key: Optional[int] = None  # job or recruiter id when grouped or filtered (0 = unassigned recruiter)
+    total: int
+    stages: List[FunnelStage]
+    rejected: int
+
+class FunnelReport(BaseModel):
+    date_from: date
+    date_to: date
+    group_by: Optional[str] = None
+    groups: List[FunnelGroup]
+
+class StageTime(BaseModel):
+    stage: ApplicationStatus
+    exits: int
+    mean_hours: float
+    median_hours: Optional[float] = None
+    p90_hours: Optional[float] = None
+
+class StageTimeGroup(BaseModel):
+    key: Optional[int] = None
+    total: int
+    stages: List[StageTime]
+
+class TimeInStageReport(BaseModel):
+    date_from: date
+    date_to: date
+    group_by: Optional[str] = None
+    groups: List[StageTimeGroup]
+
+# Dashboard trend schemas
+class TrendPoint(BaseModel):
+    start: date  # first day of the bucket
+    value: int
+
+class TrendSeries(BaseModel):
+    key: Optional[int] = None  # job or recruiter id when grouped or filtered
+    total: int
+    points: List[TrendPoint]
+
+class TrendReport(BaseModel):
+    metric: str
+    bucket: str
+    date_from: date
+    date_to: date
+    group_by: Optional[str] = None
+    series: List[TrendSeries]
+
+# Resume text extraction schemas
+class ExtractionFailure(BaseModel):
+    sha256: str
+    attempts: int
+    last_error: Optional[str] = None
+    finished_at: Optional[datetime] = None
+
+class ExtractionStatus(BaseModel):
+    pending: int
+    running: int
+    done: int
+    failed: int
+    oldest_pending_seconds: Optional[float] = None
+    workers: int
+    throughput_per_minute: float
+    recent_failures: List[ExtractionFailure]
+
+# Background task schemas
+class Task(BaseModel):
+    id: int
+    name: str
+    payload: str
+    status: str
+    attempts: int
+    max_attempts: int
+    run_after: datetime
+    idempotency_key: Optional[str] = None
+    last_error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
+
+class TaskStats(BaseModel):
+    pending: int
+    running: int
+    done: int
+    dead: int
+    oldest_due_seconds: Optional[float] = None
+
+# Matching schemas
+class MatchTerm(BaseModel):
+    term: str
+    score: float
+
+class Match(BaseModel):
+    id: int
+    name: str  # candidate name or job title
+    score: float
+    experience_factor: float
+    experience_years: Optional[float] = None
+    required_years: Optional[float] = None
+    terms: List[MatchTerm]
+
+class MatchingStatus(BaseModel):
+    generation: str
+    built_at: datetime
+    backend: str
+    terms: int
+    indexed_jobs: int
+    indexed_candidates: int
+    changed_jobs: int
+    changed_candidates: int
+    rebuilding: bool
@@ -0,0 +1,213 @@
+from sqlalchemy import select, func, table, column, literal_column, inspect
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+import html
+import re
+import models
+
+# Full-text search over jobs and candidates.
+#
+# On SQLite builds with FTS5, each searchable table gets an external-content
+# FTS5 index (jobs_fts, candidates_fts) kept in sync by AFTER INSERT / UPDATE
+# / DELETE triggers, so every write path - ORM, Core bulk inserts or manual
+# SQL - updates the index in the same transaction. Searches become prefix
+# MATCH queries ranked by bm25 instead of LIKE '%term%' table scans. On other
+# databases, or SQLite without FTS5, everything falls back to the previous
+# LIKE behaviour. Candidates are also searched by the text extracted from
+# their resumes (extraction.py), ranked well below name, email and skills.
+
+FTS_INDEXES = {
+    "jobs": {"index": "jobs_fts", "columns": ["title", "description"]},
+    "candidates": {"index": "candidates_fts", "columns": ["name", "email", "skills", "resume_text"]},
+}
+
+# Column weights for bm25(), in FTS_INDEXES column order
+RANK_WEIGHTS = {
+    "jobs": [10.0, 1.0],
+    "candidates": [10.0, 5.0, 3.0, 1.0],
+}
+
+# Sentinels survive html.escape() and are swapped for <mark> afterwards
+_MARK_START = "\x02"
+_MARK_END = "\x03"
+
+# Set at startup by detect_fts_indexes(); the indexes are created by migration 0003
+fts_enabled = False
+
+def _trigger_sql(source: str, index: str, columns: List[str]) -> List[str]:
+    cols = ", ".join(columns)
+    new_vals = ", ".join(f"new.{c}" for c in columns)
+    old_vals = ", ".join(f"old.{c}" for c in columns)
+    return [
+        f"""CREATE TRIGGER IF NOT EXISTS {index}_ai AFTER INSERT ON {source} BEGIN
+            INSERT INTO {index}(rowid, {cols}) VALUES (new.id, {new_vals});
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {index}_ad AFTER DELETE ON {source} BEGIN
+            INSERT INTO {index}({index}, rowid, {cols}) VALUES ('delete', old.id, {old_vals});
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {index}_au AFTER UPDATE OF {cols} ON {source} BEGIN
+            INSERT INTO {index}({index}, rowid, {cols}) VALUES ('delete', old.id, {old_vals});
+            INSERT INTO {index}(rowid, {cols}) VALUES (new.id, {new_vals});
+        END""",
+    ]
+
+def create_fts_index(connection, source: str, index: str, columns: List[str]):
+    """Create one FTS5 index with its sync triggers, backfilling it if new"""
+    exists = connection.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (index,)
+    ).first()
+
+    connection.exec_driver_sql(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {index} USING fts5("
+        f"{', '.join(columns)}, content='{source}', content_rowid='id', "
+        f"tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+    )
+    for statement in _trigger_sql(source, index, columns):
+        connection.exec_driver_sql(statement)
+
+    # Backfill rows written before the index existed
+    if not exists:
+        connection.exec_driver_sql(f"INSERT INTO {index}({index}) VALUES ('rebuild')")
+
+def create_fts_indexes(connection, indexes: Optional[dict] = None) -> bool:
+    """Create the FTS5 indexes and sync triggers if supported (run via conn.run_sync)
+
+    Migrations pass the `indexes` spec as of their revision; the default is
+    the current FTS_INDEXES.
+    """
+    global fts_enabled
+
+    if connection.dialect.name != "sqlite":
+        fts_enabled = False
+        return False
+
+    try:
+        connection.exec_driver_sql("CREATE VIRTUAL TABLE IF NOT EXISTS temp.fts5_probe USING fts5(x)")
+        connection.exec_driver_sql("DROP TABLE temp.fts5_probe")
+    except OperationalError:
+        print("SQLite FTS5 not available; search falls back to LIKE")
+        fts_enabled = False
+        return False
+
+    for source, spec in (indexes or FTS_INDEXES).items():
+        create_fts_index(connection, source, spec["index"], spec["columns"])
+
+    fts_enabled = True
+    return True
+
+def detect_fts_indexes(connection) -> bool:
+    """Enable FTS search if the migrated indexes exist (run via conn.run_sync)"""
+    global fts_enabled
+
+    if connection.dialect.name != "sqlite":
+        fts_enabled = False
+        return False
+
+    names = {row[0] for row in connection.exec_driver_sql(
+        "SELECT name FROM sqlite_master WHERE type = 'table'"
+    )}
+    fts_enabled = all(spec["index"] in names for spec in FTS_INDEXES.values())
+    return fts_enabled
+
+def drop_fts_indexes(connection):
+    """Drop the FTS5 indexes and their triggers (run via conn.run_sync)"""
+    global fts_enabled
+
+    for spec in FTS_INDEXES.values():
+        drop_fts_index(connection, spec["index"])
+    fts_enabled = False
+
+def drop_fts_index(connection, index: str):
+    """Drop one FTS5 index and its triggers"""
+    for suffix in ("ai", "ad", "au"):
+        connection.exec_driver_sql(f"DROP TRIGGER IF EXISTS {index}_{suffix}")
+    connection.exec_driver_sql(f"DROP TABLE IF EXISTS {index}")
+
+def match_expression(term: str) -> Optional[str]:
+    """Turn free text into an FTS5 query: every word must match as a prefix"""
+    tokens = re.findall(r"\w+", term)
+    if not tokens:
+        return None
+    return " ".join(f'"{token}"*' for token in tokens)
+
+def _like_filter(model, term: str):
+    if model is models.Job:
+        return models.Job.title.contains(term) | models.Job.description.contains(term)
+    return (
+        models.Candidate.name.contains(term) |
+        models.Candidate.email.contains(term) |
+        models.Candidate.skills.contains(term) |
+        models.Candidate.resume_text.contains(term)
+    )
+
+def _fts_subquery(source: str, expression: str):
+    index = FTS_INDEXES[source]["index"]
+    return (
+        select(column("rowid"))
+        .select_from(table(index))
+        .where(literal_column(index).op("MATCH")(expression))
+    )
+
+def search_filter(model, term: str):
+    """WHERE clause restricting model (Job or Candidate) to rows matching term"""
+    expression = match_expression(term) if fts_enabled else None
+    if expression is None:
+        return _like_filter(model, term)
+    return model.id.in_(_fts_subquery(model.__tablename__, expression))
+
+def _loaded_columns(row) -> dict:
+    # Deferred columns (Candidate.resume_text) are left out rather than lazy-loaded
+    unloaded = inspect(row).unloaded
+    return {c.name: getattr(row, c.name) for c in row.__table__.columns if c.key not in unloaded}
+
+def _render_snippet(snippet: Optional[str]) -> Optional[str]:
+    if snippet is None:
+        return None
+    return (
+        html.escape(snippet)
+        .replace(_MARK_START, "<mark>")
+        .replace(_MARK_END, "</mark>")
+    )
+
+async def ranked_search(db: AsyncSession, model, term: str, limit: int = 20) -> List[dict]:
+    """Best matches for term, most relevant first, with HTML-safe highlighted snippets"""
+    source = model.__tablename__
+    expression = match_expression(term) if fts_enabled else None
+
+    if expression is None:
+        query = (
+            select(model)
+            .where(_like_filter(model, term))
+            .order_by(model.created_at.desc(), model.id.desc())
+            .limit(limit)
+        )
+        result = await db.execute(query)
+        return [
+            {**_loaded_columns(row), "rank": 0.0, "snippet": None}
+            for row in result.scalars()
+        ]
+
+    index = FTS_INDEXES[source]["index"]
+    fts = literal_column(index)
+    rank = func.bm25(fts, *RANK_WEIGHTS[source]).label("rank")
+    snippet = func.snippet(fts, -1, _MARK_START, _MARK_END, "…", 12).label("snippet")
+
+    query = (
+        select(model, rank, snippet)
+        .select_from(table(index))
+        .join(model, model.id == literal_column(f"{index}.rowid"))
+        .where(fts.op("MATCH")(expression))
+        .order_by(rank)
+        .limit(limit)
+    )
+    result = await db.execute(query)
+    return [
+        {
+            **_loaded_columns(row),
+            # bm25() is lower-is-better; flip it so clients can sort descending
+            "rank": -score,
+            "snippet": _render_snippet(text_snippet)
+        }
+        for row, score, text_snippet in result
+    ]
@@ -0,0 +1,202 @@
+from sqlalchemy import select, func, delete, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, Iterable, List, Optional, Tuple
+import json
+import re
+import models
+import pagination
+import queries
+
+# Normalized skills index.
+#
+# Candidate.skills stays the free-form text the UI edits ("Python, React" or
+# a JSON list). Each candidate's skills are parsed into the shared `skills`
+# table and linked through `candidate_skills`, which is indexed on
+# (skill_id, candidate_id) so skill filters and facet counts are index
+# lookups on exact skill names ("java" no longer matches "javascript").
+# Skills detected in a candidate's resume are linked the same way.
+
+_SPLIT = re.compile(r"[,;\n|]")
+
+def normalize_skill(raw: str) -> str:
+    """Canonical form used for matching: trimmed, lowercase, single-spaced"""
+    return " ".join(raw.split()).lower()
+
+def parse_skills(raw: Optional[str]) -> Dict[str, str]:
+    """Parse a skills field into {normalized: display name}"""
+    if not raw:
+        return {}
+
+    items = None
+    stripped = raw.strip()
+    if stripped.startswith("["):
+        try:
+            items = [str(item) for item in json.loads(stripped)]
+        except ValueError:
+            items = None
+    if items is None:
+        items = _SPLIT.split(raw)
+
+    parsed = {}
+    for item in items:
+        display = " ".join(item.split())
+        if display:
+            parsed.setdefault(normalize_skill(display), display)
+    return parsed
+
+async def resolve_skill_ids(db: AsyncSession, skills: Dict[str, str]) -> Dict[str, int]:
+    """Map normalized skill names to ids, creating any that don't exist yet"""
+    if not skills:
+        return {}
+
+    names = list(skills)
+    result = await db.execute(
+        select(models.Skill.name, models.Skill.id).where(models.Skill.name.in_(names))
+    )
+    ids = dict(result.all())
+
+    missing = [name for name in names if name not in ids]
+    if missing:
+        await db.execute(
+            # Concurrent writers introducing the same new skill must not fail each other
+            queries.insert_ignore(db, models.Skill),
+            [{"name": name, "display_name": skills[name]} for name in missing]
+        )
+        result = await db.execute(
+            select(models.Skill.name, models.Skill.id).where(models.Skill.name.in_(missing))
+        )
+        ids.update(result.all())
+    return ids
+
+async def index_candidates(db: AsyncSession, candidates: Iterable[Tuple[int, Optional[str]]]):
+    """Replace the skill links for a batch of (candidate_id, skills text) pairs
+
+    Links cover the profile skills plus any detected in the candidate's
+    resume (Candidate.resume_skills, written by extraction.py).
+    """
+    parsed = {candidate_id: parse_skills(raw) for candidate_id, raw in candidates}
+    if not parsed:
+        return
+
+    result = await db.execute(
+        select(models.Candidate.id, models.Candidate.resume_skills)
+        .where(models.Candidate.id.in_(list(parsed)), models.Candidate.resume_skills.isnot(None))
+    )
+    for candidate_id, detected in result:
+        for name, display in parse_skills(detected).items():
+            parsed[candidate_id].setdefault(name, display)
+
+    all_skills = {}
+    for skills in parsed.values():
+        for name, display in skills.items():
+            all_skills.setdefault(name, display)
+    skill_ids = await resolve_skill_ids(db, all_skills)
+
+    await db.execute(
+        delete(models.CandidateSkill).where(models.CandidateSkill.candidate_id.in_(list(parsed)))
+    )
+    links = [
+        {"candidate_id": candidate_id, "skill_id": skill_ids[name]}
+        for candidate_id, skills in parsed.items()
+        for name in skills
+    ]
+    if links:
+        await db.execute(insert(models.CandidateSkill), links)
+
+def matching_candidates(skills: List[str], match_all: bool):
+    """Subquery of candidate ids having any (or all) of the given skills"""
+    names = sorted({normalize_skill(s) for s in skills if s.strip()})
+    query = (
+        select(models.CandidateSkill.candidate_id)
+        .join(models.Skill, models.Skill.id == models.CandidateSkill.skill_id)
+        .where(models.Skill.name.in_(names))
+        .group_by(models.CandidateSkill.candidate_id)
+    )
+    if match_all:
+        query = query.having(func.count(models.CandidateSkill.skill_id) == len(names))
+    return query
+
+async def filter_candidates(
+    db: AsyncSession,
+    skills: List[str],
+    match_all: bool = False,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[pagination.Cursor] = None,
+    facet_limit: int = 20
+) -> Tuple[pagination.Page, int, List[dict]]:
+    """Page of candidates matching the skills, plus total and per-skill facet counts"""
+    matches = matching_candidates(skills, match_all).subquery()
+
+    query = select(models.Candidate).where(models.Candidate.id.in_(select(matches.c.candidate_id)))
+    query = pagination.apply_keyset(
+        query, models.Candidate.created_at, models.Candidate.id, cursor, skip, limit
+    )
+    result = await db.execute(query)
+    page = pagination.build_page(result.scalars().all(), cursor, skip, limit, lambda c: (c.created_at, c.id))
+
+    total_result = await db.execute(select(func.count()).select_from(matches))
+    total = total_result.scalar()
+
+    # Facets cover the whole result set, not just the current page
+    facet_result = await db.execute(
+        select(models.Skill.display_name, func.count(models.CandidateSkill.candidate_id).label("count"))
+        .join(models.CandidateSkill, models.CandidateSkill.skill_id == models.Skill.id)
+        .where(models.CandidateSkill.candidate_id.in_(select(matches.c.candidate_id)))
+        .group_by(models.Skill.id, models.Skill.display_name)
+        .order_by(func.count(models.CandidateSkill.candidate_id).desc(), models.Skill.display_name)
+        .limit(facet_limit)
+    )
+    facets = [{"skill": name, "count": count} for name, count in facet_result]
+    return page, total, facets
+
+async def top_skills(db: AsyncSession, prefix: Optional[str] = None, limit: int = 50) -> List[dict]:
+    """Most common skills, optionally filtered by a name prefix (for autocomplete)"""
+    query = (
+        select(models.Skill.display_name, func.count(models.CandidateSkill.candidate_id).label("count"))
+        .join(models.CandidateSkill, models.CandidateSkill.skill_id == models.Skill.id)
+        .group_by(models.Skill.id, models.Skill.display_name)
+        .order_by(func.count(models.CandidateSkill.candidate_id).desc(), models.Skill.display_name)
+        .limit(limit)
+    )
+    if prefix:
+        query = query.where(models.Skill.name.startswith(normalize_skill(prefix), autoescape=True))
+    result = await db.execute(query)
+    return [{"skill": name, "count": count} for name, count in result]
+
+async def backfill(db: AsyncSession, batch_size: int = 1000) -> int:
+    """Re-index every candidate's skills in id-ordered batches, committing each batch"""
+    last_id = 0
+    indexed = 0
+    while True:
+        result = await db.execute(
+            select(models.Candidate.id, models.Candidate.skills)
+            .where(models.Candidate.id > last_id)
+            .order_by(models.Candidate.id)
+            .limit(batch_size)
+        )
+        batch = result.all()
+        if not batch:
+            return indexed
+        await index_candidates(db, batch)
+        await db.commit()
+        last_id = batch[-1][0]
+        indexed += len(batch)
+        print(f"Indexed skills for {indexed} candidates (up to id {last_id})")
+
+if __name__ == "__main__":
+    import argparse
+    import asyncio
+    from database import async_session
+
+    parser = argparse.ArgumentParser(description="Maintain the normalized skills index")
+    parser.add_argument("command", choices=["backfill"])
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    async def _backfill():
+        async with async_session() as db:
+            total = await backfill(db, batch_size=args.batch_size)
+        print(f"Done: {total} candidates indexed")
+
+    asyncio.run(_backfill())
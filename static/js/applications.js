@@ -8,6 +8,7 @@ const statusColumns = ['applied', 'screening', 'interview', 'offer', 'hired', 'r
 document.addEventListener('DOMContentLoaded', () => {
     loadAllData();
     setupEventListeners();
+    setupLiveUpdates();
 });
 
 function setupEventListeners() {
@@ -57,13 +58,7 @@ async function loadAllData() {
         allCandidates = await candidatesRes.json();
 
         loadingState.style.display = 'none';
-
-        if (currentApplications.length === 0) {
-            emptyState.style.display = 'flex';
-        } else {
-            pipelineView.style.display = 'flex';
-            displayApplications();
-        }
+        renderPipeline();
     } catch (error) {
         console.error('Error loading data:', error);
         loadingState.style.display = 'none';
@@ -71,6 +66,91 @@ async function loadAllData() {
     }
 }
 
+// Patch the board from server events instead of reloading all three lists
+function setupLiveUpdates() {
+    window.liveUpdates
+        .on('application', handleApplicationEvent)
+        .on('job', handleJobEvent)
+        .on('candidate', handleCandidateEvent)
+        .onResync(loadAllData)
+        .start();
+}
+
+// Merge an application row (event fields or API response) into local state
+function applyApplication(row) {
+    const existing = currentApplications.find(app => app.id === row.id);
+    const job = allJobs.find(j => j.id === (row.job_id ?? existing?.job_id));
+    const candidate = allCandidates.find(c => c.id === (row.candidate_id ?? existing?.candidate_id));
+
+    if (!existing && (!job || !candidate)) {
+        // Refers to a job or candidate we haven't seen yet
+        loadAllData();
+        return false;
+    }
+
+    upsertById(currentApplications, { ...row, job: job || existing.job, candidate: candidate || existing.candidate });
+    return true;
+}
+
+function handleApplicationEvent(event) {
+    if (event.action === 'bulk_updated') {
+        const moved = new Set(event.ids);
+        currentApplications.forEach(app => {
+            if (moved.has(app.id)) app.status = event.status;
+        });
+    } else if (!applyApplication({ id: event.id, ...event.fields })) {
+        return;
+    }
+    renderPipeline();
+}
+
+function handleJobEvent(event) {
+    if (event.action === 'deleted') {
+        removeById(allJobs, event.id);
+        currentApplications = currentApplications.filter(app => app.job_id !== event.id);
+    } else {
+        const job = upsertById(allJobs, { id: event.id, ...event.fields });
+        currentApplications.forEach(app => {
+            if (app.job_id === job.id) app.job = job;
+        });
+    }
+    renderPipeline();
+}
+
+async function handleCandidateEvent(event) {
+    if (event.action === 'imported') {
+        // Bulk imports aren't sent row by row; only the dropdown needs them
+        const response = await fetch('/api/candidates');
+        if (response.ok) allCandidates = await response.json();
+        return;
+    }
+
+    if (event.action === 'deleted') {
+        removeById(allCandidates, event.id);
+        currentApplications = currentApplications.filter(app => app.candidate_id !== event.id);
+    } else {
+        const candidate = upsertById(allCandidates, { id: event.id, ...event.fields });
+        currentApplications.forEach(app => {
+            if (app.candidate_id === candidate.id) app.candidate = candidate;
+        });
+    }
+    renderPipeline();
+}
+
+function renderPipeline() {
+    const emptyState = document.getElementById('emptyState');
+    const pipelineView = document.getElementById('pipelineView');
+
+    if (currentApplications.length === 0) {
+        pipelineView.style.display = 'none';
+        emptyState.style.display = 'flex';
+    } else {
+        emptyState.style.display = 'none';
+        pipelineView.style.display = 'flex';
+        displayApplications();
+    }
+}
+
 function displayApplications() {
     // Clear all columns
     statusColumns.forEach(status => {
@@ -178,9 +258,9 @@ async function handleApplicationSubmit(e) {
             throw new Error(error.detail || 'Failed to create application');
         }
 
+        if (applyApplication(await response.json())) renderPipeline();
         window.toast.success('Application created successfully!');
         closeApplicationModal();
-        loadAllData();
     } catch (error) {
         console.error('Error creating application:', error);
         window.toast.error(error.message || 'Failed to create application');
@@ -233,9 +313,9 @@ async function handleStatusUpdate(e) {
             throw new Error(error.detail || 'Failed to update status');
         }
 
+        if (applyApplication(await response.json())) renderPipeline();
         window.toast.success('Status updated successfully!');
         closeStatusModal();
-        loadAllData();
     } catch (error) {
         console.error('Error updating status:', error);
         window.toast.error(error.message || 'Failed to update status');
@@ -5,6 +5,7 @@ let currentCandidateId = null;
 document.addEventListener('DOMContentLoaded', () => {
     loadCandidates();
     setupEventListeners();
+    setupLiveUpdates();
 });
 
 function setupEventListeners() {
@@ -22,6 +23,29 @@ function setupEventListeners() {
     });
 }
 
+// Patch the local list from server events instead of reloading it
+function setupLiveUpdates() {
+    window.liveUpdates
+        .on('candidate', handleCandidateEvent)
+        .onResync(loadCandidates)
+        .start();
+}
+
+function handleCandidateEvent(event) {
+    if (event.action === 'imported') {
+        // Bulk imports aren't sent row by row
+        loadCandidates();
+        return;
+    }
+
+    if (event.action === 'deleted') {
+        removeById(currentCandidates, event.id);
+    } else {
+        upsertById(currentCandidates, { id: event.id, ...event.fields });
+    }
+    filterCandidates();
+}
+
 async function loadCandidates() {
     const loadingState = document.getElementById('loadingState');
     const emptyState = document.getElementById('emptyState');
@@ -183,9 +207,10 @@ async function handleCandidateSubmit(e) {
             throw new Error(error.detail || 'Failed to save candidate');
         }
 
+        upsertById(currentCandidates, await response.json());
         window.toast.success(currentCandidateId ? 'Candidate updated successfully!' : 'Candidate added successfully!');
         closeCandidateModal();
-        loadCandidates();
+        filterCandidates();
     } catch (error) {
         console.error('Error saving candidate:', error);
         window.toast.error(error.message || 'Failed to save candidate');
@@ -217,8 +242,9 @@ async function deleteCandidate(candidateId, candidateName) {
 
         if (!response.ok) throw new Error('Failed to delete candidate');
 
+        removeById(currentCandidates, candidateId);
         window.toast.success('Candidate deleted successfully');
-        loadCandidates();
+        filterCandidates();
     } catch (error) {
         console.error('Error deleting candidate:', error);
         window.toast.error('Failed to delete candidate');
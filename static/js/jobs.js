@@ -5,6 +5,7 @@ let currentJobId = null;
 document.addEventListener('DOMContentLoaded', () => {
     loadJobs();
     setupEventListeners();
+    setupLiveUpdates();
 });
 
 function setupEventListeners() {
@@ -28,6 +29,68 @@ function setupEventListeners() {
     });
 }
 
+// Patch the local list from server events instead of reloading it
+function setupLiveUpdates() {
+    window.liveUpdates
+        .on('job', handleJobEvent)
+        .on('application', handleApplicationEvent)
+        .on('candidate', handleCandidateEvent)
+        .onResync(loadJobs)
+        .start();
+}
+
+function handleJobEvent(event) {
+    if (event.action === 'deleted') {
+        removeById(currentJobs, event.id);
+    } else if (event.action === 'created') {
+        // Event fields are the job's columns; a new job has no applications
+        upsertById(currentJobs, { application_count: 0, ...event.fields, id: event.id });
+    } else {
+        upsertById(currentJobs, { id: event.id, ...event.fields });
+    }
+    filterJobs();
+}
+
+function handleApplicationEvent(event) {
+    if (event.action === 'bulk_updated') {
+        // Bulk events carry only application ids, not the jobs they belong to
+        refreshCounts();
+        return;
+    }
+    if (event.action !== 'created') return;
+
+    const job = currentJobs.find(j => j.id === event.fields.job_id);
+    if (job) {
+        job.application_count = (job.application_count || 0) + 1;
+        filterJobs();
+    }
+}
+
+function handleCandidateEvent(event) {
+    // Deleting a candidate deletes their applications without an event per row
+    if (event.action === 'deleted') refreshCounts();
+}
+
+// Re-read application counts for the listed jobs, keeping any local edits
+async function refreshCounts() {
+    try {
+        const response = await fetch('/api/jobs');
+        if (!response.ok) return;
+
+        const counts = new Map((await response.json()).map(job => [job.id, job]));
+        currentJobs.forEach(job => {
+            const fresh = counts.get(job.id);
+            if (fresh) {
+                job.application_count = fresh.application_count;
+                job.status_counts = fresh.status_counts;
+            }
+        });
+        filterJobs();
+    } catch (error) {
+        console.error('Error refreshing application counts:', error);
+    }
+}
+
 async function loadJobs() {
     const loadingState = document.getElementById('loadingState');
     const emptyState = document.getElementById('emptyState');
@@ -193,9 +256,10 @@ async function handleJobSubmit(e) {
             throw new Error(error.detail || 'Failed to save job');
         }
 
+        upsertById(currentJobs, await response.json());
         window.toast.success(currentJobId ? 'Job updated successfully!' : 'Job created successfully!');
         closeJobModal();
-        loadJobs();
+        filterJobs();
     } catch (error) {
         console.error('Error saving job:', error);
         window.toast.error(error.message || 'Failed to save job');
@@ -235,8 +299,9 @@ async function deleteJob(jobId, jobTitle) {
 
         if (!response.ok) throw new Error('Failed to delete job');
 
+        removeById(currentJobs, jobId);
         window.toast.success('Job deleted successfully');
-        loadJobs();
+        filterJobs();
     } catch (error) {
         console.error('Error deleting job:', error);
         window.toast.error('Failed to delete job');
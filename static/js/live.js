@@ -0,0 +1,73 @@
+// Live Updates (Server-Sent Events from /api/events)
+class LiveUpdates {
+    constructor() {
+        this.source = null;
+        this.handlers = {};
+        this.resyncHandlers = [];
+        this.connected = false;
+    }
+
+    // Subscribe to change events for one entity: handler(event)
+    on(entity, handler) {
+        (this.handlers[entity] = this.handlers[entity] || []).push(handler);
+        return this;
+    }
+
+    // Called when the server says local state can't be patched (missed events)
+    onResync(handler) {
+        this.resyncHandlers.push(handler);
+        return this;
+    }
+
+    start() {
+        if (this.source || !window.EventSource) return;
+
+        const entities = Object.keys(this.handlers).join(',');
+        // EventSource reconnects on its own and sends Last-Event-ID,
+        // so the server can replay whatever happened while we were away
+        this.source = new EventSource(`/api/events?entities=${encodeURIComponent(entities)}`);
+
+        this.source.addEventListener('change', (e) => {
+            const event = JSON.parse(e.data);
+            (this.handlers[event.entity] || []).forEach(handler => handler(event));
+        });
+
+        this.source.addEventListener('resync', () => {
+            this.resyncHandlers.forEach(handler => handler());
+        });
+
+        this.source.addEventListener('open', () => {
+            this.connected = true;
+        });
+
+        this.source.addEventListener('error', () => {
+            this.connected = false;
+        });
+    }
+
+    stop() {
+        if (this.source) {
+            this.source.close();
+            this.source = null;
+        }
+    }
+}
+
+// Insert or merge a row into a list by id; returns the stored row
+function upsertById(list, row) {
+    const index = list.findIndex(item => item.id === row.id);
+    if (index === -1) {
+        list.unshift(row);
+        return row;
+    }
+    list[index] = { ...list[index], ...row };
+    return list[index];
+}
+
+function removeById(list, id) {
+    const index = list.findIndex(item => item.id === id);
+    if (index !== -1) list.splice(index, 1);
+}
+
+window.liveUpdates = new LiveUpdates();
+window.addEventListener('beforeunload', () => window.liveUpdates.stop());
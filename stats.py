@@ -0,0 +1,175 @@
+from sqlalchemy import select, func, update, delete, insert, bindparam, event, inspect
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from collections import Counter
+from typing import Dict
+import models
+
+# Incrementally maintained dashboard counters.
+#
+# Every ORM flush that inserts, deletes or changes the status of a Job,
+# Candidate or Application adjusts the matching rows in stat_counters on the
+# same connection, so the counters commit or roll back with the data they
+# describe. /api/stats then reads one small table instead of running a COUNT
+# per metric. Code that writes through Core statements (bypassing the ORM)
+# must call apply_deltas itself. `python stats.py rebuild` recomputes
+# everything from the base tables and reports any drift it corrected.
+
+def status_value(status) -> str:
+    """A status enum's stored value (plain strings pass through)"""
+    return getattr(status, "value", status)
+
+def counter_keys() -> list:
+    """All counter keys the dashboard expects to exist"""
+    return (
+        ["jobs.total", "candidates.total", "applications.total"]
+        + [f"jobs.status.{s.value}" for s in models.JobStatus]
+        + [f"applications.status.{s.value}" for s in models.ApplicationStatus]
+    )
+
+def _row_deltas(obj, sign: int, deltas: Counter):
+    if isinstance(obj, models.Job):
+        deltas["jobs.total"] += sign
+        if obj.status is not None:
+            deltas[f"jobs.status.{status_value(obj.status)}"] += sign
+    elif isinstance(obj, models.Candidate):
+        deltas["candidates.total"] += sign
+    elif isinstance(obj, models.Application):
+        deltas["applications.total"] += sign
+        if obj.status is not None:
+            deltas[f"applications.status.{status_value(obj.status)}"] += sign
+
+def _status_change_deltas(obj, deltas: Counter):
+    if isinstance(obj, models.Job):
+        prefix = "jobs.status"
+    elif isinstance(obj, models.Application):
+        prefix = "applications.status"
+    else:
+        return
+
+    history = inspect(obj).attrs.status.history
+    if not history.added:
+        return
+    for old in history.deleted:
+        if old is not None:
+            deltas[f"{prefix}.{status_value(old)}"] -= 1
+    for new in history.added:
+        if new is not None:
+            deltas[f"{prefix}.{status_value(new)}"] += 1
+
+def apply_deltas(connection, deltas: Dict[str, int]):
+    """Add deltas to the counters in one executemany on the given sync connection"""
+    params = [{"counter_key": k, "delta": d} for k, d in deltas.items() if d]
+    if not params:
+        return
+    table = models.StatCounter.__table__
+    connection.execute(
+        update(table)
+        .where(table.c.key == bindparam("counter_key"))
+        .values(value=table.c.value + bindparam("delta")),
+        params
+    )
+
+async def bump(db: AsyncSession, deltas: Dict[str, int]):
+    """apply_deltas for async callers writing through Core statements"""
+    await db.run_sync(lambda session: apply_deltas(session.connection(), deltas))
+
+@event.listens_for(Session, "after_flush")
+def _track_counters(session, flush_context):
+    # Attribute history is still intact here; it is reset after this hook
+    deltas = Counter()
+    for obj in session.new:
+        _row_deltas(obj, 1, deltas)
+    for obj in session.deleted:
+        _row_deltas(obj, -1, deltas)
+    for obj in session.dirty:
+        _status_change_deltas(obj, deltas)
+    if deltas:
+        apply_deltas(session.connection(), deltas)
+
+async def read_counters(db: AsyncSession) -> Dict[str, int]:
+    """Read every counter in one query"""
+    result = await db.execute(select(models.StatCounter.key, models.StatCounter.value))
+    return {key: value for key, value in result}
+
+async def compute_counters(db: AsyncSession) -> Dict[str, int]:
+    """Recompute all counters from the base tables"""
+    counters = dict.fromkeys(counter_keys(), 0)
+
+    result = await db.execute(
+        select(models.Job.status, func.count(models.Job.id)).group_by(models.Job.status)
+    )
+    for status, count in result:
+        counters["jobs.total"] += count
+        if status is not None:
+            counters[f"jobs.status.{status_value(status)}"] = count
+
+    result = await db.execute(select(func.count(models.Candidate.id)))
+    counters["candidates.total"] = result.scalar()
+
+    result = await db.execute(
+        select(models.Application.status, func.count(models.Application.id))
+        .group_by(models.Application.status)
+    )
+    for status, count in result:
+        counters["applications.total"] += count
+        if status is not None:
+            counters[f"applications.status.{status_value(status)}"] = count
+
+    return counters
+
+async def rebuild_counters(db: AsyncSession) -> Dict[str, int]:
+    """Overwrite the counters with freshly computed values; returns the drift that was fixed"""
+    computed = await compute_counters(db)
+    current = await read_counters(db)
+    drift = {
+        key: value - current.get(key, 0)
+        for key, value in computed.items()
+        if value != current.get(key, 0)
+    }
+
+    await db.execute(delete(models.StatCounter))
+    await db.execute(
+        insert(models.StatCounter),
+        [{"key": key, "value": value} for key, value in computed.items()]
+    )
+    return drift
+
+async def ensure_counters(db: AsyncSession):
+    """Seed the counters if any are missing (fresh database or new status values)"""
+    current = await read_counters(db)
+    if any(key not in current for key in counter_keys()):
+        await rebuild_counters(db)
+
+def dashboard_stats(counters: Dict[str, int]) -> dict:
+    """Shape the counters into the /api/stats response"""
+    return {
+        "total_jobs": counters.get("jobs.total", 0),
+        "active_jobs": counters.get(f"jobs.status.{models.JobStatus.ACTIVE.value}", 0),
+        "total_candidates": counters.get("candidates.total", 0),
+        "total_applications": counters.get("applications.total", 0),
+        "applications_by_status": {
+            s.value: counters.get(f"applications.status.{s.value}", 0)
+            for s in models.ApplicationStatus
+        }
+    }
+
+if __name__ == "__main__":
+    import asyncio
+    import sys
+    from database import async_session
+
+    async def _rebuild():
+        async with async_session() as db:
+            drift = await rebuild_counters(db)
+            await db.commit()
+        if drift:
+            for key, delta in sorted(drift.items()):
+                print(f"{key}: corrected by {delta:+d}")
+        else:
+            print("Counters already match the base tables")
+
+    if sys.argv[1:] != ["rebuild"]:
+        print("Usage: python stats.py rebuild")
+        sys.exit(1)
+    asyncio.run(_rebuild())
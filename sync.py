@@ -0,0 +1,182 @@
+from fastapi import HTTPException
+from sqlalchemy import select, delete, insert, and_, or_, event
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Optional, Tuple
+import base64
+import json
+import os
+import models
+
+# Delta sync: everything created, changed or deleted since a watermark.
+#
+# Each entity is read in (updated_at, id) order from its own position, so a
+# page boundary can fall inside a burst of rows sharing one timestamp (bulk
+# status moves) without skipping or repeating rows. Deletes are recorded as
+# tombstones by an after_flush hook and read the same way by deleted_at.
+# The positions travel in an opaque token.
+#
+# Timestamps are taken at flush time but rows become visible at commit, so
+# once an entity is drained its position is held back SYNC_OVERLAP_SECONDS:
+# the next call re-sends recent rows instead of missing a slow transaction.
+# Clients must upsert by id, and keep using a token with the same entity
+# set it was issued for (deletes are tracked in one shared position).
+# Tombstones older than
+# SYNC_TOMBSTONE_RETENTION_DAYS are pruned (`python sync.py prune`); tokens
+# older than that get a 410 and the client reloads in full.
+
+SYNC_OVERLAP_SECONDS = float(os.getenv("SYNC_OVERLAP_SECONDS", 5))
+SYNC_TOMBSTONE_RETENTION_DAYS = int(os.getenv("SYNC_TOMBSTONE_RETENTION_DAYS", 30))
+
+SYNC_ENTITIES = {
+    "jobs": models.Job,
+    "candidates": models.Candidate,
+    "applications": models.Application,
+}
+DELETED = "deleted"
+TOKEN_VERSION = 1
+
+Position = Optional[Tuple[datetime, int]]
+
+# ============== TOMBSTONES ==============
+
+@event.listens_for(Session, "after_flush")
+def _record_tombstones(session, flush_context):
+    now = datetime.utcnow()
+    rows = [
+        {"entity": obj.__tablename__, "entity_id": obj.id, "deleted_at": now}
+        for obj in session.deleted
+        if obj.__tablename__ in SYNC_ENTITIES
+    ]
+    if rows:
+        session.connection().execute(insert(models.Tombstone.__table__), rows)
+
+async def prune_tombstones(db: AsyncSession, retention_days: int = SYNC_TOMBSTONE_RETENTION_DAYS) -> int:
+    """Delete tombstones older than the retention window; returns how many"""
+    cutoff = datetime.utcnow() - timedelta(days=retention_days)
+    result = await db.execute(delete(models.Tombstone).where(models.Tombstone.deleted_at < cutoff))
+    return result.rowcount
+
+# ============== TOKENS ==============
+
+def encode_token(positions: Dict[str, Position], issued: datetime) -> str:
+    """Encode per-entity positions into an opaque sync token"""
+    payload = {
+        "v": TOKEN_VERSION,
+        "issued": issued.isoformat(),
+        "positions": {
+            name: [position[0].isoformat(), position[1]] if position else None
+            for name, position in positions.items()
+        },
+    }
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode()).decode().rstrip("=")
+
+def decode_token(token: str) -> Tuple[Dict[str, Position], datetime]:
+    """Decode a sync token, rejecting anything malformed with a 400"""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded))
+        if payload["v"] != TOKEN_VERSION:
+            raise ValueError(payload["v"])
+        positions = {}
+        for name, position in payload["positions"].items():
+            if name not in SYNC_ENTITIES and name != DELETED:
+                raise ValueError(name)
+            positions[name] = (datetime.fromisoformat(position[0]), int(position[1])) if position else None
+        return positions, datetime.fromisoformat(payload["issued"])
+    except (ValueError, TypeError, KeyError, IndexError):
+        raise HTTPException(status_code=400, detail="Invalid sync token")
+
+# ============== CHANGES ==============
+
+def _after(query, ts_col, id_col, position: Position):
+    if position is None:
+        return query
+    ts, row_id = position
+    # The leading range bound lets SQLite seek the (updated_at, id) index;
+    # the OR alone makes it scan the whole index once the select isn't covering
+    return query.where(ts_col >= ts, or_(ts_col > ts, and_(ts_col == ts, id_col > row_id)))
+
+def _settle(position: Position, now: datetime) -> Position:
+    """Hold a drained position back by the overlap window"""
+    horizon = now - timedelta(seconds=SYNC_OVERLAP_SECONDS)
+    if position is None or position[0] < horizon:
+        return position
+    return (horizon, 0)
+
+async def _read(db: AsyncSession, query, ts_col, id_col, position: Position, limit: int):
+    query = _after(query, ts_col, id_col, position).order_by(ts_col, id_col).limit(limit + 1)
+    rows = (await db.execute(query)).scalars().all()
+    return rows[:limit], len(rows) > limit
+
+async def changes_since(
+    db: AsyncSession,
+    token: Optional[str] = None,
+    entities: Optional[Iterable[str]] = None,
+    limit: int = 500
+) -> dict:
+    """Rows changed and ids deleted since `token` (everything if None), plus the next token"""
+    now = datetime.utcnow()
+    names = [name for name in SYNC_ENTITIES if entities is None or name in entities]
+    positions: Dict[str, Position] = {}
+
+    if token:
+        positions, issued = decode_token(token)
+        deleted_from = positions.get(DELETED)
+        oldest_needed = deleted_from[0] if deleted_from else issued
+        if oldest_needed < now - timedelta(days=SYNC_TOMBSTONE_RETENTION_DAYS):
+            raise HTTPException(
+                status_code=410,
+                detail="Sync token is older than the tombstone retention window; reload in full"
+            )
+
+    response = {name: [] for name in SYNC_ENTITIES}
+    has_more = False
+
+    for name in names:
+        model = SYNC_ENTITIES[name]
+        rows, more = await _read(
+            db, select(model), model.updated_at, model.id, positions.get(name), limit
+        )
+        response[name] = rows
+        position = (rows[-1].updated_at, rows[-1].id) if rows else positions.get(name)
+        positions[name] = position if more else _settle(position, now)
+        has_more = has_more or more
+
+    tombstones, more = await _read(
+        db,
+        select(models.Tombstone).where(models.Tombstone.entity.in_(names)),
+        models.Tombstone.deleted_at,
+        models.Tombstone.id,
+        positions.get(DELETED),
+        limit
+    )
+    response[DELETED] = [
+        {"entity": t.entity, "id": t.entity_id, "deleted_at": t.deleted_at} for t in tombstones
+    ]
+    position = (tombstones[-1].deleted_at, tombstones[-1].id) if tombstones else positions.get(DELETED)
+    positions[DELETED] = position if more else _settle(position, now)
+    has_more = has_more or more
+
+    response["next_token"] = encode_token(positions, now)
+    response["has_more"] = has_more
+    return response
+
+if __name__ == "__main__":
+    import argparse
+    import asyncio
+    from database import async_session
+
+    parser = argparse.ArgumentParser(description="Maintain delta sync tombstones")
+    parser.add_argument("command", choices=["prune"])
+    parser.add_argument("--retention-days", type=int, default=SYNC_TOMBSTONE_RETENTION_DAYS)
+    args = parser.parse_args()
+
+    async def _prune():
+        async with async_session() as db:
+            removed = await prune_tombstones(db, args.retention_days)
+            await db.commit()
+        print(f"Removed {removed} tombstones older than {args.retention_days} days")
+
+    asyncio.run(_prune())
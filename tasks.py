@@ -0,0 +1,447 @@
+from fastapi import HTTPException
+from sqlalchemy import select, update, delete, func, event
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, NamedTuple, Optional
+import asyncio
+import json
+import logging
+import os
+import random
+import time
+import matching
+import metrics
+import models
+import queries
+import resumes
+import skills as skill_index
+import sync
+import trends
+from database import async_session
+
+# Durable task queue backed by the `tasks` table.
+#
+# Handlers enqueue follow-up work with enqueue(db, name, payload) in the same
+# transaction as the write that needs it, so a task exists exactly when the
+# write committed and survives restarts. Committing a session that queued
+# tasks wakes the in-process workers.
+#
+# TASKS_CONCURRENCY worker coroutines claim due tasks one at a time and run
+# the registered handler with a fresh session. The handler's writes commit
+# together with the task's "done" mark, so database-only handlers take
+# effect exactly once. Failures retry with capped exponential backoff; a
+# task out of attempts moves to the dead-letter list (status "dead") until
+# it is retried or discarded through /api/tasks. Tasks left running by a
+# dead process are reclaimed after TASKS_TIMEOUT_SECONDS.
+#
+#   delay / run_at    run no earlier than a given time
+#   idempotency_key   a second enqueue with the same key is a no-op, until
+#                     the first task is purged (TASKS_RETENTION_DAYS)
+#   every=            periodic maintenance, enqueued once per period
+#
+# Handlers are async functions taking (db, **payload) and are registered
+# with @task at the bottom of this module. CLI:
+# `python tasks.py run|status|dead|retry-dead|purge`.
+
+TASKS_IN_APP = os.getenv("TASKS_IN_APP", "true").lower() in ("1", "true", "yes")
+TASKS_CONCURRENCY = int(os.getenv("TASKS_CONCURRENCY", 4))
+TASKS_MAX_ATTEMPTS = int(os.getenv("TASKS_MAX_ATTEMPTS", 5))
+TASKS_BACKOFF_SECONDS = float(os.getenv("TASKS_BACKOFF_SECONDS", 10))
+TASKS_MAX_BACKOFF_SECONDS = float(os.getenv("TASKS_MAX_BACKOFF_SECONDS", 3600))
+TASKS_TIMEOUT_SECONDS = float(os.getenv("TASKS_TIMEOUT_SECONDS", 300))
+TASKS_POLL_SECONDS = float(os.getenv("TASKS_POLL_SECONDS", 30))
+TASKS_RETENTION_DAYS = int(os.getenv("TASKS_RETENTION_DAYS", 7))
+# How long shutdown waits for running handlers before interrupting them
+TASKS_SHUTDOWN_GRACE_SECONDS = float(os.getenv("TASKS_SHUTDOWN_GRACE_SECONDS", 10))
+
+PENDING, RUNNING, DONE, DEAD = "pending", "running", "done", "dead"
+STATUSES = (PENDING, RUNNING, DONE, DEAD)
+
+logger = logging.getLogger("hireops.tasks")
+
+task_runs = metrics.Counter(
+    "hireops_tasks_total", "Task executions by task name and result (done, retry, dead)", ("task", "result")
+)
+task_time = metrics.Histogram(
+    "hireops_task_duration_seconds", "Task handler run time by task name", ("task",), metrics.LATENCY_BUCKETS
+)
+task_depth = metrics.Gauge("hireops_tasks", "Tasks by status", ("status",))
+metrics.register(task_runs, task_time, task_depth)
+
+# ============== REGISTRY ==============
+
+Handler = Callable[..., Awaitable[None]]
+
+class TaskSpec(NamedTuple):
+    handler: Handler
+    max_attempts: int
+    every: Optional[timedelta]
+
+REGISTRY: Dict[str, TaskSpec] = {}
+
+def task(name: str, max_attempts: int = TASKS_MAX_ATTEMPTS, every: Optional[timedelta] = None):
+    """Register an async handler(db, **payload); `every` also schedules it periodically"""
+    def register(handler: Handler) -> Handler:
+        REGISTRY[name] = TaskSpec(handler, max_attempts, every)
+        return handler
+    return register
+
+# ============== QUEUE ==============
+
+async def enqueue(
+    db: AsyncSession,
+    name: str,
+    payload: Optional[dict] = None,
+    delay: Optional[timedelta] = None,
+    run_at: Optional[datetime] = None,
+    idempotency_key: Optional[str] = None
+):
+    """Queue a task in the caller's transaction; runs after the caller commits"""
+    if name not in REGISTRY:
+        raise ValueError(f"Unknown task {name!r}")
+    now = datetime.utcnow()
+    await db.execute(
+        queries.insert_ignore(db, models.Task).values(
+            name=name,
+            payload=json.dumps(payload or {}),
+            status=PENDING,
+            attempts=0,
+            max_attempts=REGISTRY[name].max_attempts,
+            run_after=run_at or now + (delay or timedelta()),
+            idempotency_key=idempotency_key,
+            created_at=now
+        )
+    )
+    db.info["tasks_enqueued"] = True
+
+@event.listens_for(Session, "after_commit")
+def _wake_on_commit(session):
+    if session.info.pop("tasks_enqueued", False):
+        notify()
+
+@event.listens_for(Session, "after_rollback")
+def _forget_on_rollback(session):
+    session.info.pop("tasks_enqueued", None)
+
+async def claim(db: AsyncSession) -> Optional[models.Task]:
+    """Mark the next due task running and commit; None if nothing is due"""
+    now = datetime.utcnow()
+    while True:
+        result = await db.execute(
+            select(models.Task)
+            .where(models.Task.status == PENDING, models.Task.run_after <= now)
+            .order_by(models.Task.run_after, models.Task.id)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        )
+        claimed = result.scalar_one_or_none()
+        if claimed is None:
+            return None
+        # Another worker may have taken it between the SELECT and the UPDATE
+        result = await db.execute(
+            update(models.Task)
+            .where(models.Task.id == claimed.id, models.Task.status == PENDING)
+            .values(status=RUNNING, attempts=models.Task.attempts + 1, started_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        if result.rowcount:
+            await db.refresh(claimed)
+            return claimed
+
+async def recover(db: AsyncSession) -> int:
+    """Requeue tasks left running by a process that died; the caller commits"""
+    cutoff = datetime.utcnow() - timedelta(seconds=TASKS_TIMEOUT_SECONDS)
+    result = await db.execute(
+        update(models.Task)
+        .where(models.Task.status == RUNNING, models.Task.started_at < cutoff)
+        .values(status=PENDING, run_after=datetime.utcnow())
+    )
+    return result.rowcount
+
+def backoff_seconds(attempts: int) -> float:
+    """Delay before retry number `attempts`: exponential, capped, with +-20% jitter"""
+    delay = min(TASKS_BACKOFF_SECONDS * 2 ** (attempts - 1), TASKS_MAX_BACKOFF_SECONDS)
+    return delay * random.uniform(0.8, 1.2)
+
+async def _fail(task_id: int, error: str) -> str:
+    """Schedule a retry, or move the task to the dead letters when out of attempts"""
+    async with async_session() as db:
+        current = await db.get(models.Task, task_id)
+        now = datetime.utcnow()
+        if current.attempts >= current.max_attempts:
+            current.status, current.finished_at, outcome = DEAD, now, "dead"
+            logger.warning("Task %s #%d is dead after %d attempts: %s", current.name, task_id, current.attempts, error)
+        else:
+            current.status, outcome = PENDING, "retry"
+            current.run_after = now + timedelta(seconds=backoff_seconds(current.attempts))
+        current.last_error = error[:2000]
+        await db.commit()
+        return outcome
+
+async def _release(task_id: int):
+    async with async_session() as db:
+        await db.execute(
+            update(models.Task)
+            .where(models.Task.id == task_id, models.Task.status == RUNNING)
+            .values(status=PENDING, attempts=models.Task.attempts - 1, run_after=datetime.utcnow())
+        )
+        await db.commit()
+
+async def execute(claimed: models.Task) -> str:
+    """Run a claimed task; returns done, retry or dead"""
+    spec = REGISTRY.get(claimed.name)
+    started = time.perf_counter()
+    error = None
+    if spec is None:
+        error = f"No handler registered for {claimed.name!r}"
+    else:
+        try:
+            async with async_session() as db:
+                await asyncio.wait_for(spec.handler(db, **json.loads(claimed.payload)), TASKS_TIMEOUT_SECONDS)
+                # Handler writes and the done mark commit together
+                await db.execute(
+                    update(models.Task)
+                    .where(models.Task.id == claimed.id)
+                    .values(status=DONE, finished_at=datetime.utcnow(), last_error=None)
+                )
+                await db.commit()
+        except asyncio.CancelledError:
+            # Interrupted by shutdown: hand the task back without using up an attempt
+            await _release(claimed.id)
+            raise
+        except asyncio.TimeoutError:
+            error = f"Timed out after {TASKS_TIMEOUT_SECONDS:.0f}s"
+        except Exception as exc:
+            logger.exception("Task %s #%d failed", claimed.name, claimed.id)
+            error = f"{type(exc).__name__}: {exc}"
+
+    outcome = "done" if error is None else await _fail(claimed.id, error)
+    task_runs.inc((claimed.name, outcome))
+    task_time.observe((claimed.name,), time.perf_counter() - started)
+    return outcome
+
+async def schedule_periodic(db: AsyncSession):
+    """Enqueue each periodic task once for the current period; the caller commits"""
+    epoch = datetime(2000, 1, 1)
+    now = datetime.utcnow()
+    for name, spec in REGISTRY.items():
+        if spec.every:
+            slot = int((now - epoch) / spec.every)
+            await enqueue(db, name, run_at=epoch + slot * spec.every, idempotency_key=f"every:{name}:{slot}")
+
+async def next_due(db: AsyncSession) -> Optional[float]:
+    """Seconds until the next pending task is due (0 if one is due now), None if none are pending"""
+    result = await db.execute(select(func.min(models.Task.run_after)).where(models.Task.status == PENDING))
+    run_after = result.scalar()
+    if run_after is None:
+        return None
+    return max((run_after - datetime.utcnow()).total_seconds(), 0.0)
+
+# ============== DEAD LETTERS & MAINTENANCE ==============
+
+async def stats(db: AsyncSession) -> dict:
+    """Task counts by status and the age of the oldest due task"""
+    result = await db.execute(select(models.Task.status, func.count()).group_by(models.Task.status))
+    counts = {status: 0 for status in STATUSES}
+    counts.update(result.all())
+    for status, count in counts.items():
+        task_depth.set((status,), count)
+    result = await db.execute(
+        select(func.min(models.Task.run_after))
+        .where(models.Task.status == PENDING, models.Task.run_after <= datetime.utcnow())
+    )
+    oldest = result.scalar()
+    counts["oldest_due_seconds"] = (datetime.utcnow() - oldest).total_seconds() if oldest else None
+    return counts
+
+async def list_tasks(db: AsyncSession, status: Optional[str] = DEAD, name: Optional[str] = None, limit: int = 50) -> List[models.Task]:
+    query = select(models.Task).order_by(models.Task.id.desc()).limit(limit)
+    if status:
+        query = query.where(models.Task.status == status)
+    if name:
+        query = query.where(models.Task.name == name)
+    result = await db.execute(query)
+    return result.scalars().all()
+
+async def _dead_task(db: AsyncSession, task_id: int) -> models.Task:
+    dead = await db.get(models.Task, task_id)
+    if dead is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+    if dead.status != DEAD:
+        raise HTTPException(status_code=409, detail=f"Task is {dead.status}; only dead tasks can be retried or discarded")
+    return dead
+
+async def retry_dead(db: AsyncSession, task_id: Optional[int] = None) -> int:
+    """Give one dead task (or all of them) a fresh set of attempts; the caller commits"""
+    if task_id is not None:
+        await _dead_task(db, task_id)
+    query = update(models.Task).where(models.Task.status == DEAD)
+    if task_id is not None:
+        query = query.where(models.Task.id == task_id)
+    result = await db.execute(
+        query.values(status=PENDING, attempts=0, run_after=datetime.utcnow(), finished_at=None)
+    )
+    db.info["tasks_enqueued"] = True
+    return result.rowcount
+
+async def discard_dead(db: AsyncSession, task_id: int):
+    """Delete a dead task; the caller commits"""
+    await db.delete(await _dead_task(db, task_id))
+
+async def purge(db: AsyncSession, retention_days: int = TASKS_RETENTION_DAYS) -> int:
+    """Delete tasks finished more than retention_days ago; the caller commits"""
+    cutoff = datetime.utcnow() - timedelta(days=retention_days)
+    result = await db.execute(
+        delete(models.Task).where(models.Task.status == DONE, models.Task.finished_at < cutoff)
+    )
+    return result.rowcount
+
+# ============== WORKERS ==============
+
+class TaskWorkers:
+    """A pool of worker coroutines sharing the queue"""
+
+    def __init__(self, concurrency: int = TASKS_CONCURRENCY):
+        self.concurrency = max(concurrency, 1)
+        self.wakeup = asyncio.Event()
+        self.stopped = asyncio.Event()
+        self.stopping = False
+        self.totals = {"done": 0, "retry": 0, "dead": 0}
+
+    async def _worker(self, drain: bool):
+        while not self.stopping:
+            async with async_session() as db:
+                claimed = await claim(db)
+            if claimed is not None:
+                self.totals[await execute(claimed)] += 1
+                continue
+
+            async with async_session() as db:
+                due = await next_due(db)
+            if drain and due is None:
+                return
+            self.wakeup.clear()
+            timeout = TASKS_POLL_SECONDS if due is None else min(max(due, 0.05), TASKS_POLL_SECONDS)
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _housekeeping(self):
+        while not self.stopping:
+            async with async_session() as db:
+                await schedule_periodic(db)
+                await recover(db)
+                await purge(db)
+                await db.commit()
+                await stats(db)
+            try:
+                await asyncio.wait_for(self.stopped.wait(), TASKS_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+
+    async def run(self, drain: bool = False):
+        """Run the workers until stop(), or with drain=True until no pending tasks remain"""
+        async with async_session() as db:
+            if await recover(db):
+                logger.info("Requeued tasks left running by a previous process")
+            await db.commit()
+
+        housekeeping = None if drain else asyncio.create_task(self._housekeeping())
+        try:
+            await asyncio.gather(*(self._worker(drain) for _ in range(self.concurrency)))
+        finally:
+            if housekeeping is not None:
+                self.stopped.set()
+                await housekeeping
+
+    def stop(self):
+        self.stopping = True
+        self.wakeup.set()
+        self.stopped.set()
+
+# In-app workers, started from main.py's startup hook
+workers: Optional[TaskWorkers] = None
+_task: Optional[asyncio.Task] = None
+
+def start():
+    global workers, _task
+    workers = TaskWorkers()
+    _task = asyncio.create_task(workers.run())
+
+async def stop():
+    global workers, _task
+    if workers is not None:
+        workers.stop()
+        try:
+            await asyncio.wait_for(_task, TASKS_SHUTDOWN_GRACE_SECONDS)
+        except asyncio.TimeoutError:
+            pass  # wait_for cancelled the workers; their tasks went back to pending
+        workers, _task = None, None
+
+def notify():
+    """Wake idle workers after new tasks were committed"""
+    if workers is not None:
+        workers.wakeup.set()
+
+# ============== HANDLERS ==============
+
+@task("skills.index_candidates")
+async def index_candidate_skills(db: AsyncSession, candidate_ids: List[int]):
+    """Rebuild skill links from the candidates' current skills"""
+    result = await db.execute(
+        select(models.Candidate.id, models.Candidate.skills).where(models.Candidate.id.in_(candidate_ids))
+    )
+    await skill_index.index_candidates(db, result.all())
+
+@task("trends.catch_up", every=timedelta(days=1))
+async def trends_catch_up(db: AsyncSession):
+    drift = await trends.run_catch_up(db)
+    if drift:
+        logger.warning("Trend rollups drifted and were corrected: %s", drift)
+
+@task("sync.prune_tombstones", every=timedelta(days=1))
+async def prune_tombstones(db: AsyncSession):
+    await sync.prune_tombstones(db)
+
+@task("resumes.collect_garbage", every=timedelta(days=1))
+async def collect_resume_garbage(db: AsyncSession):
+    await resumes.collect_garbage(db)
+
+@task("matching.rebuild", every=timedelta(days=1))
+async def rebuild_matching_index(db: AsyncSession):
+    # Folds the day's changes into the memory-mapped matrix and refreshes IDF
+    await matching.engine.rebuild(db)
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run and inspect the background task queue")
+    parser.add_argument("command", choices=["run", "status", "dead", "retry-dead", "purge"])
+    parser.add_argument("--concurrency", type=int, default=TASKS_CONCURRENCY)
+    parser.add_argument("--drain", action="store_true", help="run: exit once no tasks are pending")
+    args = parser.parse_args()
+
+    async def _run():
+        async with async_session() as db:
+            if args.command == "retry-dead":
+                print(f"Requeued {await retry_dead(db)} dead tasks")
+            elif args.command == "purge":
+                print(f"Purged {await purge(db)} finished tasks")
+            elif args.command == "dead":
+                for dead in await list_tasks(db, DEAD, limit=1000):
+                    print(f"#{dead.id} {dead.name} {dead.payload} after {dead.attempts} attempts: {dead.last_error}")
+            await db.commit()
+            counts = await stats(db)
+        print(", ".join(f"{status} {counts[status]}" for status in STATUSES))
+
+        if args.command == "run":
+            pool = TaskWorkers(args.concurrency)
+            try:
+                await pool.run(drain=args.drain)
+            finally:
+                print(", ".join(f"{result} {count}" for result, count in pool.totals.items()))
+
+    asyncio.run(_run())
@@ -0,0 +1,127 @@
+import asyncio
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+import matching
+import models
+import sync
+from database import Base
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Every test runs against both scoring backends over the same index files
+
+@pytest.fixture(params=["numpy", "python"])
+def backend(request, monkeypatch):
+    if request.param == "numpy" and numpy is None:
+        pytest.skip("NumPy is not installed")
+    if request.param == "python":
+        monkeypatch.setattr(matching, "np", None)
+    # Only rows written after a build reach the delta, so the index itself is scored
+    monkeypatch.setattr(sync, "SYNC_OVERLAP_SECONDS", 0)
+    return request.param
+
+@pytest.fixture
+def sessions(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}")
+
+    async def create():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    asyncio.run(create())
+    yield sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    asyncio.run(engine.dispose())
+
+def run(sessions, scenario):
+    async def main():
+        async with sessions() as db:
+            return await scenario(db)
+    return asyncio.run(main())
+
+def candidate(name, skills, position=None, years=None):
+    return models.Candidate(
+        name=name, email=f"{name.lower()}@example.com", skills=skills,
+        current_position=position, experience_years=years
+    )
+
+def job(title, requirements, status=models.JobStatus.ACTIVE):
+    return models.Job(title=title, description=f"{title} role", requirements=requirements, status=status)
+
+def test_match_candidates_ranks_shared_terms(backend, sessions, tmp_path):
+    async def scenario(db):
+        ml = job("Machine Learning Engineer", "Python and PyTorch")
+        db.add_all([
+            ml,
+            candidate("Ada", "Python, Machine Learning, PyTorch", "ML Engineer", 6),
+            candidate("Cy", "Python, Django", "Backend Developer", 2),
+            candidate("Di", "Excel, Accounting", "Accountant", 10),
+        ])
+        await db.commit()
+        engine = matching.MatchingEngine(str(tmp_path / "index"))
+        await engine.rebuild(db)
+        return await engine.match_candidates(db, ml)
+
+    matches = run(sessions, scenario)
+
+    assert [m["name"] for m in matches] == ["Ada", "Cy"]
+    assert matches[0]["score"] > matches[1]["score"]
+    assert {"machine learning", "pytorch"} <= {t["term"] for t in matches[0]["terms"]}
+    assert sum(t["score"] for t in matches[0]["terms"]) == pytest.approx(matches[0]["score"], abs=0.01)
+
+def test_match_candidates_scales_by_required_years(backend, sessions, tmp_path):
+    async def scenario(db):
+        senior = job("Python Developer", "5+ years of Python")
+        db.add_all([senior, candidate("Ada", "Python", years=6), candidate("Bo", "Python", years=1)])
+        await db.commit()
+        engine = matching.MatchingEngine(str(tmp_path / "index"))
+        await engine.rebuild(db)
+        return await engine.match_candidates(db, senior)
+
+    matches = {m["name"]: m for m in run(sessions, scenario)}
+
+    assert matches["Ada"]["experience_factor"] == 1.0
+    assert matches["Bo"]["experience_factor"] == pytest.approx(0.6)
+    assert matches["Bo"]["required_years"] == 5.0
+    assert matches["Ada"]["score"] > matches["Bo"]["score"]
+
+def test_match_jobs_with_no_jobs_indexed(backend, sessions, tmp_path):
+    # The only job was a draft at build time; once activated it is matched from the delta
+    async def scenario(db):
+        draft = job("Python Developer", "Python, Django", status=models.JobStatus.DRAFT)
+        cy = candidate("Cy", "Python, Django", "Backend Developer", 4)
+        db.add_all([draft, cy])
+        await db.commit()
+        engine = matching.MatchingEngine(str(tmp_path / "index"))
+        await engine.rebuild(db)
+
+        before = await engine.match_jobs(db, cy)
+        draft.status = models.JobStatus.ACTIVE
+        await db.commit()
+        return before, await engine.match_jobs(db, cy)
+
+    before, after = run(sessions, scenario)
+
+    assert before == []
+    assert [m["name"] for m in after] == ["Python Developer"]
+
+def test_matches_follow_writes_after_the_build(backend, sessions, tmp_path):
+    async def scenario(db):
+        ml = job("Machine Learning Engineer", "Python and PyTorch")
+        ada = candidate("Ada", "Python, Machine Learning, PyTorch")
+        di = candidate("Di", "Excel, Accounting")
+        db.add_all([ml, ada, di])
+        await db.commit()
+        engine = matching.MatchingEngine(str(tmp_path / "index"))
+        await engine.rebuild(db)
+
+        await db.delete(ada)
+        di.skills = "PyTorch, Machine Learning"
+        await db.commit()
+        return await engine.match_candidates(db, ml)
+
+    assert [m["name"] for m in run(sessions, scenario)] == ["Di"]
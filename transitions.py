@@ -0,0 +1,106 @@
+from sqlalchemy import select, update, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from collections import Counter
+from datetime import datetime
+from typing import List, Optional
+import analytics
+import models
+import queries
+import stats
+import trends
+
+# Bulk application status transitions.
+#
+# One request moves many applications to a new status inside a single
+# transaction: one SELECT to read current statuses, one UPDATE per chunk of
+# ids, and one multi-row INSERT for all StatusHistory rows, which are then
+# rolled up into the pipeline analytics. Applications already in the target
+# status are reported as skipped and get no history.
+
+CHUNK_SIZE = 500
+
+def _chunks(items: list, size: int = CHUNK_SIZE):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+async def bulk_transition(
+    db: AsyncSession,
+    new_status: models.ApplicationStatus,
+    changed_by: Optional[int],
+    notes: Optional[str] = None,
+    application_ids: Optional[List[int]] = None,
+    job_id: Optional[int] = None,
+    candidate_id: Optional[int] = None,
+    status: Optional[str] = None
+) -> dict:
+    """Move the given applications (or those matching the filter) to new_status"""
+    current = {}
+    if application_ids is not None:
+        requested = list(dict.fromkeys(application_ids))
+        for chunk in _chunks(requested):
+            result = await db.execute(
+                select(models.Application.id, models.Application.status)
+                .where(models.Application.id.in_(chunk))
+            )
+            current.update(result.all())
+    else:
+        query = queries.filter_applications(
+            select(models.Application.id, models.Application.status),
+            job_id, candidate_id, status
+        )
+        result = await db.execute(query.order_by(models.Application.id))
+        current.update(result.all())
+        requested = list(current)
+
+    to_move = [app_id for app_id in requested if app_id in current and current[app_id] != new_status]
+    now = datetime.utcnow()
+
+    for chunk in _chunks(to_move):
+        await db.execute(
+            update(models.Application)
+            .where(models.Application.id.in_(chunk))
+            .values(status=new_status, updated_at=now)
+        )
+
+    if to_move:
+        history = [
+            {
+                "application_id": app_id,
+                "old_status": current[app_id],
+                "new_status": new_status,
+                "changed_by": changed_by,
+                "notes": notes,
+                "changed_at": now
+            }
+            for app_id in to_move
+        ]
+        await db.execute(insert(models.StatusHistory), history)
+
+        # Core writes bypass the ORM flush hooks, so update the counters and rollups here
+        deltas = Counter()
+        for app_id in to_move:
+            # applications.status is nullable and NULL has no counter, as in stats' flush hook
+            if current[app_id] is not None:
+                deltas[f"applications.status.{stats.status_value(current[app_id])}"] -= 1
+        deltas[f"applications.status.{new_status.value}"] += len(to_move)
+        await stats.bump(db, deltas)
+        await analytics.record(db, history)
+        await trends.record_hires(db, history)
+
+    moving = set(to_move)
+    results = []
+    for app_id in requested:
+        if app_id not in current:
+            results.append({"application_id": app_id, "result": "not_found", "old_status": None})
+        elif app_id in moving:
+            results.append({"application_id": app_id, "result": "updated", "old_status": current[app_id]})
+        else:
+            results.append({"application_id": app_id, "result": "skipped", "old_status": current[app_id]})
+
+    return {
+        "status": new_status,
+        "updated": len(to_move),
+        "skipped": sum(1 for r in results if r["result"] == "skipped"),
+        "not_found": sum(1 for r in results if r["result"] == "not_found"),
+        "results": results
+    }
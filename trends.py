@@ -0,0 +1,299 @@
+from fastapi import HTTPException
+from sqlalchemy import select, func, delete, insert, event, false
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from collections import Counter, defaultdict
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+import os
+import analytics
+import models
+import queries
+
+# Dashboard trends from a daily rollup table.
+#
+# trend_daily holds one count per metric, dimension and day:
+#
+#   applications  applications by applied_at        all / job / recruiter
+#   hires         moves into HIRED by changed_at    all / job / recruiter
+#   candidates    candidates by created_at          all
+#
+# ORM flushes adjust it for rows created and deleted; Core writers call
+# bump() / record_hires() themselves. Anything the hooks cannot see (manual
+# SQL, reassigning an application to another job or recruiter, a write
+# that failed halfway) is repaired by the catch-up job, which recomputes the
+# last TRENDS_CATCHUP_DAYS from the base tables. It runs daily on the task
+# queue (tasks.py), or by hand with `python trends.py catch-up [--days N]`
+# or `python trends.py rebuild`.
+#
+# The trend API sums the daily rows into day / week / month buckets and
+# zero-fills the gaps, so a 90-day chart reads at most 90 rows per series.
+
+TRENDS_CATCHUP_DAYS = int(os.getenv("TRENDS_CATCHUP_DAYS", 7))
+TRENDS_DEFAULT_DAYS = int(os.getenv("TRENDS_DEFAULT_DAYS", 90))
+
+METRICS = ("applications", "hires", "candidates")
+BUCKETS = ("day", "week", "month")
+
+Key = Tuple[str, str, int, date]
+
+def _dimensions(job_id: Optional[int], recruiter_id: Optional[int]):
+    return (("all", 0), ("job", job_id), ("recruiter", recruiter_id or analytics.UNASSIGNED))
+
+def _add_application(deltas: Counter, metric: str, job_id, recruiter_id, at: Optional[datetime], sign: int):
+    if at is None:
+        return
+    for dimension, dimension_id in _dimensions(job_id, recruiter_id):
+        deltas[(metric, dimension, dimension_id, at.date())] += sign
+
+def _add_candidate(deltas: Counter, at: Optional[datetime], sign: int):
+    if at is not None:
+        deltas[("candidates", "all", 0, at.date())] += sign
+
+# ============== ROLLUP WRITES ==============
+
+def apply_deltas(connection, deltas: Dict[Key, int]):
+    """Add deltas to trend_daily in one executemany on a sync connection"""
+    params = [
+        {"metric": metric, "dimension": dimension, "dimension_id": dimension_id, "day": day, "value": delta}
+        for (metric, dimension, dimension_id, day), delta in deltas.items()
+        if delta
+    ]
+    if params:
+        connection.execute(
+            queries.upsert_add(
+                connection.dialect.name, models.TrendDaily, ["metric", "dimension", "dimension_id", "day"], ["value"]
+            ),
+            params
+        )
+
+async def bump(db: AsyncSession, deltas: Dict[Key, int]):
+    """apply_deltas for async callers writing through Core statements"""
+    await db.run_sync(lambda session: apply_deltas(session.connection(), deltas))
+
+def candidates_created(count: int, at: datetime) -> Dict[Key, int]:
+    """Deltas for `count` candidates inserted at `at`"""
+    return {("candidates", "all", 0, at.date()): count}
+
+def _hire_deltas(connection, moves: Iterable[dict], deltas: Counter):
+    hires = [move for move in moves if move["new_status"] == models.ApplicationStatus.HIRED]
+    if not hires:
+        return
+    ids = sorted({move["application_id"] for move in hires})
+    owners = {}
+    for start in range(0, len(ids), analytics.CHUNK_SIZE):
+        result = connection.execute(
+            select(models.Application.id, models.Application.job_id, models.Application.recruiter_id)
+            .where(models.Application.id.in_(ids[start:start + analytics.CHUNK_SIZE]))
+        )
+        owners.update({app_id: (job_id, recruiter_id) for app_id, job_id, recruiter_id in result})
+    for move in hires:
+        owner = owners.get(move["application_id"])
+        if owner is not None:
+            _add_application(deltas, "hires", *owner, move["changed_at"], 1)
+
+async def record_hires(db: AsyncSession, moves: List[dict]):
+    """Count hires among StatusHistory rows written through Core statements"""
+    def _record(session):
+        deltas = Counter()
+        _hire_deltas(session.connection(), moves, deltas)
+        apply_deltas(session.connection(), deltas)
+    await db.run_sync(_record)
+
+@event.listens_for(Session, "after_flush")
+def _track_trends(session, flush_context):
+    deltas = Counter()
+    moves = []
+    for obj in session.new:
+        if isinstance(obj, models.Application):
+            _add_application(deltas, "applications", obj.job_id, obj.recruiter_id, obj.applied_at, 1)
+        elif isinstance(obj, models.Candidate):
+            _add_candidate(deltas, obj.created_at, 1)
+        elif isinstance(obj, models.StatusHistory):
+            moves.append({"application_id": obj.application_id, "new_status": obj.new_status, "changed_at": obj.changed_at})
+
+    deleted_apps = {}
+    for obj in session.deleted:
+        if isinstance(obj, models.Application):
+            deleted_apps[obj.id] = obj
+            _add_application(deltas, "applications", obj.job_id, obj.recruiter_id, obj.applied_at, -1)
+        elif isinstance(obj, models.Candidate):
+            _add_candidate(deltas, obj.created_at, -1)
+    for obj in session.deleted:
+        # History goes away with its application (ORM cascade)
+        if isinstance(obj, models.StatusHistory) and obj.new_status == models.ApplicationStatus.HIRED:
+            owner = deleted_apps.get(obj.application_id)
+            if owner is not None:
+                _add_application(deltas, "hires", owner.job_id, owner.recruiter_id, obj.changed_at, -1)
+
+    if moves or deltas:
+        connection = session.connection()
+        _hire_deltas(connection, moves, deltas)
+        apply_deltas(connection, deltas)
+
+# ============== CATCH-UP ==============
+
+def compute(connection, since: Optional[date] = None) -> Counter:
+    """Trend counts from the base tables, for days from `since` (everything if None)"""
+    counts = Counter()
+    start = datetime.combine(since, datetime.min.time()) if since else None
+
+    app = models.Application
+    query = select(func.date(app.applied_at), app.job_id, app.recruiter_id, func.count()).where(app.applied_at.isnot(None))
+    if start:
+        query = query.where(app.applied_at >= start)
+    for day, job_id, recruiter_id, count in connection.execute(query.group_by(func.date(app.applied_at), app.job_id, app.recruiter_id)):
+        for dimension, dimension_id in _dimensions(job_id, recruiter_id):
+            counts[("applications", dimension, dimension_id, _as_date(day))] += count
+
+    history = models.StatusHistory
+    query = (
+        select(func.date(history.changed_at), app.job_id, app.recruiter_id, func.count())
+        .join(app, app.id == history.application_id)
+        .where(history.new_status == models.ApplicationStatus.HIRED, history.changed_at.isnot(None))
+    )
+    if start:
+        query = query.where(history.changed_at >= start)
+    for day, job_id, recruiter_id, count in connection.execute(query.group_by(func.date(history.changed_at), app.job_id, app.recruiter_id)):
+        for dimension, dimension_id in _dimensions(job_id, recruiter_id):
+            counts[("hires", dimension, dimension_id, _as_date(day))] += count
+
+    candidate = models.Candidate
+    query = select(func.date(candidate.created_at), func.count()).where(candidate.created_at.isnot(None))
+    if start:
+        query = query.where(candidate.created_at >= start)
+    for day, count in connection.execute(query.group_by(func.date(candidate.created_at))):
+        counts[("candidates", "all", 0, _as_date(day))] += count
+
+    return counts
+
+def _as_date(value) -> date:
+    # SQLite's date() returns text, Postgres a date
+    return value if isinstance(value, date) else date.fromisoformat(value)
+
+def _lock_rollups(connection):
+    # Writers bump trend_daily in the same transaction as their base rows, so
+    # holding its write lock keeps them from committing between the recount
+    # and the replace below; they wait and then apply their bumps on top
+    if connection.dialect.name == "sqlite":
+        connection.execute(delete(models.TrendDaily).where(false()))
+    elif connection.dialect.name == "postgresql":
+        connection.exec_driver_sql("LOCK TABLE trend_daily IN SHARE ROW EXCLUSIVE MODE")
+
+def catch_up(connection, since: Optional[date] = None) -> Dict[str, int]:
+    """Replace the rollup rows from `since` (all if None) with recomputed counts; returns the drift per metric"""
+    table = models.TrendDaily
+    _lock_rollups(connection)
+    current = select(table.metric, table.dimension, table.dimension_id, table.day, table.value)
+    if since:
+        current = current.where(table.day >= since)
+    before = {(m, d, i, day): value for m, d, i, day, value in connection.execute(current)}
+    computed = compute(connection, since)
+
+    drift = Counter()
+    for key in set(before) | set(computed):
+        if key[1] == "all" and before.get(key, 0) != computed.get(key, 0):
+            drift[key[0]] += computed.get(key, 0) - before.get(key, 0)
+
+    wipe = delete(table)
+    if since:
+        wipe = wipe.where(table.day >= since)
+    connection.execute(wipe)
+    rows = [
+        {"metric": m, "dimension": d, "dimension_id": i, "day": day, "value": value}
+        for (m, d, i, day), value in computed.items()
+        if value
+    ]
+    if rows:
+        connection.execute(insert(table), rows)
+    return dict(drift)
+
+async def run_catch_up(db: AsyncSession, days: Optional[int] = TRENDS_CATCHUP_DAYS) -> Dict[str, int]:
+    """catch_up over the last `days` days (everything if None); the caller commits"""
+    since = datetime.utcnow().date() - timedelta(days=days - 1) if days else None
+    return await db.run_sync(lambda session: catch_up(session.connection(), since))
+
+# ============== QUERIES ==============
+
+def bucket_start(day: date, bucket: str) -> date:
+    if bucket == "week":
+        return day - timedelta(days=day.weekday())
+    if bucket == "month":
+        return day.replace(day=1)
+    return day
+
+def bucket_starts(date_from: date, date_to: date, bucket: str) -> List[date]:
+    """Every bucket overlapping the range, oldest first"""
+    starts, current = [], bucket_start(date_from, bucket)
+    while current <= date_to:
+        starts.append(current)
+        if bucket == "week":
+            current += timedelta(days=7)
+        elif bucket == "month":
+            current = (current.replace(day=28) + timedelta(days=4)).replace(day=1)
+        else:
+            current += timedelta(days=1)
+    return starts
+
+async def series(
+    db: AsyncSession,
+    metric: str,
+    date_from: date,
+    date_to: date,
+    bucket: str = "day",
+    job_id: Optional[int] = None,
+    recruiter_id: Optional[int] = None,
+    group_by: Optional[str] = None,
+    limit: int = 20
+) -> List[dict]:
+    """Zero-filled time series of a metric, one per group"""
+    dimension, dimension_id = analytics.resolve_dimension(job_id, recruiter_id, group_by)
+    if metric == "candidates" and dimension != "all":
+        raise HTTPException(status_code=400, detail="Candidate trends are not broken down by job or recruiter")
+
+    table = models.TrendDaily
+    query = select(table.dimension_id, table.day, table.value).where(
+        table.metric == metric, table.dimension == dimension, table.day >= date_from, table.day <= date_to
+    )
+    if dimension_id is not None:
+        query = query.where(table.dimension_id == dimension_id)
+
+    groups = defaultdict(Counter)
+    for group_id, day, value in await db.execute(query):
+        groups[group_id][bucket_start(day, bucket)] += value
+    if not groups and dimension_id is not None:
+        groups[dimension_id] = Counter()
+
+    starts = bucket_starts(date_from, date_to, bucket)
+    result = [
+        {
+            "key": None if dimension == "all" else group_id,
+            "total": sum(values.values()),
+            "points": [{"start": start, "value": values.get(start, 0)} for start in starts],
+        }
+        for group_id, values in groups.items()
+    ]
+    result.sort(key=lambda s: (-s["total"], s["key"] or 0))
+    return result[:limit]
+
+if __name__ == "__main__":
+    import argparse
+    import asyncio
+    from database import async_session
+
+    parser = argparse.ArgumentParser(description="Maintain the dashboard trend rollups")
+    parser.add_argument("command", choices=["catch-up", "rebuild"])
+    parser.add_argument("--days", type=int, default=TRENDS_CATCHUP_DAYS, help="catch-up window")
+    args = parser.parse_args()
+
+    async def _run():
+        async with async_session() as db:
+            drift = await run_catch_up(db, None if args.command == "rebuild" else args.days)
+            await db.commit()
+        if drift:
+            for metric, delta in sorted(drift.items()):
+                print(f"{metric}: corrected by {delta:+d}")
+        else:
+            print("Trend rollups already match the base tables")
+
+    asyncio.run(_run())